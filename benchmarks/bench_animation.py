@@ -0,0 +1,85 @@
+"""Benchmark exporting a memory-mapped stack of rasters as frames.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+frames in the stack:
+
+    $ python benchmarks/bench_animation.py 60
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+from fieldmaps.animation import export_frames  # noqa: E402
+
+
+def make_stack(path, n_frames, shape=(500, 500), seed=13):
+    # Daily rasters drifting from frame to frame, written to disk.
+    rs = np.random.RandomState(seed=seed)
+    stack = np.memmap(path, dtype=np.float32, mode="w+",
+                      shape=(n_frames,) + shape)
+    frame = rs.normal(size=shape).astype(np.float32)
+    for i in range(n_frames):
+        frame += rs.normal(scale=.1, size=shape).astype(np.float32)
+        stack[i] = frame
+    stack.flush()
+    return np.memmap(path, dtype=np.float32, mode="r",
+                     shape=(n_frames,) + shape)
+
+def loop_seconds(stack, out_dir):
+    # Plotting each frame from scratch, with a shared scale.
+    start = timeit.default_timer()
+    lower, upper = float(stack.min()), float(stack.max())
+    for i, frame in enumerate(stack):
+        fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+        fm.raster_cont(np.asarray(frame), ax=ax, lower=lower, upper=upper)
+        fig.savefig(os.path.join(out_dir, "loop-{:04d}.png".format(i)))
+        plt.close(fig)
+    return timeit.default_timer() - start
+
+def export_seconds(stack, out_dir, n_workers):
+    # Time, and peak memory allocated by this process in a separate run,
+    # as tracing slows down allocations.
+    start = timeit.default_timer()
+    export_frames(stack, out_dir, n_workers=n_workers)
+    seconds = timeit.default_timer() - start
+
+    tracemalloc.start()
+    export_frames(stack, out_dir, n_workers=n_workers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+def bench_animation(n_frames=30):
+    with tempfile.TemporaryDirectory() as out_dir:
+        stack = make_stack(os.path.join(out_dir, "stack.dat"), n_frames)
+        frame_mb = stack[0].nbytes / 1e6
+        print("{} frames of {:.1f} MB".format(n_frames, frame_mb))
+        print("{:>16} {:>12} {:>12} {:>14}".format(
+            "renderer", "seconds", "frames/s", "peak (MB)"))
+
+        seconds = loop_seconds(stack, out_dir)
+        print("{:>16} {:>12.3f} {:>12.1f} {:>14}".format(
+            "pyplot loop", seconds, n_frames / seconds, ""))
+
+        for n_workers in sorted({1, os.cpu_count() or 1}):
+            seconds, peak = export_seconds(stack, out_dir, n_workers)
+            print("{:>16} {:>12.3f} {:>12.1f} {:>14.1f}".format(
+                "{} worker(s)".format(n_workers),
+                seconds,
+                n_frames / seconds,
+                peak / 1e6))
+
+
+if __name__ == "__main__":
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    bench_animation(n_frames)
@@ -0,0 +1,60 @@
+"""Benchmark rendering many maps to files.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+maps to render:
+
+    $ python benchmarks/bench_batch.py 200
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+from fieldmaps.batch import Job, render_many  # noqa: E402
+
+
+def make_jobs(n_maps, shape=(200, 200), seed=13):
+    # One continuous raster per field.
+    rs = np.random.RandomState(seed=seed)
+    return [
+        Job("raster_cont", (rs.normal(size=shape),), "{}.png".format(i))
+        for i in range(n_maps)
+    ]
+
+def loop_seconds(jobs, out_dir):
+    # Rendering in a loop through pyplot, as done without a batch.
+    start = timeit.default_timer()
+    for job in jobs:
+        fig, ax = plt.subplots(figsize=job.figsize, dpi=job.dpi)
+        fm.raster_cont(*job.args, ax=ax, **job.kwargs)
+        fig.savefig(os.path.join(out_dir, job.path))
+        plt.close(fig)
+    return timeit.default_timer() - start
+
+def bench_batch(n_maps=100):
+    jobs = make_jobs(n_maps)
+    print("{:>16} {:>12} {:>12}".format("renderer", "seconds", "maps/s"))
+    with tempfile.TemporaryDirectory() as out_dir:
+        seconds = loop_seconds(jobs, out_dir)
+        print("{:>16} {:>12.3f} {:>12.1f}".format(
+            "pyplot loop", seconds, n_maps / seconds))
+
+        for n_workers in sorted({1, os.cpu_count() or 1}):
+            report = render_many(jobs, out_dir, n_workers)
+            print("{:>16} {:>12.3f} {:>12.1f}".format(
+                "{} worker(s)".format(n_workers),
+                report.seconds,
+                report.maps_per_second))
+
+
+if __name__ == "__main__":
+    n_maps = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100
+    bench_batch(n_maps)
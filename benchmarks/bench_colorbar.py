@@ -0,0 +1,52 @@
+"""Benchmark colorbars of small maps.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+maps to render:
+
+    $ python benchmarks/bench_colorbar.py 100
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def render_seconds(fn, layers, **kwds):
+    # Time to plot and draw a small map of each layer.
+    start = timeit.default_timer()
+    for layer in layers:
+        fig, ax = plt.subplots(figsize=(3, 3), dpi=100)
+        fn(layer, ax=ax, **kwds)
+        fig.canvas.draw()
+        plt.close(fig)
+    return timeit.default_timer() - start
+
+def bench_colorbar(n_maps=100):
+    rs = np.random.RandomState(seed=13)
+    layers = [rs.normal(size=(50, 50)) for _ in range(n_maps)]
+    zones = [(layer > 0).astype(int) for layer in layers]
+    # Limits shared across maps, so that light colorbars are reused.
+    kinds = [
+        ("continuous", fm.raster_cont, layers, {"lower": -3, "upper": 3}),
+        ("discrete", fm.raster_discrete, zones, {}),
+    ]
+
+    print("{:>12} {:>10} {:>12} {:>10}".format(
+        "data", "colorbar", "seconds", "maps/s"))
+    for name, fn, data, kwds in kinds:
+        for colorbar in (True, "light", False):
+            seconds = render_seconds(fn, data, colorbar=colorbar, **kwds)
+            print("{:>12} {:>10} {:>12.3f} {:>10.1f}".format(
+                name, str(colorbar), seconds, n_maps / seconds))
+
+
+if __name__ == "__main__":
+    n_maps = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    bench_colorbar(n_maps)
@@ -0,0 +1,63 @@
+"""Benchmark coloring large rasters into RGBA pixels.
+
+Compares the lookup table of `fieldmaps.colorize` with drawing the raster
+through `raster_cont`, on a figure with a pixel per cell, and reading back
+its pixels. Run as a script with fieldmaps installed, optionally giving
+the size of the square raster:
+
+    $ python benchmarks/bench_colorize.py 4000
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+from fieldmaps.colorize import colorize_cont, colorize_discrete  # noqa: E402
+from fieldmaps.render import draw  # noqa: E402
+
+
+def draw_seconds(fn, data):
+    # Draw the raster alone, filling a figure with a pixel per cell.
+    start = timeit.default_timer()
+    rows, cols = data.shape
+    size = (cols / 100, rows / 100)
+    fig = draw(fn, (data,), {"colorbar": False}, size=size, dpi=100)
+    fig.axes[0].set_axis_off()
+    fig.subplots_adjust(0, 0, 1, 1)
+    fig.canvas.draw()
+    np.asarray(fig.canvas.buffer_rgba())
+    return timeit.default_timer() - start
+
+def colorize_seconds(fn, data, out):
+    start = timeit.default_timer()
+    fn(data, out=out)
+    return timeit.default_timer() - start
+
+def bench_colorize(size=4000):
+    rs = np.random.RandomState(seed=13)
+    data = rs.normal(size=(size, size))
+    data[rs.rand(size, size) < .01] = np.nan
+    zones = rs.randint(8, size=(size, size))
+    out = np.empty((size, size, 4), dtype=np.uint8)
+
+    print("{:>12} {:>12} {:>12} {:>10}".format(
+        "data", "draw s", "colorize s", "speedup"))
+    kinds = [
+        ("continuous", fm.raster_cont, colorize_cont, data),
+        ("discrete", fm.raster_discrete, colorize_discrete, zones),
+    ]
+    for name, plot, colorize, values in kinds:
+        drawn = draw_seconds(plot, values)
+        colored = colorize_seconds(colorize, values, out)
+        print("{:>12} {:>12.3f} {:>12.3f} {:>10.1f}".format(
+            name, drawn, colored, drawn / colored))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    bench_colorize(size)
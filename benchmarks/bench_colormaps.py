@@ -0,0 +1,56 @@
+"""Benchmark looking up colormaps for many small maps in one worker.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+maps:
+
+    $ python benchmarks/bench_colormaps.py 2000
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from fieldmaps.colorize import colorize_cont, colorize_discrete
+from fieldmaps.utils import DataContainer
+
+
+def make_layers(n_maps, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    layers = [rs.normal(size=(64, 64)) for _ in range(n_maps)]
+    zones = [rs.randint(1 + i % 8, size=(64, 64)) for i in range(n_maps)]
+    return layers, zones
+
+def containers(layers, zones):
+    for layer, zone in zip(layers, zones):
+        DataContainer.from_continuous(layer, "YlGn")
+        DataContainer.from_discrete(zone, "tab20_woven")
+
+def colorized(layers, zones):
+    for layer, zone in zip(layers, zones):
+        colorize_cont(layer, "YlGn")
+        colorize_discrete(zone, "tab20_woven")
+
+def bench_colormaps(n_maps=2000):
+    layers, zones = make_layers(n_maps)
+    print("{:>12} {:>10} {:>12} {:>12}".format(
+        "step", "seconds", "us/map", "alloc MB"))
+    for name, fn in (("containers", containers), ("colorize", colorized)):
+        fn(layers[:10], zones[:10])
+        start = timeit.default_timer()
+        fn(layers, zones)
+        seconds = timeit.default_timer() - start
+
+        # Memory is traced in a separate run, as tracing slows it down.
+        tracemalloc.start()
+        fn(layers, zones)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("{:>12} {:>10.3f} {:>12.1f} {:>12.2f}".format(
+            name, seconds, 1e6 * seconds / n_maps, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    n_maps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    bench_colormaps(n_maps)
@@ -0,0 +1,76 @@
+"""Benchmark the memory used to draw continuous data of compact types,
+checking that it isn't converted to float64 along the way.
+
+Run as a script with fieldmaps installed, optionally giving the side of
+the rasters in cells:
+
+    $ python benchmarks/bench_dtypes.py 4000
+"""
+
+import sys
+import tracemalloc
+
+import matplotlib
+matplotlib.use("agg")
+
+import numpy as np  # noqa: E402
+
+from fieldmaps.render import draw  # noqa: E402
+
+
+def make_layers(side, seed=13):
+    # A raster, and points taking values from it, in float64.
+    rs = np.random.RandomState(seed=seed)
+    raster = rs.normal(scale=100, size=(side, side))
+    raster[rs.uniform(size=raster.shape) < .01] = np.nan
+    points = raster.ravel()[::16].copy()
+    coords = rs.uniform(size=(len(points), 2))
+    return {
+        "raster": ("raster_cont", (raster,), {}),
+        "pyramid": ("raster_cont", (raster,), {"pyramid": True}),
+        "points": ("point_cont", (points, coords), {}),
+    }
+
+def as_type(args, dtype):
+    # Arguments with the values (the first) as another type.
+    values = args[0]
+    if np.dtype(dtype).kind in "iu":
+        values = np.nan_to_num(values).astype(dtype)
+    else:
+        values = values.astype(dtype)
+    return (values,) + args[1:]
+
+def peak_bytes(fn, args, kwargs):
+    # Peak memory traced while drawing a map, after a first draw so that
+    # caches are warm.
+    draw(fn, args, kwargs, size=(4, 4)).canvas.draw()
+    tracemalloc.start()
+    draw(fn, args, kwargs, size=(4, 4)).canvas.draw()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def bench_dtypes(side=2000):
+    print("{:>10} {:>10} {:>12} {:>12}".format(
+        "layer", "dtype", "values MB", "peak MB"))
+    for name, (fn, args, kwargs) in make_layers(side).items():
+        reference = peak_bytes(fn, args, kwargs)
+        print("{:>10} {:>10} {:>12.1f} {:>12.1f}".format(
+            name, "float64", args[0].nbytes / 2 ** 20, reference / 2 ** 20))
+        for dtype in (np.float32, np.int16):
+            compact = as_type(args, dtype)
+            peak = peak_bytes(fn, compact, kwargs)
+            print("{:>10} {:>10} {:>12.1f} {:>12.1f}".format(
+                name,
+                np.dtype(dtype).name,
+                compact[0].nbytes / 2 ** 20,
+                peak / 2 ** 20))
+
+            # A float64 copy of the values would take up at least half of
+            # the memory saved by the compact type.
+            assert peak < reference - args[0].nbytes / 2, (name, dtype)
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    bench_dtypes(side)
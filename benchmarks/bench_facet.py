@@ -0,0 +1,60 @@
+"""Benchmark small multiples of many fields.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+panels:
+
+    $ python benchmarks/bench_facet.py 24
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def make_layers(n_panels, shape=(200, 200), seed=13):
+    rs = np.random.RandomState(seed=seed)
+    return [rs.normal(loc=i, size=shape) for i in range(n_panels)]
+
+def separate_seconds(layers):
+    # A map with its own colorbar in each panel.
+    start = timeit.default_timer()
+    ncols = int(np.ceil(np.sqrt(len(layers))))
+    nrows = -(-len(layers) // ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(3 * ncols, 3 * nrows))
+    for layer, ax in zip(layers, axes.flat):
+        fm.raster_cont(layer, ax=ax)
+    fig.canvas.draw()
+    seconds = timeit.default_timer() - start
+    plt.close(fig)
+    return seconds
+
+def facet_seconds(layers, fn=fm.facet_cont):
+    start = timeit.default_timer()
+    axes = fn(layers)
+    axes.flat[0].figure.canvas.draw()
+    seconds = timeit.default_timer() - start
+    plt.close(axes.flat[0].figure)
+    return seconds
+
+def bench_facet(n_panels=24):
+    layers = make_layers(n_panels)
+    hybrids = [
+        (layer > i).astype(int) + i % 3 for i, layer in enumerate(layers)
+    ]
+    print("{:>12} {:>14} {:>14}".format("panels", "separate (s)", "facet (s)"))
+    print("{:>12} {:>14.3f} {:>14.3f}".format(
+        n_panels, separate_seconds(layers), facet_seconds(layers)))
+    print("{:>12} {:>14} {:>14.3f}".format(
+        "discrete", "", facet_seconds(hybrids, fm.facet_discrete)))
+
+
+if __name__ == "__main__":
+    n_panels = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    bench_facet(n_panels)
@@ -0,0 +1,46 @@
+"""Benchmark the cold-start cost of importing fieldmaps.
+
+Each import is timed in a fresh interpreter, as for a short-lived command
+line or serverless render job, and compared with importing its
+dependencies alone. Run as a script with fieldmaps installed, optionally
+giving the number of runs:
+
+    $ python benchmarks/bench_import.py 10
+"""
+
+import statistics
+import subprocess
+import sys
+
+
+# Time an import in a fresh interpreter, and report whether pyplot was
+# loaded by it.
+_code = """
+import sys
+import timeit
+start = timeit.default_timer()
+import {}
+seconds = timeit.default_timer() - start
+print(seconds, "matplotlib.pyplot" in sys.modules)
+"""
+
+
+def import_seconds(module):
+    out = subprocess.run(
+        [sys.executable, "-c", _code.format(module)],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True).stdout
+    seconds, pyplot = out.split()
+    return float(seconds), pyplot == "True"
+
+def main(n_runs=10):
+    print("{:>20} {:>10} {:>10}".format("module", "seconds", "pyplot"))
+    for module in ("numpy", "matplotlib", "matplotlib.pyplot", "fieldmaps"):
+        runs = [import_seconds(module) for _ in range(n_runs)]
+        seconds = statistics.median(seconds for seconds, _ in runs)
+        pyplot = any(pyplot for _, pyplot in runs)
+        print("{:>20} {:>10.3f} {:>10}".format(module, seconds, str(pyplot)))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""Benchmark the encoding of discrete data.
+
+Run as a script with fieldmaps installed, optionally giving the largest
+number of cells to encode:
+
+    $ python benchmarks/bench_mapping.py 1e8
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from fieldmaps import mapping
+
+
+def make_raster(size, n_categories=12, masked=True, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    side = int(np.sqrt(size))
+    data = rs.randint(0, n_categories, size=(side, side)).astype(np.int32)
+    if not masked:
+        return data
+
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[:, :side // 10] = True
+    return np.ma.masked_array(data, mask)
+
+def bench_scaling(max_size=1e8):
+    print("{:>12} {:>12} {:>14}".format("cells", "seconds", "cells/second"))
+    for exponent in range(3, int(np.log10(max_size)) + 1):
+        data = make_raster(10 ** exponent)
+        number = max(1, int(1e6 / data.size))
+        seconds = timeit.timeit(
+            lambda: mapping.create_mapped(data),
+            number=number) / number
+        print("{:>12,} {:>12.5f} {:>14,.0f}".format(
+            data.size, seconds, data.size / seconds))
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_chunked(size=1e8, chunksize=2 ** 20):
+    # Encode a memory-mapped raster and compare the peak memory allocated
+    # with and without chunking. The output (2 bytes per cell) is written
+    # to another memory-mapped file in the chunked case.
+    side = int(np.sqrt(size))
+    with tempfile.TemporaryDirectory() as tmp:
+        data = np.memmap(
+            os.path.join(tmp, "raster.dat"),
+            dtype=np.int32,
+            mode="w+",
+            shape=(side, side))
+        for block in mapping.row_blocks(data.shape, chunksize):
+            data[block] = np.arange(data[block].size).reshape(
+                data[block].shape) % 12
+        out = np.memmap(
+            os.path.join(tmp, "codes.dat"),
+            dtype=mapping._dtype,
+            mode="w+",
+            shape=data.shape)
+
+        print("{:>12} {:>12} {:>14}".format("chunksize", "seconds", "peak MB"))
+        for chunks, kwds in ((None, {}),
+                             (chunksize, {"chunksize": chunksize, "out": out})):
+            start = timeit.default_timer()
+            peak = peak_memory(lambda: mapping.create_mapped(data, **kwds))
+            seconds = timeit.default_timer() - start
+            print("{:>12} {:>12.3f} {:>14.1f}".format(
+                str(chunks), seconds, peak / 1e6))
+
+def bench_parallel(size=1e8):
+    # Encode the same raster with an increasing number of threads, up to
+    # the number of CPUs.
+    data = make_raster(size)
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, *(2 ** i for i in range(cpus.bit_length())), cpus})
+
+    serial = None
+    print("{:>12} {:>12} {:>14}".format("n_jobs", "seconds", "speedup"))
+    for n_jobs in counts:
+        seconds = timeit.timeit(
+            lambda: mapping.create_mapped(data, n_jobs=n_jobs),
+            number=1)
+        serial = serial or seconds
+        print("{:>12} {:>12.3f} {:>14.2f}".format(
+            n_jobs, seconds, serial / seconds))
+
+
+if __name__ == "__main__":
+    max_size = float(sys.argv[1]) if len(sys.argv) > 1 else 1e7
+    bench_scaling(max_size)
+    bench_chunked(max_size)
+    bench_parallel(max_size)
@@ -0,0 +1,55 @@
+"""Benchmark masking missing values of large continuous rasters.
+
+Run as a script with fieldmaps installed, optionally giving the side of
+the rasters in cells:
+
+    $ python benchmarks/bench_mask.py 8000
+"""
+
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from fieldmaps.utils import DataContainer, mask
+
+
+def mask_before(data):
+    # Masking as done before the single pass, for comparison.
+    return np.ma.MaskedArray(data, np.isnan(data) | ~np.isfinite(data))
+
+def make_rasters(side, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    clean = rs.normal(size=(side, side))
+    holes = clean.copy()
+    holes[rs.uniform(size=holes.shape) < .05] = np.nan
+    masked = np.ma.masked_array(clean, clean < -2)
+    return {"clean": clean, "5% NaN": holes, "masked": masked}
+
+def bench_mask(side=4000):
+    rasters = make_rasters(side)
+    print("{:>10} {:>14} {:>10} {:>12}".format(
+        "raster", "masking", "seconds", "peak MB"))
+    steps = (
+        ("before", mask_before),
+        ("mask", mask),
+        ("container", lambda data: DataContainer.from_continuous(data, None)),
+    )
+    for name, raster in rasters.items():
+        for step, fn in steps:
+            fn(raster)
+            seconds = min(timeit.repeat(lambda: fn(raster), number=1, repeat=3))
+
+            # Memory is traced in a separate run, as tracing slows it down.
+            tracemalloc.start()
+            fn(raster)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print("{:>10} {:>14} {:>10.3f} {:>12.1f}".format(
+                name, step, seconds, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    bench_mask(side)
@@ -0,0 +1,50 @@
+"""Benchmark plotting the same large discrete layers again with memoized
+data.
+
+Run as a script with fieldmaps installed, optionally giving the side of
+the rasters in cells:
+
+    $ python benchmarks/bench_memo.py 4000
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from fieldmaps import memo
+from fieldmaps.utils import DataContainer
+
+
+def make_layers(side, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    zones = rs.randint(12, size=(side, side))
+    names = np.array(["wheat", "corn", "soy"])[rs.randint(3, size=zones.shape)]
+    return zones, names
+
+def build(zones, names):
+    DataContainer.from_discrete(zones, "tab20_woven")
+    DataContainer.from_discrete(names, "tab20_woven")
+
+def bench_memo(side=4000, repeats=5):
+    zones, names = make_layers(side)
+    print("{:>12} {:>10} {:>10}".format("memo", "first s", "repeat s"))
+    for enabled in (False, True):
+        if enabled:
+            memo.enable()
+        start = timeit.default_timer()
+        build(zones, names)
+        first = timeit.default_timer() - start
+        start = timeit.default_timer()
+        for _ in range(repeats):
+            build(zones, names)
+        repeat = (timeit.default_timer() - start) / repeats
+        print("{:>12} {:>10.3f} {:>10.3f}".format(
+            "on" if enabled else "off", first, repeat))
+    print(memo.stats())
+    memo.disable()
+
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    bench_memo(side)
@@ -0,0 +1,56 @@
+"""Benchmark rendering a nightly batch of maps again with an output cache,
+where only some of the fields have changed.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+maps to render:
+
+    $ python benchmarks/bench_outputs.py 200
+"""
+
+import sys
+import tempfile
+
+import matplotlib
+matplotlib.use("agg")
+
+import numpy as np  # noqa: E402
+
+from fieldmaps.batch import Job, render_many  # noqa: E402
+from fieldmaps.outputs import OutputCache  # noqa: E402
+
+
+def make_jobs(n_maps, changed=0., shape=(200, 200), seed=13):
+    # One continuous raster per field, of which a share has changed.
+    rs = np.random.RandomState(seed=seed)
+    jobs = []
+    for i in range(n_maps):
+        data = rs.normal(size=shape)
+        if i < changed * n_maps:
+            data = data + 1
+        jobs.append(Job("raster_cont", (data,), "{}.png".format(i)))
+    return jobs
+
+def bench_outputs(n_maps=100):
+    print("{:>16} {:>10} {:>10} {:>10}".format(
+        "run", "seconds", "maps/s", "cached"))
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = OutputCache(tmp + "/cache")
+        runs = (
+            ("no cache", 0., None),
+            ("cold cache", 0., cache),
+            ("10% changed", .1, cache),
+            ("unchanged", .1, cache),
+        )
+        for name, changed, run_cache in runs:
+            jobs = make_jobs(n_maps, changed)
+            report = render_many(jobs, tmp + "/out", 1, cache=run_cache)
+            print("{:>16} {:>10.3f} {:>10.1f} {:>10}".format(
+                name,
+                report.seconds,
+                report.maps_per_second,
+                report.n_cached))
+
+
+if __name__ == "__main__":
+    n_maps = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100
+    bench_outputs(n_maps)
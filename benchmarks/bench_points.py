@@ -0,0 +1,95 @@
+"""Benchmark drawing many points.
+
+Run as a script with fieldmaps installed, optionally giving the largest
+number of points to draw:
+
+    $ python benchmarks/bench_points.py 1e7
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def make_points(size, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    coords = rs.uniform(0, 1000, size=(int(size), 2))
+    data = np.hypot(*(coords.T - 500)) + rs.normal(size=len(coords))
+    return data, coords
+
+def render_seconds(fn, *args, **kwds):
+    # Time to plot and draw a figure.
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    start = timeit.default_timer()
+    fn(*args, ax=ax, **kwds)
+    fig.canvas.draw()
+    seconds = timeit.default_timer() - start
+    plt.close(fig)
+    return seconds
+
+def bench_aggregate(max_size=1e7, scatter_max_size=1e6):
+    print("{:>12} {:>12} {:>14}".format("points", "scatter (s)", "grid (s)"))
+    for exponent in range(3, int(np.log10(max_size)) + 1):
+        data, coords = make_points(10 ** exponent)
+        scatter = float("nan")
+        if len(data) <= scatter_max_size:
+            scatter = render_seconds(fm.point_cont, data, coords)
+        grid = render_seconds(
+            fm.point_cont,
+            data,
+            coords,
+            aggregate="mean",
+            resolution=2)
+        print("{:>12,} {:>12.3f} {:>14.3f}".format(len(data), scatter, grid))
+
+def bench_mode(max_size=1e7):
+    print("{:>12} {:>14}".format("points", "mode grid (s)"))
+    for exponent in range(3, int(np.log10(max_size)) + 1):
+        data, coords = make_points(10 ** exponent)
+        hybrids = np.array(["A", "B", "C", "D"])[(data // 100).astype(int) % 4]
+        grid = render_seconds(
+            fm.point_discrete,
+            hybrids,
+            coords,
+            aggregate="mode",
+            resolution=2)
+        print("{:>12,} {:>14.3f}".format(len(data), grid))
+
+def redraw_seconds(fn, *args, n=5, **kwds):
+    # Time to redraw a figure zoomed into a small part of the map.
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    fn(*args, ax=ax, **kwds)
+    fig.canvas.draw()
+    ax.set_xlim(100, 120)
+    ax.set_ylim(100, 120)
+    start = timeit.default_timer()
+    for _ in range(n):
+        fig.canvas.draw()
+    seconds = (timeit.default_timer() - start) / n
+    plt.close(fig)
+    return seconds
+
+def bench_cull(size=int(1e6)):
+    print("{:>12} {:>8} {:>12} {:>12}".format(
+        "features", "cull", "first (s)", "redraw (s)"))
+    for cull in (False, True):
+        data, coords = make_points(size)
+        args = (data, coords)
+        first = render_seconds(fm.point_cont, *args, cull=cull)
+        redraw = redraw_seconds(fm.point_cont, *args, cull=cull)
+        print("{:>12,} {:>8} {:>12.3f} {:>12.3f}".format(
+            len(data), str(cull), first, redraw))
+
+
+if __name__ == "__main__":
+    max_size = float(sys.argv[1]) if len(sys.argv) > 1 else 1e6
+    bench_aggregate(max_size)
+    bench_mode(max_size)
+    bench_cull()
@@ -0,0 +1,115 @@
+"""Benchmark drawing many polygons.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+polygons to draw:
+
+    $ python benchmarks/bench_polys.py 200000
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def make_parcels(size, n_vertices=12, seed=13):
+    # Closed, roughly circular rings laid out on a square lattice, as a
+    # flat coordinate buffer with offsets.
+    rs = np.random.RandomState(seed=seed)
+    side = int(np.ceil(np.sqrt(size)))
+    centers = np.stack(np.divmod(np.arange(size), side), axis=1).astype(float)
+    angles = np.linspace(0, 2 * np.pi, n_vertices)
+    ring = .4 * np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    coords = (centers[:, None, :] + ring).reshape(-1, 2)
+    offsets = np.arange(0, len(coords) + 1, n_vertices)
+    return rs.normal(size=size), coords, offsets
+
+def render_seconds(fn, *args, **kwds):
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    start = timeit.default_timer()
+    fn(*args, ax=ax, **kwds)
+    fig.canvas.draw()
+    seconds = timeit.default_timer() - start
+    plt.close(fig)
+    return seconds
+
+def bench_flat(size=200000):
+    data, coords, offsets = make_parcels(size)
+    verts = [coords[i:j] for i, j in zip(offsets[:-1], offsets[1:])]
+
+    print("{:>12} {:>16} {:>16}".format(
+        "polygons", "list (s)", "flat (s)"))
+    print("{:>12,} {:>16.3f} {:>16.3f}".format(
+        size,
+        render_seconds(fm.poly_cont, data, verts),
+        render_seconds(fm.poly_cont, data, coords, offsets=offsets)))
+
+def bench_simplify(size=1000, n_vertices=5000):
+    # Densely sampled boundaries, as recorded by RTK-guided equipment.
+    data, coords, offsets = make_parcels(size, n_vertices=n_vertices)
+    polygons = fm.Polygons(coords, offsets)
+
+    print("{:>12} {:>12} {:>12} {:>12}".format(
+        "simplify", "vertices", "first (s)", "again (s)"))
+    for simplify in (False, True):
+        first = render_seconds(
+            fm.poly_cont, data, polygons, simplify=simplify)
+        again = render_seconds(
+            fm.poly_cont, data, polygons, simplify=simplify)
+        vertices = len(polygons.coords)
+        if simplify:
+            vertices = max(
+                len(simplified.coords)
+                for simplified in polygons.simplified.values())
+        print("{:>12} {:>12,} {:>12.3f} {:>12.3f}".format(
+            str(simplify), vertices, first, again))
+
+def bench_burn(sizes=(10000, 100000, 1000000)):
+    print("{:>12} {:>16} {:>16}".format(
+        "polygons", "vector (s)", "burn (s)"))
+    for size in sizes:
+        data, coords, offsets = make_parcels(size)
+        vector = render_seconds(
+            fm.poly_cont, data, coords, offsets=offsets)
+        burn = render_seconds(
+            fm.poly_cont, data, coords, offsets=offsets, burn=True)
+        print("{:>12,} {:>16.3f} {:>16.3f}".format(size, vector, burn))
+
+def redraw_seconds(fn, *args, n=5, **kwds):
+    # Time to redraw a figure zoomed into a small part of the map.
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    fn(*args, ax=ax, **kwds)
+    fig.canvas.draw()
+    ax.set_xlim(100, 120)
+    ax.set_ylim(100, 120)
+    start = timeit.default_timer()
+    for _ in range(n):
+        fig.canvas.draw()
+    seconds = (timeit.default_timer() - start) / n
+    plt.close(fig)
+    return seconds
+
+def bench_cull(size=200000):
+    print("{:>12} {:>8} {:>12} {:>12}".format(
+        "features", "cull", "first (s)", "redraw (s)"))
+    for cull in (False, True):
+        data, coords, offsets = make_parcels(size)
+        args = (data, fm.Polygons(coords, offsets))
+        first = render_seconds(fm.poly_cont, *args, cull=cull)
+        redraw = redraw_seconds(fm.poly_cont, *args, cull=cull)
+        print("{:>12,} {:>8} {:>12.3f} {:>12.3f}".format(
+            len(data), str(cull), first, redraw))
+
+
+if __name__ == "__main__":
+    size = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100000
+    bench_flat(size)
+    bench_simplify()
+    bench_burn()
+    bench_cull()
@@ -0,0 +1,46 @@
+"""Benchmark drawing large rasters.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+rows (and columns) of the raster:
+
+    $ python benchmarks/bench_raster.py 8000
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def draw_seconds(fig, number=3):
+    # Average time to draw the figure, after a first draw.
+    fig.canvas.draw()
+    return timeit.timeit(fig.canvas.draw, number=number) / number
+
+def bench_pyramid(side=8000):
+    rs = np.random.RandomState(seed=13)
+    data = rs.normal(size=(side, side)).astype(np.float32)
+    labels = (data > 0).astype(np.int32) + (data > 1)
+
+    print("{:>20} {:>10} {:>12} {:>12}".format(
+        "function", "pyramid", "build (s)", "draw (s)"))
+    for fn, raster in ((fm.raster_cont, data), (fm.raster_discrete, labels)):
+        for pyramid in (False, True):
+            fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+            start = timeit.default_timer()
+            fn(raster, ax=ax, pyramid=pyramid)
+            build = timeit.default_timer() - start
+            print("{:>20} {:>10} {:>12.3f} {:>12.3f}".format(
+                fn.__name__, str(pyramid), build, draw_seconds(fig)))
+            plt.close(fig)
+
+
+if __name__ == "__main__":
+    side = int(float(sys.argv[1])) if len(sys.argv) > 1 else 4000
+    bench_pyramid(side)
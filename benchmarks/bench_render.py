@@ -0,0 +1,84 @@
+"""Benchmark the latency of rendering maps to PNG bytes.
+
+Compares `render_png`, which draws on a bare Agg figure, with plotting
+through pyplot as an interactive session would. Run as a script with
+fieldmaps installed, optionally giving the number of requests:
+
+    $ python benchmarks/bench_render.py 100
+"""
+
+import io
+import statistics
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def pyplot_png(kind, data, geometry=None, size=(4, 4), dpi=100):
+    # Render through pyplot's figure manager and current axes.
+    args = (data,) if geometry is None else (data, geometry)
+    fig = plt.figure(figsize=size, dpi=dpi)
+    getattr(fm, kind)(*args)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+def direct_png(kind, data, geometry=None, size=(4, 4), dpi=100):
+    return fm.render_png(kind, data, geometry, size=size, dpi=dpi)
+
+def latencies(render, requests):
+    seconds = []
+    for kind, data, geometry in requests:
+        start = timeit.default_timer()
+        render(kind, data, geometry)
+        seconds.append(timeit.default_timer() - start)
+    return seconds
+
+def make_requests(n_requests, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    side = np.arange(21.)
+    x, y = np.meshgrid(side, side)
+    corners = np.stack([x, y], axis=-1)
+    verts = np.stack([
+        corners[:-1, :-1], corners[1:, :-1],
+        corners[1:, 1:], corners[:-1, 1:],
+    ], axis=2).reshape(-1, 4, 2)
+    kinds = [
+        ("raster_cont", lambda: rs.normal(size=(100, 100)), None),
+        ("raster_discrete", lambda: rs.randint(5, size=(100, 100)), None),
+        ("poly_cont", lambda: rs.normal(size=len(verts)), verts),
+    ]
+    return [
+        (kind, make(), geometry)
+        for kind, make, geometry in kinds
+        for _ in range(n_requests)
+    ]
+
+def bench_render(n_requests=100):
+    requests = make_requests(n_requests)
+    # Warm up the caches and imports of both paths.
+    latencies(direct_png, requests[:1])
+    latencies(pyplot_png, requests[:1])
+
+    print("{:>16} {:>8} {:>12} {:>12}".format(
+        "kind", "path", "median ms", "p95 ms"))
+    for kind in ("raster_cont", "raster_discrete", "poly_cont"):
+        subset = [request for request in requests if request[0] == kind]
+        for name, render in (("pyplot", pyplot_png), ("direct", direct_png)):
+            seconds = sorted(latencies(render, subset))
+            p95 = seconds[int(.95 * (len(seconds) - 1))]
+            print("{:>16} {:>8} {:>12.1f} {:>12.1f}".format(
+                kind, name, 1e3 * statistics.median(seconds), 1e3 * p95))
+
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    bench_render(n_requests)
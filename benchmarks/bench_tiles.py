@@ -0,0 +1,84 @@
+"""Benchmark serving a layer as XYZ tiles to a web map.
+
+A browser session is simulated as a series of viewports, each showing a
+block of 3x3 tiles at a random zoom and position. Serving each viewport
+by rendering the whole layer with `render_png` is compared with serving
+its tiles cold, from memory, and from disk after a restart. Run as a
+script with fieldmaps installed, optionally giving the number of
+viewports and the size of the square raster:
+
+    $ python benchmarks/bench_tiles.py 50 4000
+"""
+
+import sys
+import tempfile
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+from fieldmaps.tiles import TileSet  # noqa: E402
+
+
+def make_viewports(n_viewports, seed=13):
+    rs = np.random.RandomState(seed=seed)
+    viewports = []
+    for _ in range(n_viewports):
+        z = rs.randint(2, 6)
+        x0, y0 = rs.randint(0, 2 ** z - 2, size=2)
+        viewports.append([
+            (z, x, y) for x in range(x0, x0 + 3) for y in range(y0, y0 + 3)
+        ])
+    return viewports
+
+def serve_seconds(tiles, viewports):
+    start = timeit.default_timer()
+    for viewport in viewports:
+        for z, x, y in viewport:
+            tiles.tile(z, x, y)
+    return timeit.default_timer() - start
+
+def whole_seconds(data, viewports):
+    start = timeit.default_timer()
+    for _ in viewports:
+        fm.render_png("raster_cont", data, size=(7.68, 7.68), dpi=100)
+    return timeit.default_timer() - start
+
+def bench_tiles(n_viewports=50, size=4000):
+    rs = np.random.RandomState(seed=13)
+    data = rs.normal(size=(size, size)).cumsum(axis=0)
+    viewports = make_viewports(n_viewports)
+
+    print("{:>14} {:>10} {:>12} {:>10} {:>10}".format(
+        "serving", "seconds", "viewports/s", "hit rate", "tiles/s"))
+
+    def report(name, seconds, count, stats=None):
+        stats = stats or {}
+        # The stats are None when nothing was requested or rendered.
+        hit_rate = stats.get("hit_rate")
+        rendered = stats.get("tiles_per_second")
+        hit_rate = float("nan") if hit_rate is None else hit_rate
+        rendered = float("nan") if rendered is None else rendered
+        print("{:>14} {:>10.3f} {:>12.1f} {:>10.2f} {:>10.1f}".format(
+            name, seconds, count / seconds, hit_rate, rendered))
+
+    report("whole layer", whole_seconds(data, viewports), n_viewports)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = timeit.default_timer()
+        tiles = TileSet("raster", data, cache_dir=cache_dir, name="ndvi")
+        print("Set up the tiles in {:.3f}s".format(
+            timeit.default_timer() - start))
+        # Each viewport is requested twice, as when panning back.
+        seconds = serve_seconds(tiles, viewports + viewports)
+        report("tiles", seconds, 2 * n_viewports, tiles.stats())
+
+        restarted = TileSet("raster", data, cache_dir=cache_dir, name="ndvi")
+        seconds = serve_seconds(restarted, viewports)
+        report("tiles (disk)", seconds, n_viewports, restarted.stats())
+
+
+if __name__ == "__main__":
+    bench_tiles(*map(int, sys.argv[1:]))
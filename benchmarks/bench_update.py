@@ -0,0 +1,76 @@
+"""Benchmark updating the data of a map, as for frames of a time series.
+
+Run as a script with fieldmaps installed, optionally giving the number of
+frames to draw:
+
+    $ python benchmarks/bench_update.py 20
+"""
+
+import sys
+import timeit
+
+import matplotlib
+matplotlib.use("agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+import fieldmaps as fm  # noqa: E402
+
+
+def make_frames(n_frames, size, seed=13):
+    # Values drifting from frame to frame, as for daily NDVI.
+    rs = np.random.RandomState(seed=seed)
+    return np.cumsum(rs.normal(size=(n_frames,) + size), axis=0)
+
+def make_squares(size):
+    side = int(np.ceil(np.sqrt(size)))
+    corners = np.stack(np.divmod(np.arange(size), side), axis=1)
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]) * .9
+    return (corners[:, None, :] + square).astype(float)
+
+def replot_seconds(frames, fn, *args, **kwds):
+    # Time per frame when each frame is plotted from scratch.
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    start = timeit.default_timer()
+    for frame in frames:
+        fig.clear()
+        ax = fig.add_subplot(1, 1, 1)
+        fn(frame, *args, ax=ax, **kwds)
+        fig.canvas.draw()
+    seconds = (timeit.default_timer() - start) / len(frames)
+    plt.close(fig)
+    return seconds
+
+def update_seconds(frames, fn, *args, **kwds):
+    # Time per frame when the values of the first frame are updated.
+    fig, ax = plt.subplots(figsize=(6, 6), dpi=100)
+    handle = fn(frames[0], *args, ax=ax, handle=True, **kwds)
+    fig.canvas.draw()
+    start = timeit.default_timer()
+    for frame in frames:
+        handle.update(frame)
+        fig.canvas.draw()
+    seconds = (timeit.default_timer() - start) / len(frames)
+    plt.close(fig)
+    return seconds
+
+def bench_update(n_frames=10):
+    squares = make_squares(50000)
+    cases = [
+        ("raster", (1000, 1000), fm.raster_cont, ()),
+        ("polygons", (len(squares),), fm.poly_cont, (squares,)),
+    ]
+    print("{:>12} {:>14} {:>14}".format(
+        "map", "replot (s)", "update (s)"))
+    for name, size, fn, args in cases:
+        frames = make_frames(n_frames, size)
+        print("{:>12} {:>14.3f} {:>14.3f}".format(
+            name,
+            replot_seconds(frames, fn, *args),
+            update_seconds(frames, fn, *args)))
+
+
+if __name__ == "__main__":
+    n_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    bench_update(n_frames)
@@ -22,7 +22,7 @@ features = [
 status = [f["properties"]["Status"] for f in features]
 elevation = np.array([
     f["properties"]["Elevation"] for f in features
-], dtype=np.float)
+], dtype=float)
 
 xy = [feature["geometry"]["coordinates"] for feature in features]
 coords = np.asarray(xy)
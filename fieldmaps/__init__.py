@@ -1,5 +1,11 @@
+__version__ = "0.1.0"
+
+from .facet import facet_cont, facet_discrete
+from .geometry import Polygons
+from .handle import MapHandle
 from .points import point_cont, point_discrete
 from .polys import poly_cont, poly_discrete
 from .raster import raster_cont, raster_discrete
+from .render import render_png
 from .settings import apply_theme
 from . import settings
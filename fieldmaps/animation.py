@@ -0,0 +1,230 @@
+"""Export stacks of rasters as frame sequences and animations."""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import os
+import tempfile
+
+import numpy as np
+
+from .mapping import n_workers as count_workers
+from .stack import encode_frame, stack_categories, stack_range
+from .utils import pil_image
+
+
+# Frames submitted to the pool for each worker at a time, so that only a
+# few frames are in memory at once.
+_frames_per_worker = 2
+
+# Renderer of each worker process, set up by `start_worker`.
+_renderer = None
+
+
+class FrameRenderer(object):
+    """Draw frames of a stack onto a single figure and save them.
+
+    The map is drawn for the first frame, and its values are updated in
+    place for the following ones.
+
+    Parameters
+    ----------
+    discrete : bool
+        Whether the stack holds discrete data.
+    scale : pair of numerics or sequence
+        Color limits shared by all of the frames of continuous stacks, or
+        categories shared by all of the frames of discrete stacks.
+    out_dir : string
+        Directory in which the frames are saved.
+    pattern : string
+        Name of each frame, formatted with its index.
+    figsize : pair of numerics
+        Size of the figure in inches.
+    dpi : numeric
+        Resolution of the figure in dots per inch.
+    kwargs : dict
+        Keyword arguments to `raster_cont` or `raster_discrete`.
+    """
+
+    def __init__(self, discrete, scale, out_dir, pattern, figsize, dpi,
+                 kwargs):
+        self.discrete = discrete
+        self.scale = scale
+        self.out_dir = out_dir
+        self.pattern = pattern
+        self.figsize = figsize
+        self.dpi = dpi
+        self.kwargs = kwargs
+        self.handle = None
+
+    def draw(self, frame):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from .raster import raster_cont, raster_discrete
+
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+        if self.discrete:
+            kwargs = {**self.kwargs, "labels": self.scale}
+            return raster_discrete(frame, ax=ax, handle=True, **kwargs)
+
+        handle = raster_cont(frame, ax=ax, handle=True, **self.kwargs)
+        handle.artist.set_clim(*self.scale)
+        if handle.colorbar is not None:
+            handle.colorbar.update_normal(handle.artist)
+        return handle
+
+    def render(self, index, frame):
+        if self.discrete and "labels" not in self.kwargs:
+            frame = encode_frame(frame, self.scale)
+
+        if self.handle is None:
+            self.handle = self.draw(frame)
+        else:
+            self.handle.update(frame)
+
+        path = os.path.join(self.out_dir, self.pattern.format(index))
+        self.handle.ax.figure.savefig(path)
+        return path
+
+def start_worker(*args):
+    # Set up the renderer of a worker process, using a backend without a
+    # display.
+    global _renderer
+    import matplotlib
+    matplotlib.use("agg")
+    _renderer = FrameRenderer(*args)
+
+def render_frame(index, frame):
+    return index, _renderer.render(index, frame)
+
+def shared_scale(stack, discrete, kwargs):
+    # Color limits or categories shared by all of the frames of a stack.
+    if discrete:
+        labels = kwargs.get("labels")
+        return stack_categories(stack) if labels is None else tuple(labels)
+
+    vmin, vmax = stack_range(stack, kwargs.get("sentinel"))
+    lower, upper = kwargs.get("lower"), kwargs.get("upper")
+    return (
+        vmin if lower is None else lower,
+        vmax if upper is None else upper)
+
+def export_frames(stack, out_dir, discrete=False, pattern="frame-{:04d}.png", n_workers=None, figsize=(6, 6), dpi=100, **kwargs):  # noqa
+    """Save a map of each frame of a stack of rasters.
+
+    All of the frames share a color scale (or, for discrete data, their
+    categories and colors), found over the whole stack. Frames are
+    rendered and encoded in a pool of processes, each of which draws a
+    single map and updates its values for every frame it is given. Only
+    a few frames are read from the stack at a time, so it may be
+    memory-mapped.
+
+    Parameters
+    ----------
+    stack : array, shape (t, n, m)
+        Stack of rasters, e.g. one per date.
+    out_dir : string
+        Directory in which the frames are saved.
+    discrete : bool, optional
+        If True, the stack is plotted with `raster_discrete`, and with
+        `raster_cont` otherwise.
+    pattern : string, optional
+        Name of each frame, formatted with its index. The format is taken
+        from the extension.
+    n_workers : int, optional
+        Number of worker processes, where negative values count back
+        from the number of CPUs. If not provided, all of the CPUs are
+        used. With a single worker, frames are rendered in this process.
+    figsize : pair of numerics, optional
+        Size of the figure in inches.
+    dpi : numeric, optional
+        Resolution of the figure in dots per inch.
+    kwargs
+        Keyword arguments to be passed to `raster_cont` or
+        `raster_discrete` (e.g. `palette`, `lower` or `labels`).
+
+    Returns
+    -------
+    list of string
+        Paths of the frames, in order.
+    """
+
+    if stack.ndim != 3:
+        raise ValueError("`stack` must be a 3-dim array")
+
+    os.makedirs(out_dir, exist_ok=True)
+    scale = shared_scale(stack, discrete, kwargs)
+    args = (discrete, scale, out_dir, pattern, figsize, dpi, kwargs)
+    paths = [None] * len(stack)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    workers = count_workers(n_workers)
+    if workers == 1:
+        renderer = FrameRenderer(*args)
+        for i in range(len(stack)):
+            paths[i] = renderer.render(i, np.asanyarray(stack[i]))
+        return paths
+
+    def collect(futures):
+        for future in futures:
+            i, path = future.result()
+            paths[i] = path
+
+    pool = ProcessPoolExecutor(
+        workers,
+        initializer=start_worker,
+        initargs=args)
+    with pool as executor:
+        pending = set()
+        for i in range(len(stack)):
+            frame = np.asanyarray(stack[i])
+            pending.add(executor.submit(render_frame, i, frame))
+            if len(pending) >= workers * _frames_per_worker:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(wait(pending).done)
+    return paths
+
+def export_animation(stack, path, fps=4, **kwargs):
+    """Save an animated GIF of a stack of rasters.
+
+    The frames are rendered as with `export_frames`, and then joined
+    with Pillow, which holds all of them in memory while writing. For
+    long series, `export_frames` can be used with an external encoder
+    instead.
+
+    Parameters
+    ----------
+    stack : array, shape (t, n, m)
+        Stack of rasters, e.g. one per date.
+    path : string
+        Output file, which must end in ".gif".
+    fps : numeric, optional
+        Frames per second.
+    kwargs
+        Keyword arguments to be passed to `export_frames`.
+
+    Returns
+    -------
+    string
+        Path of the animation.
+    """
+
+    Image = pil_image()
+
+    if not path.lower().endswith(".gif"):
+        raise ValueError("Only GIF animations are supported")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        frames = export_frames(stack, out_dir, **kwargs)
+        images = (Image.open(frame) for frame in frames[1:])
+        with Image.open(frames[0]) as first:
+            first.save(
+                path,
+                save_all=True,
+                append_images=images,
+                duration=int(1000 / fps),
+                loop=0)
+    return path
@@ -0,0 +1,224 @@
+"""Render many maps to files in a pool of processes."""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import io
+import os
+import timeit
+import traceback
+
+from .cache import write_atomic
+from .mapping import n_workers as count_workers
+from .render import draw
+
+
+# Jobs submitted to the pool for each worker at a time, so that the data
+# of only a few jobs is held in memory at once.
+_jobs_per_worker = 2
+
+
+class Job(object):
+    """Specification of a map to be rendered.
+
+    Parameters
+    ----------
+    fn : string or callable
+        Name of a fieldmaps plotting function (e.g. "raster_cont"), or a
+        function taking `ax` as a keyword argument. Callables must be
+        importable by the workers (i.e. defined at the top level of a
+        module).
+    args : sequence
+        Positional arguments to `fn`, such as the data and geometry.
+    path : string
+        Output file, relative to the output directory. The format is
+        taken from the extension.
+    kwargs : dict, optional
+        Keyword arguments to `fn`.
+    figsize : pair of numerics, optional
+        Size of the figure in inches.
+    dpi : numeric, optional
+        Resolution of the figure in dots per inch.
+    """
+
+    def __init__(self, fn, args, path, kwargs=None, figsize=(6, 6), dpi=100):
+        self.fn = fn
+        self.args = tuple(args)
+        self.path = path
+        self.kwargs = kwargs or {}
+        self.figsize = figsize
+        self.dpi = dpi
+
+class Result(object):
+    """Outcome of rendering a job.
+
+    `error` holds the formatted traceback if rendering failed, and is
+    None otherwise. `cached` is True if the map was read from an output
+    cache instead of being drawn.
+    """
+
+    def __init__(self, job_id, path, seconds, error=None, cached=False):
+        self.job_id = job_id
+        self.path = path
+        self.seconds = seconds
+        self.error = error
+        self.cached = cached
+
+    @property
+    def ok(self):
+        return self.error is None
+
+class Report(object):
+    """Results of rendering a batch of jobs, in the order they
+    finished."""
+
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def n_done(self):
+        return sum(result.ok for result in self.results)
+
+    @property
+    def n_cached(self):
+        return sum(result.cached for result in self.results)
+
+    @property
+    def n_failed(self):
+        return len(self.results) - self.n_done
+
+    @property
+    def errors(self):
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def maps_per_second(self):
+        if self.seconds <= 0:
+            return float("nan")
+        return self.n_done / self.seconds
+
+def warm_up():
+    # Import the plotting machinery once per worker, using a backend
+    # without a display.
+    import matplotlib
+    matplotlib.use("agg")
+    import matplotlib.backends.backend_agg  # noqa: F401
+    from . import points, polys, raster  # noqa: F401
+
+def render_cached(job, path, cache):
+    # Copy a map from the cache to `path`, drawing and caching it if it's
+    # missing. Returns whether it was cached.
+    format = os.path.splitext(path)[1][1:].lower() or "png"
+    key = cache.key(
+        job.fn,
+        job.args,
+        job.kwargs,
+        job.figsize,
+        job.dpi,
+        format)
+    content = cache.get(key, format)
+    cached = content is not None
+    if not cached:
+        fig = draw(job.fn, job.args, job.kwargs, job.figsize, job.dpi)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=format)
+        content = cache.put(key, buffer.getvalue(), format)
+    write_atomic(path, content)
+    return cached
+
+def render_job(job_id, job, out_dir, cache=None):
+    # Draw a job on its own figure, without going through the global
+    # state of pyplot, and save it.
+    path = os.path.join(out_dir, job.path)
+    start = timeit.default_timer()
+    cached = False
+    try:
+        if cache is not None:
+            cached = render_cached(job, path, cache)
+        else:
+            fig = draw(job.fn, job.args, job.kwargs, job.figsize, job.dpi)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            fig.savefig(path)
+    except Exception:
+        error = traceback.format_exc()
+    else:
+        error = None
+    seconds = timeit.default_timer() - start
+    return Result(job_id, path, seconds, error, cached)
+
+def render_iter(jobs, out_dir, n_workers=None, cache=None):
+    """Render maps, yielding the result of each job as it finishes.
+
+    Takes the same arguments as `render_many`. Results may come out of
+    order when using more than one worker; each gives the position of
+    its job as `job_id`.
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = enumerate(jobs)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    workers = count_workers(n_workers)
+
+    # A single worker renders in this process, leaving its backend as is.
+    if workers == 1:
+        for job_id, job in jobs:
+            yield render_job(job_id, job, out_dir, cache)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=warm_up) as executor:
+        pending = set()
+        for job_id, job in jobs:
+            pending.add(executor.submit(
+                render_job,
+                job_id,
+                job,
+                out_dir,
+                cache))
+            if len(pending) >= workers * _jobs_per_worker:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+
+def render_many(jobs, out_dir, n_workers=None, callback=None, cache=None):
+    """Render maps to files in a pool of processes.
+
+    Each worker imports matplotlib once and draws each map on its own
+    figure, without using the global state of pyplot. Errors raised by
+    a job are recorded in its result rather than stopping the batch.
+
+    Parameters
+    ----------
+    jobs : iterable of Job
+        Maps to be rendered. Jobs are taken from the iterable as
+        workers become free, so it may be a generator.
+    out_dir : string
+        Directory in which the maps are saved.
+    n_workers : int, optional
+        Number of worker processes, where negative values count back
+        from the number of CPUs. If not provided, all of the CPUs are
+        used. With a single worker, jobs are rendered in this process.
+    callback : callable, optional
+        Called with each `Result` as it finishes, e.g. to show progress
+        or log errors.
+    cache : OutputCache, optional
+        Cache of rendered maps, which may be shared with other batches.
+        Maps found in the cache are copied to `out_dir` without being
+        drawn, and others are added to it.
+
+    Returns
+    -------
+    Report
+        Results of all of the jobs, along with the throughput in maps
+        per second.
+    """
+
+    start = timeit.default_timer()
+    results = []
+    for result in render_iter(jobs, out_dir, n_workers, cache):
+        results.append(result)
+        if callback is not None:
+            callback(result)
+    return Report(results, timeit.default_timer() - start)
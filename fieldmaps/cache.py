@@ -0,0 +1,139 @@
+"""Bounded caches."""
+
+from collections import OrderedDict
+
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+
+def update_hash(h, part):
+    # Feed a value to a hash: arrays by their contents, sequences and
+    # mappings item by item, and other values by their representation.
+    if isinstance(part, np.ma.MaskedArray):
+        update_hash(h, np.ma.getdata(part))
+        update_hash(h, np.ma.getmaskarray(part))
+    elif isinstance(part, np.ndarray) and part.dtype.hasobject:
+        # The bytes of arrays of objects are only pointers.
+        h.update(str(part.shape).encode())
+        update_hash(h, part.tolist())
+    elif isinstance(part, np.ndarray):
+        part = np.ascontiguousarray(part)
+        h.update(str((part.dtype.str, part.shape)).encode())
+        h.update(part.view(np.uint8).ravel())
+    elif isinstance(part, (list, tuple)):
+        h.update("{}[{}]".format(type(part).__name__, len(part)).encode())
+        for item in part:
+            update_hash(h, item)
+    elif isinstance(part, dict):
+        h.update("dict[{}]".format(len(part)).encode())
+        for key in sorted(part, key=repr):
+            update_hash(h, key)
+            update_hash(h, part[key])
+    else:
+        h.update(repr(part).encode())
+
+def content_hash(*parts):
+    # Hash of the contents of arrays, along with the representation of
+    # other values. SHA-1 is used for its speed, since the hashes are only
+    # keys and versions, not signatures.
+    h = hashlib.sha1()
+    for part in parts:
+        update_hash(h, part)
+    return h.hexdigest()
+
+def write_atomic(path, content):
+    # Write a file under a temporary name and then move it into place, so
+    # that readers never see part of a file.
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    handle, temp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(content)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+class LRUCache(object):
+    """Hold up to `maxsize` items, dropping the least recently used
+    first, and count hits and misses.
+
+    Parameters
+    ----------
+    maxsize : int
+        Largest number of items held or, if `weigh` is given, largest
+        total weight of the items.
+    weigh : callable, optional
+        Weight of an item, such as its size in bytes. Items heavier than
+        `maxsize` aren't held at all.
+    """
+
+    def __init__(self, maxsize, weigh=None):
+        self.maxsize = maxsize
+        self.weigh = weigh
+        self.items = OrderedDict()
+        self.weights = {}
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        weight = 1 if self.weigh is None else self.weigh(value)
+        with self.lock:
+            self.weight += weight - self.weights.get(key, 0)
+            self.items[key] = value
+            self.weights[key] = weight
+            self.items.move_to_end(key)
+            while self.weight > self.maxsize:
+                oldest, _ = self.items.popitem(last=False)
+                self.weight -= self.weights.pop(oldest)
+        return value
+
+    def get_or_create(self, key, create):
+        # Value held for `key`, created by calling `create` if missing.
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, create())
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.weights.clear()
+            self.weight = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.items),
+            "maxsize": self.maxsize,
+        }
+        if self.weigh is not None:
+            stats["weight"] = self.weight
+        return stats
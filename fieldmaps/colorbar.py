@@ -0,0 +1,161 @@
+"""Lightweight colorbars drawn from cached images and tick layouts."""
+
+from matplotlib import rcParams
+from matplotlib.colors import BoundaryNorm
+from matplotlib.image import BboxImage
+from matplotlib.patches import Rectangle
+from matplotlib.ticker import MaxNLocator
+from matplotlib.transforms import Bbox, TransformedBbox
+
+import numpy as np
+
+from .cache import LRUCache
+
+
+# Position of a colorbar relative to its axes, as (x, y, width, height).
+_bounds = (1.04, 0., .04, 1.)
+
+# Number of colors in the gradient of a continuous colorbar.
+_gradient_size = 256
+
+# Number of colorbar layouts kept.
+_cache_size = 128
+
+# Layouts shared by all colorbars, keyed on colormap, norm and labels.
+layouts = LRUCache(_cache_size)
+
+
+def colormap_key(colormap):
+    # Colormaps are identified by their colors rather than their name,
+    # which different colormaps may share (e.g. "custom" by default).
+    colors = colormap(np.arange(colormap.N), bytes=True)
+    return (colormap.N, colors.tobytes())
+
+def norm_key(norm):
+    if isinstance(norm, BoundaryNorm):
+        return ("boundary", tuple(np.asarray(norm.boundaries).tolist()))
+    return (type(norm).__name__, norm.vmin, norm.vmax)
+
+class Layout(object):
+    """Image and ticks of a colorbar."""
+
+    def __init__(self, image, extent, ticks, ticklabels):
+        self.image = image
+        self.extent = extent
+        self.ticks = ticks
+        self.ticklabels = ticklabels
+
+    @classmethod
+    def from_norm(cls, colormap, norm, ticklabels=None):
+        if isinstance(norm, BoundaryNorm):
+            # A block of color for each category, labelled in its middle.
+            bounds = np.asarray(norm.boundaries, dtype=float)
+            colors = colormap(norm(bounds[:-1]))
+            ticks = bounds[:-1] + np.diff(bounds) / 2
+            # Labels which don't match the categories (e.g. before the
+            # labels of new categories are set) are replaced by codes.
+            if ticklabels is None or len(ticklabels) != len(ticks):
+                ticklabels = ["{:g}".format(tick) for tick in bounds[:-1]]
+        else:
+            # Norms which were never scaled (e.g. with only missing data)
+            # are shown over [0, 1].
+            vmin, vmax = norm.vmin, norm.vmax
+            if vmin is None or vmax is None:
+                vmin, vmax = 0., 1.
+            bounds = np.array([vmin, vmax], dtype=float)
+            values = np.linspace(vmin, vmax, _gradient_size)
+            colors = colormap(norm(values))
+            ticks = MaxNLocator().tick_values(vmin, vmax)
+            ticks = ticks[(ticks >= vmin) & (ticks <= vmax)]
+            ticklabels = ["{:g}".format(tick) for tick in ticks]
+
+        extent = (0., 1., bounds[0], bounds[-1])
+        return cls(colors[:, None, :], extent, ticks, list(ticklabels))
+
+def layout(colormap, norm, ticklabels=None):
+    # Cached layout of a colorbar.
+    labels = None if ticklabels is None else tuple(map(str, ticklabels))
+    key = (colormap_key(colormap), norm_key(norm), labels)
+    return layouts.get_or_create(
+        key,
+        lambda: Layout.from_norm(colormap, norm, ticklabels))
+
+class LightColorbar(object):
+    """Colorbar drawn as an image of its colors beside the axes, with
+    labels as plain text.
+
+    Unlike a full matplotlib colorbar, no axes are created for it, so
+    the axes of the map aren't resized to make room for it and no tick
+    layout is done. Extensions past the bounds of the data aren't drawn.
+    The image and labels are taken from a cache shared by all colorbars.
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+        Axes which the colorbar is drawn beside.
+    mappable : matplotlib ScalarMappable
+        Artist whose colors are shown.
+    ticklabels : sequence, optional
+        Label of each category of discrete data.
+    """
+
+    def __init__(self, ax, mappable, ticklabels=None):
+        x, y, width, height = _bounds
+        bbox = TransformedBbox(
+            Bbox.from_bounds(x, y, width, height),
+            ax.transAxes)
+        self.ax = ax
+        self.image = BboxImage(bbox, interpolation="nearest", origin="lower")
+        self.image.set_clip_on(False)
+        ax.add_artist(self.image)
+        self.outline = ax.add_patch(Rectangle(
+            (x, y),
+            width,
+            height,
+            transform=ax.transAxes,
+            fill=False,
+            linewidth=rcParams["axes.linewidth"],
+            clip_on=False))
+
+        self.texts = []
+        self.extent = (0., 1.)
+        self.ticks = []
+        self.ticklabels = ticklabels
+        self.update_normal(mappable)
+
+    def update_normal(self, mappable):
+        # Redraw the colorbar for the colormap and norm of `mappable`.
+        self.mappable = mappable
+        mappable.autoscale_None()
+        current = layout(mappable.cmap, mappable.norm, self.ticklabels)
+        self.image.set_data(current.image)
+        self.extent = current.extent[2:]
+        self.ticks = current.ticks
+        self.draw_labels(current.ticklabels)
+
+    def draw_labels(self, ticklabels):
+        # Labels placed along the colorbar at each tick.
+        for text in self.texts:
+            text.remove()
+
+        x, y, width, height = _bounds
+        lo, hi = self.extent
+        span = (hi - lo) or 1.
+        self.texts = [
+            self.ax.text(
+                x + width * 1.25,
+                y + height * (tick - lo) / span,
+                label,
+                transform=self.ax.transAxes,
+                verticalalignment="center",
+                fontsize=rcParams["ytick.labelsize"],
+                clip_on=False)
+            for tick, label in zip(self.ticks, ticklabels)
+        ]
+
+    def set_ticks(self, ticks):
+        self.ticks = ticks
+
+    def set_ticklabels(self, ticklabels):
+        self.ticklabels = tuple(ticklabels)
+        self.draw_labels(self.ticklabels)
@@ -0,0 +1,156 @@
+"""Color rasters into RGBA pixels, without drawing them."""
+
+import numpy as np
+
+from .colormaps import table as lookup_table
+from .mapping import row_blocks
+from .settings import continuous_palette, discrete_palette
+from .utils import DataContainer, value_range
+
+
+# Pixels colored at a time, small enough that the temporary arrays stay
+# in the CPU cache.
+_block_size = 2 ** 16
+
+
+def check_out(out, shape):
+    # Buffer for the pixels of data of the given shape.
+    shape = tuple(shape) + (4,)
+    if out is None:
+        return np.empty(shape, dtype=np.uint8)
+    if any((
+            out.shape != shape,
+            out.dtype != np.uint8,
+            not out.flags.c_contiguous)):
+        raise ValueError(
+            "`out` must be a contiguous array of shape {} and dtype uint8"
+            .format(shape))
+    return out
+
+def data_range(values, mask):
+    # Smallest and largest good values, leaving out masked and NaN values.
+    vmin, vmax = value_range(np.ma.masked_array(values, mask, copy=False))
+    if vmin is None:
+        # Only missing data.
+        return 0., 1.
+    return vmin, vmax
+
+def scale_block(values, vmin, vmax, n):
+    # Indices into a table of the colors below `vmin`, `n` colors over
+    # [`vmin`, `vmax`], the colors above `vmax` and the color of missing
+    # values (for NaN), matching how matplotlib normalizes and looks up
+    # colors.
+    index = np.subtract(values, vmin, dtype=float)
+    if vmax > vmin:
+        index *= n / (vmax - vmin)
+    else:
+        index[...] = 0
+    index[index == n] = n - 1
+    np.floor(index, out=index)
+    np.clip(index, -1, n, out=index)
+    index[np.isnan(index)] = n + 1
+    index += 1
+    return index.astype(np.intp)
+
+def colorize(container, out=None):
+    # Color the data of a container with a lookup table, a block of rows
+    # at a time.
+    data = container.data
+    values, mask = np.ma.getdata(data), np.ma.getmask(data)
+    out = check_out(out, values.shape)
+    pixels = out.view(np.uint32)[..., 0]
+    colormap, norm = container.colormap, container.norm
+
+    if container.ticklabels is None:
+        if norm.vmin is None or norm.vmax is None:
+            lo, hi = data_range(values, mask)
+            norm.vmin = lo if norm.vmin is None else norm.vmin
+            norm.vmax = hi if norm.vmax is None else norm.vmax
+        vmin, vmax = norm.vmin, norm.vmax
+        n = colormap.N
+        colors = lookup_table(colormap, np.arange(-1, n + 1))
+    else:
+        n = len(container.ticklabels)
+        colors = lookup_table(colormap, norm(np.arange(n)))
+
+    # Each color is viewed as a single 4-byte integer, so that it's copied
+    # in one go.
+    table = colors.view(np.uint32)[:, 0]
+
+    for block in row_blocks(values.shape, _block_size):
+        if container.ticklabels is None:
+            index = scale_block(values[block], vmin, vmax, n)
+        else:
+            index = values[block].astype(np.intp)
+        if mask is not np.ma.nomask:
+            np.copyto(index, len(table) - 1, where=mask[block])
+        np.take(table, index, out=pixels[block])
+    return out
+
+def colorize_cont(data, palette=continuous_palette, lower=None, upper=None, out=None):  # noqa
+    """Color continuous data into RGBA pixels, as they would be drawn by
+    `raster_cont`.
+
+    The colors are looked up in a table built once from the colormap,
+    without drawing the raster, which is far quicker for large rasters
+    and tiles.
+
+    Parameters
+    ----------
+    data : array
+        Variable to be colored. Masked values are treated as missing
+        data, as are NaN and infinite values.
+    palette : None or string, optional
+        Name of palette (colormap) to use or None to use the current
+        palette. If not provided, the package's default palette will
+        be used.
+    lower : numeric, optional
+        If provided, the lower bound for which data should be colored.
+        Smaller values take the lowest color.
+    upper : numeric, optional
+        If provided, the upper bound for which data should be colored.
+        Larger values take the highest color.
+    out : ndarray of uint8, optional
+        Buffer for the pixels, of shape `data.shape + (4,)`.
+
+    Returns
+    -------
+    ndarray of uint8
+        RGBA pixels, of shape `data.shape + (4,)`.
+    """
+
+    container = DataContainer.from_continuous(
+        data,
+        palette,
+        lower=lower,
+        upper=upper)
+    return colorize(container, out)
+
+def colorize_discrete(data, palette=discrete_palette, labels=None, out=None):
+    """Color discrete data into RGBA pixels, as they would be drawn by
+    `raster_discrete`.
+
+    Parameters
+    ----------
+    data : array
+        Variable to be colored. Masked values are treated as missing
+        data.
+    palette : None or string, optional
+        Name of palette (colormap) to use or None to use the current
+        palette. If not provided, the package's default palette will
+        be used.
+    labels : sequence, optional
+        Categories which `data` is coded against, such that a value of
+        `i` corresponds to `labels[i]`. Codes outside of the categories
+        are treated as missing data.
+    out : ndarray of uint8, optional
+        Buffer for the pixels, of shape `data.shape + (4,)`.
+
+    Returns
+    -------
+    ndarray of uint8
+        RGBA pixels, of shape `data.shape + (4,)`.
+    """
+
+    container = DataContainer.from_discrete(data, palette, labels)
+    return colorize(container, out)
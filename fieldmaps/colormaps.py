@@ -0,0 +1,136 @@
+"""Colormaps and lookup tables shared between maps."""
+
+from matplotlib.colors import Colormap, ListedColormap, to_rgba
+
+import copy
+import numpy as np
+
+from .cache import LRUCache
+from .settings import color_missing, get_colormap
+
+
+# Number of colormaps, and of lookup tables, kept.
+_cache_size = 64
+
+# Colormaps keyed on palette, number of categories and missing color.
+shared = LRUCache(_cache_size)
+
+# Colors of colormaps as bytes, keyed on colormap and indices.
+tables = LRUCache(_cache_size)
+
+
+def freeze(colormap):
+    # Make the colors of a shared colormap read-only, so that setting its
+    # extremes (e.g. with `set_bad`) fails instead of changing the
+    # colormap of other maps. Copies are writeable.
+    colormap(0.)
+    lut = getattr(colormap, "_lut", None)
+    if lut is not None:
+        lut.flags.writeable = False
+    return colormap
+
+def with_bad(colormap, bad):
+    # Copy of a colormap with another color of missing values. Older
+    # versions of matplotlib share the colors of copies, which are copied
+    # here so that the original is left as it is.
+    colormap = copy.copy(colormap)
+    lut = getattr(colormap, "_lut", None)
+    if lut is not None:
+        colormap._lut = lut.copy()
+    colormap.set_bad(bad)
+    return colormap
+
+def palette_key(palette):
+    # Name of a palette, where None stands for the current default.
+    if palette is None:
+        from matplotlib import rcParams
+        return rcParams["image.cmap"]
+    return palette
+
+def continuous(palette, bad=color_missing):
+    """Get the shared colormap of a palette for continuous data.
+
+    Parameters
+    ----------
+    palette : None or string
+        Name of palette (colormap), or None for the current palette.
+    bad : color, optional
+        Color of missing values.
+
+    Returns
+    -------
+    matplotlib Colormap
+        Colormap shared by all maps with the same palette and missing
+        color, which must not be modified.
+    """
+
+    if isinstance(palette, Colormap):
+        return with_bad(palette, bad)
+
+    def create():
+        colormap = with_bad(get_colormap(palette), bad)
+        return freeze(colormap)
+
+    key = (palette_key(palette), None, to_rgba(bad))
+    return shared.get_or_create(key, create)
+
+def discrete(palette, n, bad=color_missing):
+    """Get the shared colormap of the first `n` colors of a palette, for
+    discrete data with `n` categories.
+
+    Parameters
+    ----------
+    palette : None or string
+        Name of palette (colormap), or None for the current palette.
+    n : int
+        Number of categories.
+    bad : color, optional
+        Color of missing values.
+
+    Returns
+    -------
+    matplotlib ListedColormap
+        Colormap shared by all maps with the same palette, number of
+        categories and missing color, which must not be modified.
+    """
+
+    def create():
+        colors = get_colormap(palette)(np.arange(n))
+        colormap = ListedColormap(colors)
+        colormap.set_bad(bad)
+        return freeze(colormap)
+
+    if isinstance(palette, Colormap):
+        return create()
+
+    key = (palette_key(palette), int(n), to_rgba(bad))
+    return shared.get_or_create(key, create)
+
+def table(colormap, indices):
+    # Colors of the given colormap indices as bytes, followed by the color
+    # of missing values. Tables are shared by maps with the same
+    # colormap, which is held along with its table so that the key can't
+    # be reused by another colormap.
+    indices = np.asarray(indices)
+    key = (id(colormap), indices.dtype.str, indices.tobytes())
+    held = tables.get(key)
+    if held is not None and held[0] is colormap:
+        return held[1]
+
+    missing = np.append(np.zeros(len(indices), dtype=bool), True)
+    masked = np.ma.masked_array(np.append(indices, 0), missing)
+    colors = np.ascontiguousarray(colormap(masked, bytes=True))
+    colors.flags.writeable = False
+    tables.put(key, (colormap, colors))
+    return colors
+
+def stats():
+    """Count the hits and misses of the colormap and lookup table caches.
+
+    Returns
+    -------
+    dict
+        Statistics of each cache, by name ("colormaps" and "tables").
+    """
+
+    return {"colormaps": shared.stats(), "tables": tables.stats()}
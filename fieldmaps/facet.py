@@ -0,0 +1,209 @@
+"""Small multiples of maps sharing a color scale."""
+
+from matplotlib.colors import Normalize
+
+import numpy as np
+
+from . import mapping
+from . import colormaps
+from .settings import continuous_palette, discrete_palette
+from .stack import encode_frame, stack_categories, stack_range
+from .utils import AxesUpdater, DataContainer, get_extend, mask
+
+
+def layout(n, ncols=None, axes=None, figsize=None):
+    # Axes for `n` panels, filled row by row. Panels beyond `n` are
+    # hidden.
+    if axes is None:
+        from matplotlib.pyplot import subplots
+        ncols = ncols or int(np.ceil(np.sqrt(n)))
+        nrows = max(1, -(-n // ncols))
+        if figsize is None:
+            figsize = (3 * ncols, 3 * nrows)
+        _, axes = subplots(nrows, ncols, figsize=figsize, squeeze=False)
+    axes = np.asarray(axes, dtype=object)
+    if axes.size < n:
+        raise ValueError("There are fewer axes than layers")
+
+    for ax in axes.flat[n:]:
+        ax.set_visible(False)
+    return axes
+
+def draw(updater, kind, geometry):
+    # Draw a layer with the given kind of geometry.
+    if kind == "raster":
+        return updater.add_raster()
+    elif kind == "points":
+        return updater.add_points(np.asarray(geometry))
+    return updater.add_polygons(geometry)
+
+def check(layers, kind, geometries):
+    # Check the kind of the layers and their geometries.
+    if kind not in ("raster", "points", "polygons"):
+        raise ValueError("Unknown kind of layer: {!r}".format(kind))
+    if kind == "raster":
+        return [None] * len(layers)
+    if geometries is None or len(geometries) != len(layers):
+        raise ValueError("A geometry must be given for each layer")
+    return geometries
+
+def facet(containers, kind, geometries, axes, titles, colorbar_kwds,
+          kwds):
+    # Draw each container in its panel with a single colorbar.
+    artists = []
+    for container, geometry, ax in zip(containers, geometries, axes.flat):
+        if container.ticklabels is None:
+            updater = AxesUpdater.from_continuous(container, ax=ax, **kwds)
+        else:
+            updater = AxesUpdater.from_discrete(container, ax=ax, **kwds)
+        artists.append(draw(updater, kind, geometry))
+    for title, ax in zip(titles or (), axes.flat):
+        ax.set_title(title)
+
+    panels = list(axes.flat[:len(containers)])
+    fig = panels[0].figure
+    colorbar = fig.colorbar(artists[0], ax=panels, **colorbar_kwds)
+    ticklabels = containers[0].ticklabels
+    if ticklabels is not None:
+        mapping.add_discrete_labels(colorbar, labels=ticklabels)
+    return axes
+
+def facet_cont(layers, kind="raster", geometries=None, ncols=None, axes=None, palette=continuous_palette, lower=None, upper=None, titles=None, figsize=None, sentinel=None, **kwargs):  # noqa
+    """Plot small multiples of continuous maps sharing a color scale.
+
+    Parameters
+    ----------
+    layers : sequence
+        Variable of each panel, e.g. one per field. Masked values are
+        treated as missing data, as are NaN and infinite values.
+    kind : {"raster", "points", "polygons"}, optional
+        Kind of geometry of the layers.
+    geometries : sequence, optional
+        Coordinates of the points or polygons of each layer, as taken
+        by `point_cont` or `poly_cont`. Not needed for rasters.
+    ncols : int, optional
+        Number of columns of panels. If not provided, the panels are
+        laid out in a square grid.
+    axes : array of matplotlib Axes, optional
+        Axes onto which the panels will be drawn, row by row. If not
+        provided, a new figure will be created.
+    palette : None or string, optional
+        Name of palette (colormap) to use or None to use the current
+        palette. If not provided, the package's default palette will
+        be used.
+    lower : numeric, optional
+        If provided, the lower bound for which data should be displayed.
+        Otherwise, the smallest value across all of the layers is used.
+    upper : numeric, optional
+        If provided, the upper bound for which data should be displayed.
+        Otherwise, the largest value across all of the layers is used.
+    titles : sequence of string, optional
+        Title of each panel.
+    figsize : pair of numerics, optional
+        Size of a new figure in inches.
+    sentinel : numeric, optional
+        Value marking missing data (e.g. a no-data value such as -9999),
+        which is treated as missing along with NaN and infinite values.
+    kwargs
+        Keyword arguments to be passed to `imshow`, `scatter` or
+        `matplotlib.collections.PolyCollection`.
+
+    Returns
+    -------
+    ndarray of matplotlib Axes
+    """
+
+    geometries = check(layers, kind, geometries)
+    axes = layout(len(layers), ncols, axes, figsize)
+
+    # The range is found without copying the good values of each layer.
+    layers = [mask(layer, sentinel) for layer in layers]
+    vmin, vmax = stack_range(layers)
+
+    # The colormap and norm are shared by all of the panels, while the
+    # colorbar is extended only past the bounds given.
+    norm = Normalize(
+        vmin if lower is None else lower,
+        vmax if upper is None else upper)
+    colormap = colormaps.continuous(palette)
+    containers = [
+        DataContainer(layer, colormap, norm, None) for layer in layers
+    ]
+    extend = get_extend(Normalize(lower, upper))
+    return facet(
+        containers,
+        kind,
+        geometries,
+        axes,
+        titles,
+        {"extend": extend},
+        kwargs)
+
+def facet_discrete(layers, kind="raster", geometries=None, ncols=None, axes=None, palette=discrete_palette, labels=None, titles=None, figsize=None, **kwargs):  # noqa
+    """Plot small multiples of discrete maps sharing their categories.
+
+    Parameters
+    ----------
+    layers : sequence
+        Variable of each panel, e.g. one per field. Masked values are
+        treated as missing data. If `labels` is given, the layers hold
+        integer codes into the categories.
+    kind : {"raster", "points", "polygons"}, optional
+        Kind of geometry of the layers.
+    geometries : sequence, optional
+        Coordinates of the points or polygons of each layer, as taken
+        by `point_discrete` or `poly_discrete`. Not needed for rasters.
+    ncols : int, optional
+        Number of columns of panels. If not provided, the panels are
+        laid out in a square grid.
+    axes : array of matplotlib Axes, optional
+        Axes onto which the panels will be drawn, row by row. If not
+        provided, a new figure will be created.
+    palette : None or string, optional
+        Name of palette (colormap) to use or None to use the current
+        palette. If not provided, the package's default palette will
+        be used.
+    labels : sequence, optional
+        Categories which the layers are coded against, such that a value
+        of `i` corresponds to `labels[i]`. If not provided, the
+        categories are found across all of the layers.
+    titles : sequence of string, optional
+        Title of each panel.
+    figsize : pair of numerics, optional
+        Size of a new figure in inches.
+    kwargs
+        Keyword arguments to be passed to `imshow`, `scatter` or
+        `matplotlib.collections.PolyCollection`.
+
+    Returns
+    -------
+    ndarray of matplotlib Axes
+    """
+
+    geometries = check(layers, kind, geometries)
+    axes = layout(len(layers), ncols, axes, figsize)
+
+    if labels is None:
+        # Each layer is coded against the categories of all of them.
+        layers = [np.ma.asanyarray(layer) for layer in layers]
+        labels = stack_categories(layers)
+        layers = [encode_frame(layer, labels) for layer in layers]
+
+    # The colormap and norm are built once, for the first layer.
+    first = DataContainer.from_discrete(layers[0], palette, labels)
+    containers = [first] + [
+        DataContainer(
+            mapping.create_coded(layer, labels)[1],
+            first.colormap,
+            first.norm,
+            first.ticklabels)
+        for layer in layers[1:]
+    ]
+    return facet(
+        containers,
+        kind,
+        geometries,
+        axes,
+        titles,
+        {"extend": "neither"},
+        kwargs)
@@ -0,0 +1,344 @@
+"""Polygons stored as flat arrays."""
+
+from matplotlib.path import Path
+
+import numpy as np
+
+
+# Vertices within this many pixels of a simplified ring are dropped.
+_pixel_tolerance = .5
+
+
+def expand(lo, count):
+    # Concatenated ranges `lo[i], ..., lo[i] + count[i] - 1`, along with
+    # the range each value belongs to.
+    group = np.repeat(np.arange(len(lo)), count)
+    offsets = np.cumsum(count) - count
+    return group, np.arange(len(group)) - offsets[group] + lo[group]
+
+def segment_distance(p, a, b):
+    # Distance from each point `p` to the line segment from `a` to `b`.
+    ab = b - a
+    length = np.einsum("ij,ij->i", ab, ab)
+    t = np.einsum("ij,ij->i", p - a, ab) / np.where(length > 0, length, 1)
+    nearest = a + np.clip(t, 0, 1)[:, None] * ab
+    return np.hypot(*(p - nearest).T)
+
+def snap_mask(coords, starts, stops, tolerance):
+    # Vertices which fall in a different cell of a grid with the given
+    # spacing than the vertex before them, along with the ends of each
+    # ring. This cheaply thins out densely sampled rings.
+    keep = np.ones(len(coords), dtype=bool)
+    if tolerance > 0:
+        cells = np.floor(coords / tolerance)
+        keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+    keep[starts] = True
+    keep[stops - 1] = True
+    return keep
+
+def simplify_mask(coords, starts, stops, tolerance):
+    # Vertices kept by the Douglas-Peucker algorithm, run on all rings at
+    # once. Each pass splits every segment whose farthest interior vertex
+    # is beyond the tolerance. Vertices are first thinned out on a grid
+    # of half the tolerance, so that fewer are left to be compared.
+    snapped = snap_mask(coords, starts, stops, tolerance / 2)
+    position = np.cumsum(snapped) - 1
+    coords = coords[snapped]
+    starts, stops = position[starts], position[stops - 1] + 1
+
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[starts] = True
+    keep[stops - 1] = True
+    first, last = starts, stops - 1
+
+    while len(first):
+        lengths = last - first - 1
+        has_interior = lengths > 0
+        first, last, lengths = (
+            first[has_interior],
+            last[has_interior],
+            lengths[has_interior])
+        if not len(first):
+            break
+
+        # Interior vertices of every segment, one segment after another.
+        segment, idx = expand(first + 1, lengths)
+        offsets = np.cumsum(lengths) - lengths
+        distance = segment_distance(
+            coords[idx],
+            coords[first][segment],
+            coords[last][segment])
+
+        # First vertex at the largest distance within each segment.
+        farthest = np.maximum.reduceat(distance, offsets)
+        at_max = np.flatnonzero(distance == farthest[segment])
+        first_max = np.flatnonzero(np.diff(segment[at_max], prepend=-1))
+        split = idx[at_max[first_max]]
+
+        beyond = farthest > tolerance
+        split = split[beyond]
+        keep[split] = True
+        first, last = (
+            np.concatenate((first[beyond], split)),
+            np.concatenate((split, last[beyond])))
+
+    out = np.zeros(len(position), dtype=bool)
+    out[np.flatnonzero(snapped)[keep]] = True
+    return out
+
+def burn(polygons, grid):
+    """Find the polygon covering the center of each cell of a grid.
+
+    Polygons are filled with the even-odd rule by intersecting their
+    edges with the rows of cell centers, for all polygons at once. Where
+    polygons overlap, the later one is taken, as it would be drawn on
+    top.
+
+    Parameters
+    ----------
+    polygons : Polygons
+        Polygons to be rasterized.
+    grid : Grid
+        Grid onto which the polygons are rasterized.
+
+    Returns
+    -------
+    ndarray of int, with the shape of the grid
+        Index of the polygon covering each cell, or -1 if there is none.
+    """
+
+    coords = polygons.coords
+    xmin, ymin = grid.origin
+    dx, dy = grid.resolution
+    rows, cols = grid.shape
+
+    # Edges join each vertex to the next one in the same ring, with the
+    # last vertex joined back to the first. Rings which are already
+    # closed then have an edge of length 0, which crosses no rows.
+    ring = np.repeat(np.arange(len(polygons)), np.diff(polygons.offsets))
+    end = np.arange(1, len(coords) + 1)
+    end[polygons.stops - 1] = polygons.starts
+    x0, y0 = coords.T
+    x1, y1 = coords[end].T
+
+    # Rows (counted from the bottom) whose centers are crossed by each
+    # edge, including the lower end of the edge but not the upper end.
+    # Horizontal edges cross no rows.
+    lower = np.ceil((np.minimum(y0, y1) - ymin) / dy - .5)
+    upper = np.ceil((np.maximum(y0, y1) - ymin) / dy - .5)
+    lower = np.clip(lower, 0, rows).astype(np.intp)
+    upper = np.clip(upper, 0, rows).astype(np.intp)
+    edge, row = expand(lower, upper - lower)
+
+    y = ymin + (row + .5) * dy
+    slope = (x1 - x0)[edge] / (y1 - y0)[edge]
+    x = x0[edge] + (y - y0[edge]) * slope
+    owner = ring[edge]
+
+    # Within a row of a polygon, crossings pair up into filled spans.
+    order = np.lexsort((x, row, owner))
+    x, row, owner = x[order], row[order], owner[order]
+    left = np.ceil((x[0::2] - xmin) / dx - .5)
+    right = np.ceil((x[1::2] - xmin) / dx - .5)
+    left = np.clip(left, 0, cols).astype(np.intp)
+    right = np.clip(right, 0, cols).astype(np.intp)
+    span, col = expand(left, np.maximum(right - left, 0))
+
+    cells = (rows - 1 - row[0::2][span]) * cols + col
+    owner = owner[0::2][span]
+
+    # Cells are listed in the order of their polygons, so the last time
+    # a cell is listed gives the polygon drawn on top.
+    index = np.full(grid.size, -1, dtype=np.intp)
+    unique_cells, last = np.unique(cells[::-1], return_index=True)
+    index[unique_cells] = owner[::-1][last]
+    return index.reshape(grid.shape)
+
+def data_per_pixel(ax):
+    # Smallest span of data covered by a pixel of the axes.
+    xmin, xmax = ax.get_xlim()
+    ymin, ymax = ax.get_ylim()
+    width, height = ax.bbox.width, ax.bbox.height
+    if width <= 0 or height <= 0:
+        return 0.
+    return min(abs(xmax - xmin) / width, abs(ymax - ymin) / height)
+
+class Polygons(object):
+    """Hold polygon rings in a single coordinate buffer.
+
+    The vertices of ring `i` are `coords[offsets[i]:offsets[i + 1]]`,
+    so that rings can be taken as views of the buffer.
+
+    Parameters
+    ----------
+    coords : array, shape (n, 2)
+        Vertices of all of the rings, one after the other.
+    offsets : one-dim sequence of int
+        Position in `coords` of the first vertex of each ring, followed
+        by the total number of vertices.
+    """
+
+    def __init__(self, coords, offsets):
+        coords = np.asarray(coords, dtype=float)
+        offsets = np.asarray(offsets, dtype=np.intp)
+
+        if coords.ndim != 2 or coords.shape[1] != 2:
+            raise ValueError("`coords` must be an array of shape (n, 2)")
+        if offsets.ndim != 1 or len(offsets) < 1:
+            raise ValueError("`offsets` must be a non-empty 1-dim array")
+        if offsets[0] != 0 or offsets[-1] != len(coords):
+            raise ValueError(
+                "`offsets` must start at 0 and end at the number of "
+                "coordinates")
+        if np.any(np.diff(offsets) < 1):
+            raise ValueError("`offsets` must be strictly increasing")
+
+        self.coords = coords
+        self.offsets = offsets
+        self.simplified = {}
+        # The rings are closed once, and their paths built once when first
+        # needed, rather than each time the polygons in view change.
+        self.closed_polygons = self.close_rings()
+        self.all_paths = None
+
+    @classmethod
+    def from_verts(cls, verts):
+        # Pack a sequence of polygon coordinates, as taken by
+        # `PolyCollection`, into a single buffer.
+        if isinstance(verts, np.ndarray) and verts.ndim == 3:
+            n, m, _ = verts.shape
+            return cls(verts.reshape(n * m, 2), np.arange(0, n * m + 1, m))
+
+        rings = [np.asarray(ring, dtype=float) for ring in verts]
+        lengths = [len(ring) for ring in rings]
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        coords = np.concatenate(rings) if rings else np.empty((0, 2))
+        return cls(coords, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def bounds(self):
+        # Bounds of all of the polygons, as (xmin, ymin, xmax, ymax).
+        return (*self.coords.min(axis=0), *self.coords.max(axis=0))
+
+    @property
+    def starts(self):
+        return self.offsets[:-1]
+
+    @property
+    def stops(self):
+        return self.offsets[1:]
+
+    def is_closed(self):
+        # Whether the last vertex of each ring repeats the first.
+        first = self.coords[self.starts]
+        last = self.coords[self.stops - 1]
+        return np.all(first == last, axis=1)
+
+    def closed(self):
+        # Polygons with the first vertex of each open ring repeated at
+        # its end, as found when built.
+        return self.closed_polygons
+
+    def close_rings(self):
+        # Repeat the first vertex of each open ring at its end. Returns
+        # itself if all rings are already closed.
+        open_rings = np.flatnonzero(~self.is_closed())
+        if not len(open_rings):
+            return self
+
+        coords = np.insert(
+            self.coords,
+            self.stops[open_rings],
+            self.coords[self.starts[open_rings]],
+            axis=0)
+        shift = np.zeros(len(self.offsets), dtype=np.intp)
+        shift[open_rings + 1] = 1
+        return type(self)(coords, self.offsets + np.cumsum(shift))
+
+    def simplify(self, tolerance):
+        """Drop vertices which are within about `tolerance` of the
+        simplified rings. Results are cached for each tolerance.
+
+        Rings which would be left with fewer than 4 vertices (i.e. fewer
+        than 3 sides) are kept as they are.
+        """
+
+        if tolerance in self.simplified:
+            return self.simplified[tolerance]
+
+        polygons = self.closed()
+        keep = simplify_mask(
+            polygons.coords,
+            polygons.starts,
+            polygons.stops,
+            tolerance)
+        ring = np.repeat(np.arange(len(polygons)), np.diff(polygons.offsets))
+        kept = np.bincount(ring, weights=keep, minlength=len(polygons))
+        keep |= (kept < 4)[ring]
+
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(
+            ring[keep],
+            minlength=len(polygons)))))
+        simplified = type(self)(polygons.coords[keep], offsets)
+        self.simplified[tolerance] = simplified
+        return simplified
+
+    def rings(self, index=None):
+        # Views of the buffer for each ring, or for the rings at `index`.
+        coords = self.coords
+        starts, stops = self.starts, self.stops
+        if index is not None:
+            starts, stops = starts[index], stops[index]
+        bounds = zip(starts.tolist(), stops.tolist())
+        return [coords[start:stop] for start, stop in bounds]
+
+    def paths(self, index=None):
+        # Paths sharing the buffer, for all rings or those at `index`.
+        # The rings are explicitly closed so that path codes aren't
+        # needed.
+        if self.all_paths is None:
+            self.all_paths = [
+                Path(ring, None) for ring in self.closed().rings()
+            ]
+        if index is None:
+            return list(self.all_paths)
+
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        return [self.all_paths[i] for i in index.tolist()]
+
+class LevelOfDetail(object):
+    """Swap the paths of a collection for simplified polygons matching
+    the pixel size of its axes."""
+
+    def __init__(self, collection, polygons, pixel_tolerance=_pixel_tolerance):
+        self.collection = collection
+        self.polygons = polygons
+        self.pixel_tolerance = pixel_tolerance
+        self.tolerance = None
+        self.visible = None
+
+    def select(self):
+        # Tolerances are rounded down to a power of 2, so that simplified
+        # polygons are reused across similar views.
+        size = data_per_pixel(self.collection.axes) * self.pixel_tolerance
+        if size <= 0:
+            return 0.
+        return float(2. ** np.floor(np.log2(size)))
+
+    def update(self, *args):
+        tolerance = self.select()
+        if tolerance != self.tolerance:
+            self.tolerance = tolerance
+            self.refresh()
+        return tolerance
+
+    def refresh(self):
+        # Set the paths of the visible polygons (all of them unless
+        # `visible` is set) at the current tolerance.
+        polygons = self.polygons.simplify(self.tolerance or 0.)
+        self.collection.set_paths(polygons.paths(self.visible))
@@ -0,0 +1,158 @@
+"""Aggregate points onto regular grids."""
+
+import numpy as np
+
+
+# Number of cells along the longer side of a grid if the resolution
+# isn't given.
+_default_cells = 500
+
+
+def group_reduce(ufunc, values, index, size):
+    # Reduce the values falling in each group with `ufunc`, where `index`
+    # gives the group of each value. Groups without values are set to 0.
+    order = np.argsort(index, kind="mergesort")
+    index = index[order]
+    starts = np.flatnonzero(np.diff(index, prepend=-1))
+    out = np.zeros(size, dtype=values.dtype)
+    if len(starts):
+        out[index[starts]] = ufunc.reduceat(values[order], starts)
+    return out
+
+def group_mode(values, index, size):
+    # Most common of the non-negative integer values falling in each
+    # group, found by counting the (group, value) pairs which occur, so
+    # that memory grows with the number of values rather than with the
+    # number of groups and categories. Ties go to the smallest value, and
+    # groups without values are set to 0.
+    out = np.zeros(size, dtype=values.dtype)
+    if not len(values):
+        return out
+
+    n = int(values.max()) + 1
+    pairs, counts = np.unique(
+        index * n + values.astype(np.intp),
+        return_counts=True)
+    group, value = np.divmod(pairs, n)
+
+    # Pairs are sorted by group and then value, which the stable sort by
+    # decreasing count keeps within each group.
+    order = np.lexsort((-counts, group))
+    group, value = group[order], value[order]
+    first = np.flatnonzero(np.diff(group, prepend=-1))
+    out[group[first]] = value[first]
+    return out
+
+class Grid(object):
+    """Regular grid of cells, with the first row at the top."""
+
+    def __init__(self, origin, resolution, shape):
+        self.origin = origin
+        self.resolution = resolution
+        self.shape = shape
+
+    @classmethod
+    def from_bounds(cls, bounds, resolution=None):
+        xmin, ymin, xmax, ymax = map(float, bounds)
+        if resolution is None:
+            span = max(xmax - xmin, ymax - ymin)
+            resolution = span / _default_cells or 1.
+
+        dx, dy = np.broadcast_to(np.asarray(resolution, dtype=float), 2)
+        if dx <= 0 or dy <= 0:
+            raise ValueError("`resolution` must be positive")
+
+        cols = max(1, int(np.ceil((xmax - xmin) / dx)))
+        rows = max(1, int(np.ceil((ymax - ymin) / dy)))
+        return cls((xmin, ymin), (dx, dy), (rows, cols))
+
+    @classmethod
+    def from_coords(cls, coords, resolution=None):
+        xmin, ymin = coords.min(axis=0)
+        xmax, ymax = coords.max(axis=0)
+        return cls.from_bounds((xmin, ymin, xmax, ymax), resolution)
+
+    @property
+    def size(self):
+        rows, cols = self.shape
+        return rows * cols
+
+    @property
+    def extent(self):
+        # Extent as taken by `imshow`, with the first row at the top.
+        xmin, ymin = self.origin
+        dx, dy = self.resolution
+        rows, cols = self.shape
+        return (xmin, xmin + cols * dx, ymin, ymin + rows * dy)
+
+    def cell_index(self, coords):
+        # Flat index of the cell containing each point, or -1 for points
+        # outside of the grid. Points on the upper edges of the grid fall
+        # in the last row/column.
+        xmin, ymin = self.origin
+        dx, dy = self.resolution
+        rows, cols = self.shape
+        x, y = coords[:, 0], coords[:, 1]
+        col = np.floor((x - xmin) / dx).astype(np.intp)
+        row = np.floor((y - ymin) / dy).astype(np.intp)
+        col[(col == cols) & (x <= xmin + cols * dx)] = cols - 1
+        row[(row == rows) & (y <= ymin + rows * dy)] = rows - 1
+
+        outside = (col < 0) | (col >= cols) | (row < 0) | (row >= rows)
+        index = (rows - 1 - row) * cols + col
+        index[outside] = -1
+        return index
+
+    def aggregate(self, data, coords, how):
+        """Reduce the values of the points falling in each cell.
+
+        Parameters
+        ----------
+        data : one-dim sequence
+            Values of the points. If the sequence is a masked array,
+            masked values will be left out, as are NaN values.
+        coords : array, shape (n, 2)
+            Coordinates of the points.
+        how : {"mean", "min", "max", "count", "mode"}
+            Reduction applied to the values in each cell. The mode
+            requires non-negative integer values (e.g. category codes),
+            with ties going to the smallest value.
+
+        Returns
+        -------
+        values : masked array
+            Reduced values, masked for cells with no good values.
+        empty : ndarray of bool
+            Cells which no points fall in.
+        """
+
+        if how not in ("mean", "min", "max", "count", "mode"):
+            raise ValueError("Unknown aggregation: {!r}".format(how))
+
+        data = np.ma.asanyarray(data)
+        index = self.cell_index(coords)
+        empty = np.bincount(index[index >= 0], minlength=self.size) == 0
+
+        # Masked and NaN values are both missing.
+        values = np.ma.getdata(data)
+        good = (index >= 0) & ~np.ma.getmaskarray(data)
+        if values.dtype.kind == "f":
+            good &= ~np.isnan(values)
+        index = index[good]
+        values = values[good]
+        count = np.bincount(index, minlength=self.size)
+
+        if how == "count":
+            out = count
+        elif how == "mean":
+            dtype = np.result_type(values.dtype, np.float32)
+            total = np.bincount(index, weights=values, minlength=self.size)
+            out = (total / np.maximum(count, 1)).astype(dtype)
+        elif how == "mode":
+            out = group_mode(values, index, self.size)
+        else:
+            ufunc = np.minimum if how == "min" else np.maximum
+            out = group_reduce(ufunc, values, index, self.size)
+
+        values = np.ma.masked_array(out, count == 0).reshape(self.shape)
+        return values, empty.reshape(self.shape)
@@ -0,0 +1,140 @@
+"""Update the data of existing maps."""
+
+import numpy as np
+
+from . import mapping
+from .utils import DataContainer, mask, value_range
+
+
+class MapHandle(object):
+    """Handle on a drawn map, for updating its data in place.
+
+    Returned by the plotting functions when `handle=True`. Updating a map
+    sets the new values on its existing artist, so that frames of a time
+    series (e.g. daily NDVI over the same field) only need the values to
+    be encoded again. The colorbar is only changed when the categories
+    or the color scale change.
+
+    Parameters
+    ----------
+    updater : AxesUpdater
+        Updater which drew the map.
+    colorbar : matplotlib Colorbar, LightColorbar or None
+        Colorbar of the map, if any.
+    palette : None or string
+        Palette of the map, used if the categories change.
+    lower, upper : numeric, optional
+        Bounds of the color scale of continuous maps.
+    labels : sequence, optional
+        Categories of discrete maps drawn from coded data.
+    sentinel : numeric, optional
+        Value marking missing data in continuous maps.
+    """
+
+    def __init__(self, updater, colorbar, palette, lower=None, upper=None,
+                 labels=None, sentinel=None):
+        self.updater = updater
+        self.colorbar = colorbar
+        self.palette = palette
+        self.lower = lower
+        self.upper = upper
+        self.labels = None if labels is None else tuple(labels)
+        self.sentinel = sentinel
+
+    @property
+    def ax(self):
+        return self.updater.ax
+
+    @property
+    def artist(self):
+        return self.updater.artist
+
+    @property
+    def discrete(self):
+        return self.updater.container.ticklabels is not None
+
+    def update(self, data, labels=None, rescale=False):
+        """Set new values on the map.
+
+        Parameters
+        ----------
+        data : sequence or array
+            New values, with the same shape as the data the map was
+            drawn from and taken in the same way (e.g. as codes if the
+            map was drawn from coded data).
+        labels : sequence, optional
+            New categories which `data` are coded against, for discrete
+            maps drawn from coded data. If not provided, the categories
+            of the map are used.
+        rescale : bool, optional
+            For continuous maps, whether to fit the color scale to the
+            new values, within the bounds given when drawing. Otherwise,
+            the color scale is kept, so that frames can be compared.
+
+        Returns
+        -------
+        MapHandle
+        """
+
+        if self.discrete:
+            self.update_discrete(data, labels)
+        else:
+            self.update_continuous(data, rescale)
+        return self
+
+    def update_continuous(self, data, rescale):
+        data = mask(data, self.sentinel)
+        values = self.updater.set_values(data)
+
+        lo, hi = value_range(values) if rescale else (None, None)
+        if lo is not None:
+            # Both bounds are found before being set, as the colorbar
+            # fills in any which are unset as soon as the norm changes.
+            vmin = lo if self.lower is None else self.lower
+            vmax = hi if self.upper is None else self.upper
+            norm = self.artist.norm
+            norm.vmin, norm.vmax = vmin, vmax
+            if self.colorbar is not None:
+                self.colorbar.update_normal(self.artist)
+
+    def update_discrete(self, data, labels):
+        if labels is None and self.labels is None and mapping.is_coded(data):
+            data, labels = data.codes, data.categories
+        if labels is None:
+            labels = self.labels
+
+        container = self.updater.container
+        if labels is not None:
+            # Coded data, which keeps its categories unless new ones are
+            # given.
+            labels = tuple(labels)
+            _, values = mapping.create_coded(data, labels)
+            changed = labels != container.ticklabels
+            self.labels = labels
+        else:
+            # Values are encoded against the known categories, unless
+            # there are new ones.
+            data = np.ma.asanyarray(data)
+            missing = np.ma.getmaskarray(data)
+            known = np.asarray(container.ticklabels)
+            codes, found = mapping.encode(
+                np.ma.getdata(data),
+                known,
+                return_found=True)
+            changed = np.any(~found & ~missing)
+            values = np.ma.masked_array(codes, missing)
+
+        if changed:
+            container = DataContainer.from_discrete(
+                data,
+                self.palette,
+                labels)
+            values = container.data
+            self.updater.recolor(container)
+
+        self.updater.set_values(values)
+        if changed and self.colorbar is not None:
+            self.colorbar.update_normal(self.artist)
+            mapping.add_discrete_labels(
+                self.colorbar,
+                labels=container.ticklabels)
@@ -1,10 +1,13 @@
 """Handle discrete/categorical data."""
 
 from collections import OrderedDict
-from matplotlib.colors import BoundaryNorm, ListedColormap
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.colors import BoundaryNorm
 
-import matplotlib.cm as cm
 import numpy as np
+import os
+
+from . import colormaps
 
 
 # Arbitrary - this is the maximum number of ticks on a colorbar + 1.
@@ -12,38 +15,199 @@ import numpy as np
 _fill = 1000
 _dtype = np.uint16
 
+# Largest span of integer values which will be encoded with a lookup
+# table instead of a binary search.
+_max_span = 2 ** 16
+
+
+def is_integral(x):
+    # Integer data which can be offset and used as indices.
+    return x.dtype.kind in "iu" and np.can_cast(x.dtype, np.intp)
+
+def unique(x):
+    # Sorted unique values of `x`. Integers spanning a small range are
+    # counted instead of sorted.
+    if x.size and is_integral(x):
+        lo = int(x.min())
+        span = int(x.max()) - lo + 1
+        if span <= _max_span:
+            counts = np.bincount(x.ravel().astype(np.intp) - lo)
+            return (np.flatnonzero(counts) + lo).astype(x.dtype)
+
+    return np.unique(x)
+
+def lookup(x, values):
+    # Find the position of each element of `x` within the sorted
+    # array `values`, along with whether the element was found.
+    # Elements which aren't found are given an arbitrary position.
+    idx = np.searchsorted(values, x)
+    if len(values) == 0:
+        return idx, np.zeros(idx.shape, dtype=bool)
+
+    np.minimum(idx, len(values) - 1, out=idx)
+    found = values[idx] == x
+    return idx, found
+
+def encode(x, values, return_found=False):
+    # Create array that mirrors the input array, but with the position
+    # of each element within the sorted array `values`. Elements which
+    # aren't found are set to `_fill`, which is also a valid position if
+    # there are more than `_fill` values, so whether each element was
+    # found is returned as well if `return_found` is True.
+    if len(values) and is_integral(x) and is_integral(values):
+        lo = int(values[0])
+        span = int(values[-1]) - lo + 1
+        if span <= _max_span:
+            # Index directly into a table covering every integer in the
+            # range of `values`, with an extra slot for the rest.
+            table = np.full(span + 1, _fill, dtype=_dtype)
+            table[values.astype(np.intp) - lo] = np.arange(len(values))
+            offset = x.astype(np.intp) - lo
+            offset[(offset < 0) | (offset >= span)] = span
+            if not return_found:
+                return table[offset]
+            known = np.zeros(span + 1, dtype=bool)
+            known[values.astype(np.intp) - lo] = True
+            return table[offset], known[offset]
+
+    idx, found = lookup(x, values)
+    arr = idx.astype(_dtype)
+    arr[~found] = _fill
+    return (arr, found) if return_found else arr
+
+def row_blocks(shape, chunksize):
+    # Slices along the first axis, each covering at most `chunksize`
+    # elements (but at least one row).
+    row_size = int(np.prod(shape[1:]))
+    rows = max(1, chunksize // max(row_size, 1))
+    return [slice(i, i + rows) for i in range(0, shape[0], rows)]
+
+def block_values(data, mask, block):
+    # Sorted unique values of the good data in a block.
+    chunk = np.asarray(data[block])
+    if mask is not np.ma.nomask:
+        chunk = chunk[~mask[block]]
+    return unique(chunk)
+
+def n_workers(n_jobs):
+    # Number of workers to use, where negative values count back from the
+    # number of CPUs (e.g. -1 uses all of them).
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+def stream_mapped(data, mask, chunksize, out=None, n_jobs=None):
+    # Build the category table and the internal array a block at a time,
+    # so that only a block of the input is in memory at once. Blocks are
+    # processed in a thread pool if `n_jobs` is given.
+    blocks = row_blocks(data.shape, chunksize)
+    if out is None:
+        out = np.empty(data.shape, dtype=_dtype)
+
+    def find_values(block):
+        return block_values(data, mask, block)
+
+    def write_codes(block):
+        out[block] = encode(np.asarray(data[block]), data_values)
+
+    workers = 1 if n_jobs is None else n_workers(n_jobs)
+    with ThreadPoolExecutor(workers) as executor:
+        map_blocks = map if workers == 1 else executor.map
+        data_values = unique(np.concatenate(
+            list(map_blocks(find_values, blocks))))
+        # Consume the results to raise any errors.
+        list(map_blocks(write_codes, blocks))
+    return data_values, out
+
+def create_mapped(x, chunksize=None, out=None, n_jobs=None):
+    if n_jobs is not None and chunksize is None:
+        # Split the data so that each worker gets several blocks.
+        chunksize = -(-x.size // (4 * n_workers(n_jobs)))
+
+    if chunksize is not None or out is not None:
+        if out is not None and (out.shape != x.shape or out.dtype != _dtype):
+            raise ValueError(
+                "`out` must have the same shape as the input and dtype {}"
+                .format(np.dtype(_dtype)))
+
+        # The mask is passed through as is, so that unmasked input
+        # doesn't need a mask to be allocated.
+        mask = np.ma.getmask(x)
+        data_values, arr = stream_mapped(
+            np.ma.getdata(x),
+            mask,
+            chunksize or x.size,
+            out=out,
+            n_jobs=n_jobs)
+        pairs = OrderedDict(
+            (value, i) for i, value in enumerate(data_values))
+        mock = np.ma.masked_array(arr, mask, copy=False)
+        return pairs, mock
 
-def mk_internal_map(x):
-    # Map input data to integers >= 0 such that all
-    # are strictly ascending and are uniformly spaced.
-    # These properties are all necessary so that the
-    # colorbar labels will be correct.
-    data_values = np.sort(np.unique(x))
-    return OrderedDict((value, i) for i, value in enumerate(data_values))
-
-def internal_array(x, pairs):
-    # Create array that mirrors the input array, but with
-    # internal data values.
-    arr = np.fromiter(
-        (pairs.get(value, _fill) for value in x.ravel()),
-        dtype=_dtype,
-        count=x.size)
-    return arr.reshape(x.shape)
-
-def create_mapped(x):
     if not isinstance(x, np.ma.MaskedArray):
-        mask = np.zeros(x.shape, dtype=np.bool)
+        mask = np.zeros(x.shape, dtype=bool)
         x = np.ma.masked_array(x, mask)
 
     # Only use good data to create the internal data so that
     # when masked values are removed the colorbar will still
     # be accurate.
-    data = x.data[~x.mask]
-    pairs = mk_internal_map(data)
-    arr = internal_array(x.data, pairs)
+    mask = np.ma.getmaskarray(x)
+    data = x.data[~mask] if mask.any() else x.data
+    data_values = unique(data)
+    arr = encode(x.data, data_values)
+
+    pairs = OrderedDict((value, i) for i, value in enumerate(data_values))
 
     # matplotlib will take masked values as "bad" data.
-    mock = np.ma.masked_array(arr, x.mask)
+    mock = np.ma.masked_array(arr, mask)
+    return pairs, mock
+
+def is_coded(x):
+    # Duck-typed check for `pandas.Categorical` so that pandas doesn't
+    # need to be imported.
+    return hasattr(x, "codes") and hasattr(x, "categories")
+
+def code_dtype(n):
+    # Smallest integer type which can hold codes for `n` categories.
+    return np.min_scalar_type(max(n - 1, 0))
+
+def create_coded(codes, labels):
+    # Use integer codes into `labels` directly as the internal data. Codes
+    # outside of `labels` (e.g. -1, used by pandas for missing values) are
+    # masked. Integer codes are not copied, and no mask is built unless
+    # some codes are masked or outside of `labels`.
+    labels = tuple(labels)
+    n = len(labels)
+    codes = np.asanyarray(codes)
+    mask = np.ma.getmask(codes)
+    codes = np.ma.getdata(codes)
+
+    if codes.dtype.kind not in "iu":
+        # Other types (e.g. floats, with NaN as missing) are converted to
+        # the smallest integer type which fits.
+        with np.errstate(invalid="ignore"):
+            invalid = ~((codes >= 0) & (codes < n))
+        if np.any(np.mod(codes[~invalid], 1)):
+            raise ValueError("Codes must be integers")
+        codes = np.where(invalid, 0, codes).astype(code_dtype(n))
+    elif codes.size == 0 or (codes.min() >= 0 and codes.max() < n):
+        # All of the codes are valid, which is found without building
+        # any full-size array.
+        invalid = np.ma.nomask
+    elif codes.dtype.kind == "u":
+        invalid = codes >= n
+    else:
+        invalid = (codes < 0) | (codes >= n)
+
+    if invalid is np.ma.nomask or not invalid.any():
+        invalid = np.ma.nomask
+    if mask is np.ma.nomask:
+        mask = invalid
+    elif invalid is not np.ma.nomask:
+        mask = np.logical_or(invalid, mask, out=invalid)
+
+    pairs = OrderedDict((label, i) for i, label in enumerate(labels))
+    mock = np.ma.masked_array(codes, mask, copy=False)
     return pairs, mock
 
 def discrete_norm(x):
@@ -57,11 +221,10 @@ def discrete_norm(x):
     norm = BoundaryNorm(boundaries, ncolors=len(x))
     return norm
 
-# TODO: is this necessary at all?
 def discrete_cmap(x, palette):
-    colors = cm.get_cmap(palette)(x)
-    colormap = ListedColormap(colors)
-    return colormap
+    # Shared colormap of the internal data `x`, which holds the codes 0 to
+    # n - 1.
+    return colormaps.discrete(palette, len(x))
 
 def add_discrete_labels(cbar, labels):
     # Set labels in the middle of the color segment.
@@ -0,0 +1,104 @@
+"""Reuse the internal data of maps whose data hasn't changed.
+
+Memoization is off until `enable` is called. Once enabled, the encoded
+data built for a map of discrete data is kept, keyed on a hash of the
+contents of the data and its mask along with the palette, so that plotting
+the same layer again (e.g. on other axes, or when refreshing a dashboard)
+skips finding and encoding its categories. Continuous and coded data are
+used as they are, which is quicker than hashing them, so they are never
+memoized.
+"""
+
+from matplotlib.colors import BoundaryNorm, Normalize
+
+import numpy as np
+
+from .cache import LRUCache, content_hash
+
+
+# Memory budget of the data held, in bytes, if not given to `enable`.
+_default_budget = 256 * 2 ** 20
+
+# Containers keyed on the hash of their data and settings, while enabled.
+containers = None
+
+
+def nbytes(container):
+    # Memory held by the data of a container.
+    data = container.data
+    mask = np.ma.getmask(data)
+    size = np.ma.getdata(data).nbytes
+    return size if mask is np.ma.nomask else size + mask.nbytes
+
+def enable(budget=_default_budget):
+    """Start memoizing the internal data of maps.
+
+    Parameters
+    ----------
+    budget : int, optional
+        Largest total size in bytes of the data held. The least recently
+        used data is dropped first, and data larger than the budget isn't
+        held at all.
+    """
+
+    global containers
+    containers = LRUCache(budget, weigh=nbytes)
+
+def disable():
+    """Stop memoizing the internal data of maps, dropping all of it."""
+
+    global containers
+    containers = None
+
+def stats():
+    """Count the hits and misses of the memoized data.
+
+    Returns
+    -------
+    dict or None
+        Hits, misses, number of maps held and their size in bytes (as
+        "weight"), or None if memoization isn't enabled.
+    """
+
+    return None if containers is None else containers.stats()
+
+def key(data, palette, *settings):
+    # Hash of the contents of the data and of the settings of a map, or
+    # None if they can't be hashed by content (e.g. objects other than
+    # arrays, or colormaps given as objects).
+    if not isinstance(data, np.ndarray) or data.dtype.hasobject:
+        return None
+    if palette is not None and not isinstance(palette, str):
+        return None
+
+    mask = np.ma.getmask(data)
+    return content_hash(
+        isinstance(data, np.ma.MaskedArray),
+        np.ma.getdata(data),
+        None if mask is np.ma.nomask else mask,
+        palette,
+        *settings)
+
+def fresh_norm(norm):
+    # Copy of a norm, without the callbacks of the artists using it.
+    if isinstance(norm, BoundaryNorm):
+        return BoundaryNorm(norm.boundaries, norm.Ncmap, clip=norm.clip)
+    return Normalize(norm.vmin, norm.vmax, norm.clip)
+
+def memoized(build, data, palette, *settings):
+    # Container built by `build`, or held from an earlier build for the
+    # same data and settings. Each map gets its own norm, as norms are
+    # scaled by the artists using them.
+    container_key = None if containers is None else key(
+        data,
+        palette,
+        *settings)
+    if container_key is None:
+        return build()
+
+    held = containers.get_or_create(container_key, build)
+    return type(held)(
+        held.data,
+        held.colormap,
+        fresh_norm(held.norm),
+        held.ticklabels)
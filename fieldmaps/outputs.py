@@ -0,0 +1,248 @@
+"""Keep rendered maps on disk, so that maps of unchanged data aren't drawn
+again."""
+
+import os
+import threading
+
+from .cache import content_hash, write_atomic
+from .geometry import Polygons
+
+
+# Largest total size of the saved maps, in bytes, if not given.
+_max_bytes = 1024 * 2 ** 20
+
+# Share of `max_bytes` left once maps are evicted, so that evictions (which
+# list all of the saved maps) are rare.
+_evict_to = .9
+
+# Versions of fieldmaps, matplotlib and numpy, found when first needed.
+_versions = None
+
+
+def source_hash():
+    # Hash of the source files of fieldmaps, so that maps are drawn again
+    # after changes to the code which don't change its version (e.g. when
+    # run from its source tree).
+    folder = os.path.dirname(os.path.abspath(__file__))
+    names = sorted(
+        name for name in os.listdir(folder)
+        if name.endswith(".py"))
+    sources = []
+    for name in names:
+        with open(os.path.join(folder, name), "rb") as f:
+            sources.append(f.read())
+    return content_hash(names, sources)
+
+def versions():
+    # Versions of the packages drawing the maps, which are part of the keys
+    # so that maps are drawn again after upgrades: the version and the
+    # sources of fieldmaps, and the versions of matplotlib and numpy.
+    global _versions
+    if _versions is not None:
+        return _versions
+
+    import matplotlib
+    import numpy
+    from . import __version__
+    _versions = (
+        __version__,
+        source_hash(),
+        matplotlib.__version__,
+        numpy.__version__)
+    return _versions
+
+def fn_name(fn):
+    # Name of a plotting function, such as "raster_cont".
+    if callable(fn):
+        return "{}.{}".format(fn.__module__, fn.__qualname__)
+    return fn
+
+def hashable(value):
+    # Value with polygons replaced by their coordinates, which are hashed
+    # by content.
+    if isinstance(value, Polygons):
+        return (value.coords, value.offsets)
+    if isinstance(value, (list, tuple)):
+        return type(value)(hashable(item) for item in value)
+    if isinstance(value, dict):
+        return {key: hashable(item) for key, item in value.items()}
+    return value
+
+class OutputCache(object):
+    """Save rendered maps as files in a directory, keyed on everything
+    which goes into drawing them.
+
+    Maps are keyed on a hash of the plotting function, its arguments (with
+    arrays hashed by content), the size, resolution and format of the
+    image, the version and source files of fieldmaps, and the versions of
+    matplotlib and numpy. The style set through `matplotlib.rcParams`
+    isn't part of the key, so `version` should be changed along with it.
+
+    Maps are written under a temporary name and then moved into place, so
+    several processes can share a directory. Once the maps take up more
+    than `max_bytes`, the least recently used are removed.
+
+    Parameters
+    ----------
+    directory : string
+        Directory in which the maps are saved.
+    max_bytes : int, optional
+        Largest total size of the saved maps in bytes.
+    version : string, optional
+        Version of the maps, such as a revision of the styling code, which
+        is added to the keys.
+    """
+
+    def __init__(self, directory, max_bytes=_max_bytes, version=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        # Estimate of the total size, counted from the directory when
+        # first needed.
+        self.total = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Workers of a pool count hits and sizes of their own.
+        state = self.__dict__.copy()
+        del state["lock"]
+        state.update(hits=0, misses=0, total=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def key(self, fn, args, kwargs=None, size=(6, 6), dpi=100, format="png"):  # noqa
+        """Find the key of a map.
+
+        Parameters
+        ----------
+        fn : string or callable
+            Name of a fieldmaps plotting function, or a function taking
+            `ax` as a keyword argument.
+        args : sequence
+            Positional arguments to `fn`, such as the data and geometry.
+        kwargs : dict, optional
+            Keyword arguments to `fn`.
+        size : pair of numerics, optional
+            Size of the image in inches.
+        dpi : numeric, optional
+            Resolution of the image in dots per inch.
+        format : string, optional
+            Format of the image, such as "png" or "svg".
+
+        Returns
+        -------
+        string
+        """
+
+        return content_hash(
+            fn_name(fn),
+            hashable(tuple(args)),
+            hashable(kwargs or {}),
+            tuple(size),
+            dpi,
+            format,
+            versions(),
+            self.version)
+
+    def path(self, key, format="png"):
+        return os.path.join(
+            self.directory,
+            key[:2],
+            "{}.{}".format(key, format))
+
+    def get(self, key, format="png"):
+        """Read a saved map.
+
+        Returns
+        -------
+        bytes or None
+            Contents of the map, or None if it isn't saved.
+        """
+
+        path = self.path(key, format)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            # Mark the map as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            # The map may also be evicted by another process while it's
+            # read.
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def put(self, key, content, format="png"):
+        """Save a map, removing the least recently used maps if the
+        directory grows too large.
+
+        Returns
+        -------
+        bytes
+            `content`, as given.
+        """
+
+        path = self.path(key, format)
+        write_atomic(path, content)
+        with self.lock:
+            if self.total is not None:
+                self.total += len(content)
+            if self.total is None or self.total > self.max_bytes:
+                self.total = self.evict()
+        return content
+
+    def files(self):
+        # Saved maps as (time of last use, size, path), oldest first.
+        found = []
+        if not os.path.isdir(self.directory):
+            return found
+        for folder in os.scandir(self.directory):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, stat.st_size, entry.path))
+        found.sort()
+        return found
+
+    def evict(self):
+        # Remove the least recently used maps once they take up more than
+        # `max_bytes`, returning the size of those left.
+        files = self.files()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return total
+        for _, size, path in files:
+            if total <= self.max_bytes * _evict_to:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+    def stats(self):
+        """Count the hits and misses of the cache in this process.
+
+        Returns
+        -------
+        dict
+            Hits, misses, and the estimated size of the saved maps in
+            bytes, or None if unknown.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "bytes": self.total}
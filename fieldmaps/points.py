@@ -1,10 +1,12 @@
 """Scatterplot maps."""
 
+from .grid import Grid
+from .handle import MapHandle
 from .settings import continuous_palette, discrete_palette
-from .utils import AxesUpdater, DataContainer
+from .utils import AxesUpdater, DataContainer, mask
 
 
-def point_cont(data, coords, ax=None, palette=continuous_palette, lower=None, upper=None, **kwargs):  # noqa
+def point_cont(data, coords, ax=None, palette=continuous_palette, lower=None, upper=None, aggregate=None, resolution=None, cull=False, colorbar=True, handle=False, sentinel=None, **kwargs):  # noqa
     """Plot a scatterplot map with continuous values.
 
     Parameters
@@ -26,12 +28,37 @@ def point_cont(data, coords, ax=None, palette=continuous_palette, lower=None, up
         If provided, the lower bound for which data should be displayed.
     upper : numeric, optional
         If provided, the upper bound for which data should be displayed.
+    aggregate : {"mean", "min", "max", "count"}, optional
+        If provided, the points are binned into a regular grid and the
+        values in each cell are reduced as given, with the grid drawn as
+        a raster. Cells with no points are left blank. This is much
+        faster than drawing each point when there are many of them.
+    resolution : numeric or pair of numerics, optional
+        Size of the grid cells in the units of `coords`, used when
+        aggregating. If not provided, the grid will have 500 cells along
+        its longer side.
+    cull : bool, optional
+        If True, only the points within or near the view of the axes are
+        drawn, found with a spatial index built once. The points drawn
+        are updated as the view changes, so that zoomed in maps redraw
+        faster. Not used when aggregating.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
+    sentinel : numeric, optional
+        Value marking missing data (e.g. a no-data value such as -9999),
+        which is treated as missing along with NaN and infinite values.
     kwargs
-        Keyword arguments to be passed to `scatter`.
+        Keyword arguments to be passed to `scatter`, or to `imshow` when
+        aggregating.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
     if coords.ndim != 2:
@@ -39,24 +66,47 @@ def point_cont(data, coords, ax=None, palette=continuous_palette, lower=None, up
     if coords.shape[1] != 2:
         raise ValueError("`coords` must be an array of shape (n, 2)")
 
+    if aggregate is not None:
+        data = mask(data, sentinel)
+        grid = Grid.from_coords(coords, resolution)
+        data, empty = grid.aggregate(data, coords, aggregate)
+
+        def regrid(values):
+            return grid.aggregate(values, coords, aggregate)[0]
+
     container = DataContainer.from_continuous(
         data,
         palette,
         lower=lower,
-        upper=upper)
+        upper=upper,
+        # Aggregates carry their own mask, and may equal the sentinel.
+        sentinel=sentinel if aggregate is None else None)
     updater = AxesUpdater.from_continuous(container, ax=ax, **kwargs)
-    collection = updater.add_points(coords)
-    updater.add_colorbar(collection)
+    if aggregate is None:
+        collection = updater.add_points(coords, cull=cull)
+    else:
+        collection = updater.add_grid(grid, empty, regrid)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(
+            updater,
+            cbar,
+            palette,
+            lower,
+            upper,
+            sentinel=sentinel)
     return updater.ax
 
-def point_discrete(data, coords, ax=None, palette=discrete_palette, **kwargs):
+def point_discrete(data, coords, ax=None, palette=discrete_palette, labels=None, aggregate=None, resolution=None, cull=False, colorbar=True, handle=False, **kwargs):  # noqa
     """Plot a scatterplot map with discrete values.
 
     Parameters
     ----------
-    data : one-dim sequence
+    data : one-dim sequence or pandas.Categorical
         Variable to be plotted. If the sequence is a masked array,
-        masked values will be treated as missing data.
+        masked values will be treated as missing data. If `labels`
+        is given or a `pandas.Categorical` is passed, the data are
+        taken as integer codes into the categories.
     coords : array, shape (n, 2)
         Array of coordinates, with the first column giving the
         x-coordinates and the second giving the y-coordinates.
@@ -67,12 +117,39 @@ def point_discrete(data, coords, ax=None, palette=discrete_palette, **kwargs):
         Name of palette (colormap) to use or None to use the current
         palette. If not provided, the package's default palette will
         be used.
+    labels : sequence, optional
+        Categories which `data` are coded against, such that a value
+        of `i` in `data` corresponds to `labels[i]`. Codes outside of
+        the categories (e.g. -1) are treated as missing data. Integer
+        codes are used without being copied.
+    aggregate : {"mode"}, optional
+        If provided, the points are binned into a regular grid and each
+        cell takes the most common category of its points, with the grid
+        drawn as a raster. Cells with no points are left blank. This is
+        much faster than drawing each point when there are many of them.
+    resolution : numeric or pair of numerics, optional
+        Size of the grid cells in the units of `coords`, used when
+        aggregating. If not provided, the grid will have 500 cells along
+        its longer side.
+    cull : bool, optional
+        If True, only the points within or near the view of the axes are
+        drawn, found with a spatial index built once. The points drawn
+        are updated as the view changes, so that zoomed in maps redraw
+        faster. Not used when aggregating.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
     kwargs
-        Keyword arguments to be passed to `scatter`.
+        Keyword arguments to be passed to `scatter`, or to `imshow` when
+        aggregating.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
     if coords.ndim != 2:
@@ -80,8 +157,31 @@ def point_discrete(data, coords, ax=None, palette=discrete_palette, **kwargs):
     if coords.shape[1] != 2:
         raise ValueError("`coords` must be an array of shape (n, 2)")
 
-    container = DataContainer.from_discrete(data, palette)
+    if aggregate not in (None, "mode"):
+        raise ValueError("Unknown aggregation: {!r}".format(aggregate))
+
+    container = DataContainer.from_discrete(data, palette, labels)
+    if aggregate is not None:
+        # Aggregate the internal codes, so that the categories and their
+        # colors are the same as for the points.
+        grid = Grid.from_coords(coords, resolution)
+        codes, empty = grid.aggregate(container.data, coords, aggregate)
+
+        def regrid(values):
+            return grid.aggregate(values, coords, aggregate)[0]
+
+        container = DataContainer(
+            codes,
+            container.colormap,
+            container.norm,
+            container.ticklabels)
+
     updater = AxesUpdater.from_discrete(container, ax=ax, **kwargs)
-    collection = updater.add_points(coords)
-    updater.add_colorbar(collection)
+    if aggregate is None:
+        collection = updater.add_points(coords, cull=cull)
+    else:
+        collection = updater.add_grid(grid, empty, regrid)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(updater, cbar, palette, labels=labels)
     return updater.ax
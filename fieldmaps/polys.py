@@ -1,10 +1,12 @@
 """Polygon maps."""
 
+from .geometry import Polygons
+from .handle import MapHandle
 from .settings import continuous_palette, discrete_palette
 from .utils import AxesUpdater, DataContainer
 
 
-def poly_cont(data, verts, ax=None, palette=continuous_palette, lower=None, upper=None, **kwargs):  # noqa
+def poly_cont(data, verts, ax=None, palette=continuous_palette, lower=None, upper=None, offsets=None, simplify=False, burn=False, resolution=None, cull=False, colorbar=True, handle=False, sentinel=None, **kwargs):  # noqa
     """Plot a map from continous values tied to polygons.
 
     Parameters
@@ -12,9 +14,11 @@ def poly_cont(data, verts, ax=None, palette=continuous_palette, lower=None, uppe
     data : one-dim sequence
         Variable to be plotted. If the sequence is a masked array,
         masked values will be treated as missing data.
-    verts : sequence
+    verts : sequence, array of shape (n, 2) or Polygons
         Sequence of polygon coordinates. See
         `matplotlib.collections.PolyCollection` for more information.
+        If `offsets` is given, the coordinates of all of the polygons
+        in a single array instead.
     ax : matplotlib Axes, optional
         The axis onto which the plot will be drawn. If not provided,
         a new axis will be created.
@@ -26,36 +30,93 @@ def poly_cont(data, verts, ax=None, palette=continuous_palette, lower=None, uppe
         If provided, the lower bound for which data should be displayed.
     upper : numeric, optional
         If provided, the upper bound for which data should be displayed.
+    offsets : one-dim sequence of int, optional
+        Position in `verts` of the first vertex of each polygon, followed
+        by the total number of vertices. Polygons are then drawn from
+        views of `verts`, without building a sequence of arrays.
+    simplify : bool, optional
+        If True, vertices which would be drawn within half a pixel of the
+        simplified outline of their polygon are dropped, based on the
+        size of the axes. Polygons are simplified again as the view
+        changes, with the results cached for each level of detail.
+    burn : bool, optional
+        If True, the polygons are rasterized onto a regular grid, taking
+        the value of the polygon covering the center of each cell, and
+        the grid is drawn as a raster. Cells outside of the polygons are
+        left blank. This is much faster than drawing each polygon when
+        there are many of them.
+    resolution : numeric or pair of numerics, optional
+        Size of the grid cells in the units of `verts`, used when
+        burning. If not provided, the grid will have about one cell per
+        pixel of the axes.
+    cull : bool, optional
+        If True, only the polygons within or near the view of the axes
+        are drawn, found with a spatial index built once. The polygons
+        drawn are updated as the view changes, so that zoomed in maps
+        redraw faster. Not used when burning.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
+    sentinel : numeric, optional
+        Value marking missing data (e.g. a no-data value such as -9999),
+        which is treated as missing along with NaN and infinite values.
     kwargs
         Keyword arguments to be passed to
-        `matplotlib.collections.PolyCollection`.
+        `matplotlib.collections.PolyCollection`, or to `imshow` when
+        burning.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
     container = DataContainer.from_continuous(
         data,
         palette,
         lower=lower,
-        upper=upper)
+        upper=upper,
+        sentinel=sentinel)
+    if offsets is not None:
+        verts = Polygons(verts, offsets)
+
     updater = AxesUpdater.from_continuous(container, ax=ax, **kwargs)
-    collection = updater.add_polygons(verts)
-    updater.add_colorbar(collection)
+    if burn:
+        collection = updater.add_burned(verts, resolution)
+    else:
+        collection = updater.add_polygons(
+            verts,
+            simplify=simplify,
+            cull=cull)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(
+            updater,
+            cbar,
+            palette,
+            lower,
+            upper,
+            sentinel=sentinel)
     return updater.ax
 
-def poly_discrete(data, verts, ax=None, palette=discrete_palette, **kwargs):
+def poly_discrete(data, verts, ax=None, palette=discrete_palette, labels=None, offsets=None, simplify=False, burn=False, resolution=None, cull=False, colorbar=True, handle=False, **kwargs):  # noqa
     """Plot a map from discrete values tied to polygons.
 
     Parameters
     ----------
-    data : one-dim sequence
+    data : one-dim sequence or pandas.Categorical
         Variable to be plotted. If the sequence is a masked array,
-        masked values will be treated as missing data.
-    verts : sequence
+        masked values will be treated as missing data. If `labels`
+        is given or a `pandas.Categorical` is passed, the data are
+        taken as integer codes into the categories.
+    verts : sequence, array of shape (n, 2) or Polygons
         Sequence of polygon coordinates. See
         `matplotlib.collections.PolyCollection` for more information.
+        If `offsets` is given, the coordinates of all of the polygons
+        in a single array instead.
     ax : matplotlib Axes, optional
         The axis onto which the plot will be drawn. If not provided,
         a new axis will be created.
@@ -63,17 +124,65 @@ def poly_discrete(data, verts, ax=None, palette=discrete_palette, **kwargs):
         Name of palette (colormap) to use or None to use the current
         palette. If not provided, the package's default palette will
         be used.
+    labels : sequence, optional
+        Categories which `data` are coded against, such that a value
+        of `i` in `data` corresponds to `labels[i]`. Codes outside of
+        the categories (e.g. -1) are treated as missing data. Integer
+        codes are used without being copied.
+    offsets : one-dim sequence of int, optional
+        Position in `verts` of the first vertex of each polygon, followed
+        by the total number of vertices. Polygons are then drawn from
+        views of `verts`, without building a sequence of arrays.
+    simplify : bool, optional
+        If True, vertices which would be drawn within half a pixel of the
+        simplified outline of their polygon are dropped, based on the
+        size of the axes. Polygons are simplified again as the view
+        changes, with the results cached for each level of detail.
+    burn : bool, optional
+        If True, the polygons are rasterized onto a regular grid, taking
+        the value of the polygon covering the center of each cell, and
+        the grid is drawn as a raster. Cells outside of the polygons are
+        left blank. This is much faster than drawing each polygon when
+        there are many of them.
+    resolution : numeric or pair of numerics, optional
+        Size of the grid cells in the units of `verts`, used when
+        burning. If not provided, the grid will have about one cell per
+        pixel of the axes.
+    cull : bool, optional
+        If True, only the polygons within or near the view of the axes
+        are drawn, found with a spatial index built once. The polygons
+        drawn are updated as the view changes, so that zoomed in maps
+        redraw faster. Not used when burning.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
     kwargs
         Keyword arguments to be passed to
-        `matplotlib.collections.PolyCollection`.
+        `matplotlib.collections.PolyCollection`, or to `imshow` when
+        burning.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
-    container = DataContainer.from_discrete(data, palette)
+    container = DataContainer.from_discrete(data, palette, labels)
+    if offsets is not None:
+        verts = Polygons(verts, offsets)
+
     updater = AxesUpdater.from_discrete(container, ax=ax, **kwargs)
-    collection = updater.add_polygons(verts)
-    updater.add_colorbar(collection)
+    if burn:
+        collection = updater.add_burned(verts, resolution)
+    else:
+        collection = updater.add_polygons(
+            verts,
+            simplify=simplify,
+            cull=cull)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(updater, cbar, palette, labels=labels)
     return updater.ax
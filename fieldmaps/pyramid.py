@@ -0,0 +1,138 @@
+"""Multi-resolution overviews of rasters."""
+
+import itertools
+import numpy as np
+
+
+# Overviews stop once both sides of a level are at most this many cells.
+_min_size = 256
+
+
+def pad_even(x):
+    # Pad the rows and columns of a masked raster with masked cells so
+    # that both have an even length.
+    rows, cols = x.shape
+    pad = ((0, rows % 2), (0, cols % 2))
+    if not any(after for _, after in pad):
+        return np.ma.getdata(x), np.ma.getmaskarray(x)
+
+    data = np.pad(np.ma.getdata(x), pad, mode="edge")
+    mask = np.pad(np.ma.getmaskarray(x), pad, constant_values=True)
+    return data, mask
+
+def blocks(x):
+    # View of a raster with even sides as (rows, cols, 4), with the last
+    # axis holding each 2x2 block.
+    rows, cols = x.shape
+    quads = x.reshape(rows // 2, 2, cols // 2, 2).swapaxes(1, 2)
+    return quads.reshape(rows // 2, cols // 2, 4)
+
+def decimate_mean(x):
+    # Halve the resolution of a continuous raster by averaging the good
+    # cells of each 2x2 block, leaving out masked and NaN cells.
+    data, mask = pad_even(x)
+    dtype = np.result_type(data.dtype, np.float32)
+    valid = ~blocks(mask)
+    if data.dtype.kind == "f":
+        valid &= ~np.isnan(blocks(data))
+    total = np.where(valid, blocks(data), 0).sum(axis=-1, dtype=dtype)
+    count = valid.sum(axis=-1, dtype=np.int8)
+    mean = total / np.maximum(count, 1).astype(dtype)
+    return np.ma.masked_array(mean, count == 0)
+
+def decimate_mode(x):
+    # Halve the resolution of a discrete raster by taking the most common
+    # good value of each 2x2 block. Ties go to the earliest cell.
+    data, mask = pad_even(x)
+    quads = blocks(data)
+    valid = ~blocks(mask)
+
+    # Count the matches of each cell within its block, comparing each
+    # pair of cells once. Masked cells have no matches.
+    cells = [quads[..., i] for i in range(4)]
+    good = [valid[..., i] for i in range(4)]
+    counts = valid.astype(np.int8)
+    for i, j in itertools.combinations(range(4), 2):
+        match = (cells[i] == cells[j]) & good[i] & good[j]
+        counts[..., i] += match
+        counts[..., j] += match
+
+    choice = counts.argmax(axis=-1)[..., None]
+    mode = np.take_along_axis(quads, choice, axis=-1)[..., 0]
+    return np.ma.masked_array(mode, ~valid.any(axis=-1))
+
+class Pyramid(object):
+    """Hold a raster along with overviews at halved resolutions."""
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    @classmethod
+    def build(cls, data, decimate, min_size=_min_size):
+        data = np.ma.asanyarray(data)
+        levels = [data]
+        while max(levels[-1].shape) > min_size:
+            levels.append(decimate(levels[-1]))
+        return cls(levels)
+
+    @classmethod
+    def from_continuous(cls, data, min_size=_min_size):
+        return cls.build(data, decimate_mean, min_size)
+
+    @classmethod
+    def from_discrete(cls, data, min_size=_min_size):
+        return cls.build(data, decimate_mode, min_size)
+
+    def select(self, cells_per_pixel):
+        # Coarsest level which still has at least one cell per pixel.
+        if cells_per_pixel <= 1:
+            return 0
+        level = int(np.floor(np.log2(cells_per_pixel)))
+        return min(level, len(self.levels) - 1)
+
+class PyramidImage(object):
+    """Swap the data of an image for the pyramid level matching the
+    pixel density of its axes.
+
+    The level is chosen again each time the image is drawn, as figures
+    may be saved at another resolution than they're shown at (e.g. with
+    `savefig(dpi=300)`).
+    """
+
+    def __init__(self, image, pyramid):
+        self.image = image
+        self.pyramid = pyramid
+        self.level = 0
+        self.draw_image = image.draw
+        image.draw = self.draw
+
+    def cells_per_pixel(self):
+        # Taken along the direction with the fewest cells per pixel, so
+        # that a level is never coarser than the screen.
+        ax = self.image.axes
+        left, right, bottom, top = self.image.get_extent()
+        rows, cols = self.pyramid.levels[0].shape
+        xmin, xmax = ax.get_xlim()
+        ymin, ymax = ax.get_ylim()
+        width, height = ax.bbox.width, ax.bbox.height
+        if width <= 0 or height <= 0:
+            return 1
+
+        x_cells = abs(xmax - xmin) * cols / abs(right - left)
+        y_cells = abs(ymax - ymin) * rows / abs(top - bottom)
+        return min(x_cells / width, y_cells / height)
+
+    def update(self, *args):
+        # The extent of the image is left as is, so a level with padded
+        # cells is stretched by less than one of its cells.
+        level = self.pyramid.select(self.cells_per_pixel())
+        if level != self.level:
+            self.level = level
+            self.image.set_data(self.pyramid.levels[level])
+        return level
+
+    def draw(self, renderer, *args, **kwargs):
+        # While a figure is drawn, its resolution is that of the output,
+        # so the size of the axes is in the pixels being drawn.
+        self.update()
+        return self.draw_image(renderer, *args, **kwargs)
@@ -1,8 +1,10 @@
+from .handle import MapHandle
 from .settings import continuous_palette, discrete_palette
+from .stack import encode_frame, stack_categories, stack_range
 from .utils import AxesUpdater, DataContainer
 
 
-def raster_cont(data, ax=None, palette=continuous_palette, lower=None, upper=None, **kwargs):  # noqa
+def raster_cont(data, ax=None, palette=continuous_palette, lower=None, upper=None, pyramid=False, frame=0, colorbar=True, handle=False, sentinel=None, **kwargs):  # noqa
     """Plot a raster with continuous values.
 
     Parameters
@@ -21,35 +23,75 @@ def raster_cont(data, ax=None, palette=continuous_palette, lower=None, upper=Non
         If provided, the lower bound for which data should be displayed.
     upper : numeric, optional
         If provided, the upper bound for which data should be displayed.
+    pyramid : bool, optional
+        If True, overviews of the raster at halved resolutions are built
+        by averaging, and the image shows the overview which matches the
+        pixel density of the axes as the view changes.
+    frame : int, optional
+        Frame of a stack to be plotted. The color scale is fit to the
+        whole stack (within `lower` and `upper`), so that maps of each
+        frame can be compared. The stack is read a frame at a time, so
+        it may be memory-mapped.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
+    sentinel : numeric, optional
+        Value marking missing data (e.g. a no-data value such as -9999),
+        which is treated as missing along with NaN and infinite values.
     kwargs
         Keyword arguments to be passed to `imshow`.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
-    if data.ndim > 2:
-        raise ValueError("Only 2-dim rasters are supported")
+    if data.ndim > 3:
+        raise ValueError("Only 2-dim rasters and 3-dim stacks are supported")
+
+    clim = None
+    if data.ndim == 3:
+        clim = stack_range(data, sentinel)
+        data = data[frame]
 
     container = DataContainer.from_continuous(
         data,
         palette,
         lower=lower,
-        upper=upper)
+        upper=upper,
+        sentinel=sentinel)
     updater = AxesUpdater.from_continuous(container, ax=ax, **kwargs)
-    collection = updater.add_raster()
-    updater.add_colorbar(collection)
+    collection = updater.add_raster(pyramid=pyramid)
+    if clim is not None:
+        vmin, vmax = clim
+        collection.set_clim(
+            vmin if lower is None else lower,
+            vmax if upper is None else upper)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(
+            updater,
+            cbar,
+            palette,
+            lower,
+            upper,
+            sentinel=sentinel)
     return updater.ax
 
-def raster_discrete(data, ax=None, palette=discrete_palette, **kwargs):
+def raster_discrete(data, ax=None, palette=discrete_palette, labels=None, chunksize=None, n_jobs=None, pyramid=False, frame=0, colorbar=True, handle=False, **kwargs):  # noqa
     """Plot a raster with discrete data.
 
     Parameters
     ----------
-    data : ndarray, shape (n, m)
-        Raster to be plotted. If the raster is a masked array, masked
-        values will be treated as missing data.
+    data : ndarray, shape (n, m) or (t, n, m)
+        Raster to be plotted, or a stack of rasters (e.g. one per date)
+        of which one frame is plotted. If the raster is a masked array,
+        masked values will be treated as missing data. If `labels` is
+        given, the raster holds integer codes into the categories.
     ax : matplotlib Axes, optional
         The axis onto which the plot will be drawn. If not provided,
         a new axis will be created.
@@ -57,19 +99,64 @@ def raster_discrete(data, ax=None, palette=discrete_palette, **kwargs):
         Name of palette (colormap) to use or None to use the current
         palette. If not provided, the package's default palette will
         be used.
+    labels : sequence, optional
+        Categories which `data` are coded against, such that a value
+        of `i` in `data` corresponds to `labels[i]`. Codes outside of
+        the categories (e.g. -1) are treated as missing data. Integer
+        codes are used without being copied.
+    chunksize : int, optional
+        If provided, the raster is encoded in blocks of rows holding at
+        most this many cells, so that large (e.g. memory-mapped) rasters
+        are never fully loaded into memory while being encoded.
+    n_jobs : int, optional
+        If provided, the number of threads used to find the categories
+        and encode the raster, split into blocks of rows. Negative
+        values count back from the number of CPUs, so that -1 uses all
+        of them. The result is the same as when encoding serially.
+    pyramid : bool, optional
+        If True, overviews of the raster at halved resolutions are built
+        from the most common category of each block, and the image shows
+        the overview which matches the pixel density of the axes as the
+        view changes.
+    frame : int, optional
+        Frame of a stack to be plotted. The categories are found over
+        the whole stack, so that maps of each frame share their colors.
+        The stack is read a frame at a time, so it may be memory-mapped.
+    colorbar : bool or "light", optional
+        Whether to draw a colorbar. If "light", a colorbar is drawn from
+        an image and ticks cached across maps, without resizing the axes
+        or drawing extensions, which is much faster for small maps.
+    handle : bool, optional
+        If True, a `MapHandle` is returned instead of the axes, for
+        updating the values of the map in place.
     kwargs
         Keyword arguments to be passed to `imshow`.
 
     Returns
     -------
-    matplotlib Axes
+    matplotlib Axes, or MapHandle if `handle` is True
     """
 
-    if data.ndim > 2:
-        raise ValueError("Only 2-dim rasters are supported")
+    if data.ndim > 3:
+        raise ValueError("Only 2-dim rasters and 3-dim stacks are supported")
 
-    container = DataContainer.from_discrete(data, palette)
+    codes = labels
+    if data.ndim == 3 and labels is None:
+        # The frame is coded against the categories of the whole stack.
+        codes = stack_categories(data)
+        data = encode_frame(data[frame], codes)
+    elif data.ndim == 3:
+        data = data[frame]
+
+    container = DataContainer.from_discrete(
+        data,
+        palette,
+        codes,
+        chunksize=chunksize,
+        n_jobs=n_jobs)
     updater = AxesUpdater.from_discrete(container, ax=ax, **kwargs)
-    collection = updater.add_raster()
-    updater.add_colorbar(collection)
+    collection = updater.add_raster(pyramid=pyramid)
+    cbar = updater.add_colorbar(collection, colorbar)
+    if handle:
+        return MapHandle(updater, cbar, palette, labels=labels)
     return updater.ax
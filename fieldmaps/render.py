@@ -0,0 +1,80 @@
+"""Render maps straight to image bytes, without pyplot."""
+
+import io
+
+import numpy as np
+
+
+def resolve(fn):
+    # Plotting function given by its name, such as "raster_cont".
+    if callable(fn):
+        return fn
+    import fieldmaps
+    return getattr(fieldmaps, fn)
+
+def draw(fn, args, kwargs=None, size=(6, 6), dpi=100):
+    # Draw a map on a new figure with an Agg canvas, which isn't known to
+    # pyplot and so is freed once it's no longer used.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    resolve(fn)(*args, ax=ax, **(kwargs or {}))
+    return fig
+
+def render_png(kind, data, geometry=None, size=(6, 6), dpi=100, format="png", cache=None, **kwargs):  # noqa
+    """Render a map to the bytes of an image.
+
+    The map is drawn on its own figure with the Agg backend, without
+    going through pyplot, so no state is kept between calls. This suits
+    web services returning maps, for example.
+
+    Parameters
+    ----------
+    kind : string or callable
+        Name of a fieldmaps plotting function, such as "raster_cont" or
+        "poly_discrete", or a function taking `ax` as a keyword argument.
+    data : array
+        Measure variable of the map.
+    geometry : array or Polygons, optional
+        Coordinates of the points or vertices of the polygons. Not needed
+        for rasters.
+    size : pair of numerics, optional
+        Size of the image in inches.
+    dpi : numeric, optional
+        Resolution of the image in dots per inch.
+    format : string, optional
+        Format of the image, such as "png" or "jpg". If "rgba", the pixels
+        are returned as an array instead.
+    cache : OutputCache, optional
+        Cache of rendered maps, from which the image is read if the same
+        map was rendered before, without drawing it. Pixels are never
+        cached.
+    kwargs
+        Keyword arguments to be passed to the plotting function.
+
+    Returns
+    -------
+    bytes or ndarray, shape (height, width, 4)
+        Encoded image, or its pixels if `format` is "rgba".
+    """
+
+    args = (data,) if geometry is None else (data, geometry)
+    if cache is not None and format != "rgba":
+        key = cache.key(kind, args, kwargs, size, dpi, format)
+        content = cache.get(key, format)
+        if content is not None:
+            return content
+        content = render_png(kind, data, geometry, size, dpi, format, **kwargs)
+        return cache.put(key, content, format)
+
+    fig = draw(kind, args, kwargs, size, dpi)
+    if format == "rgba":
+        fig.canvas.draw()
+        return np.array(fig.canvas.buffer_rgba())
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=format)
+    return buffer.getvalue()
@@ -4,6 +4,8 @@ from matplotlib.cm import get_cmap, register_cmap
 from matplotlib.colors import ListedColormap
 from numpy import array
 
+import threading
+
 
 #: Default color palette for continuous data.
 continuous_palette = "YlGn"
@@ -49,7 +51,29 @@ def mk_discrete_cmap(name):
     colors = [tab20.colors[i] for i in regular_color_idx + light_color_idx]
     return ListedColormap(tuple(colors), name=name)
 
-register_cmap(cmap=mk_discrete_cmap(discrete_palette))
+# Whether the package's palettes are registered with matplotlib, which is
+# left until they are first used to keep importing the package quick.
+_registered = False
+_register_lock = threading.Lock()
+
+def register_palettes():
+    """Register the package's palettes with matplotlib, so that they can
+    be used by name (e.g. with `matplotlib.pyplot.get_cmap`).
+
+    This is done the first time the plotting functions look up a palette,
+    so it's only needed to use the palettes before then.
+    """
+
+    global _registered
+    with _register_lock:
+        if not _registered:
+            register_cmap(cmap=mk_discrete_cmap(discrete_palette))
+            _registered = True
+
+def get_colormap(palette):
+    # Colormap of a palette, registering the package's palettes first.
+    register_palettes()
+    return get_cmap(palette)
 
 def apply_theme(*axes, grid=False):
     """Update one or more axes with the package theme.
@@ -0,0 +1,198 @@
+"""Spatial index of features, for drawing only those in view."""
+
+import numpy as np
+
+from .geometry import expand
+
+
+# Fraction of the view added on each side when finding the features in
+# view, so that small pans don't change the features drawn.
+_margin = .1
+
+# Most cells along each side of an index grid.
+_max_cells = 1024
+
+
+def point_bounds(coords):
+    # Bounds of points, as (xmin, ymin, xmax, ymax) for each point.
+    return np.concatenate((coords, coords), axis=1)
+
+def ring_bounds(polygons):
+    # Bounds of the rings of polygons, as (xmin, ymin, xmax, ymax) for
+    # each ring.
+    starts = polygons.starts
+    lower = np.minimum.reduceat(polygons.coords, starts, axis=0)
+    upper = np.maximum.reduceat(polygons.coords, starts, axis=0)
+    return np.concatenate((lower, upper), axis=1)
+
+class GridIndex(object):
+    """Index bounding boxes on a uniform grid.
+
+    Each box is listed under every cell of the grid it overlaps, with
+    the lists of all cells packed into a single array.
+
+    Parameters
+    ----------
+    bounds : array, shape (n, 4)
+        Bounding boxes, as (xmin, ymin, xmax, ymax) for each feature.
+    """
+
+    def __init__(self, bounds):
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        self.bounds = bounds
+        if len(bounds):
+            self.extent = (
+                *bounds[:, :2].min(axis=0),
+                *bounds[:, 2:].max(axis=0))
+        else:
+            self.extent = (0., 0., 0., 0.)
+
+        # About one box per cell.
+        side = int(np.clip(np.ceil(np.sqrt(len(bounds))), 1, _max_cells))
+        self.shape = (side, side)
+        xmin, ymin, xmax, ymax = self.extent
+        self.cell_size = (
+            (xmax - xmin) / side or 1.,
+            (ymax - ymin) / side or 1.)
+
+        col0, row0, col1, row1 = self.cell_range(bounds)
+        width = col1 - col0 + 1
+        count = width * (row1 - row0 + 1)
+        box, k = expand(np.zeros(len(bounds), dtype=np.intp), count)
+        row = row0[box] + k // width[box]
+        col = col0[box] + k % width[box]
+        cells = row * side + col
+
+        order = np.argsort(cells, kind="mergesort")
+        self.boxes = box[order]
+        counts = np.bincount(cells, minlength=side * side)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    @classmethod
+    def from_points(cls, coords):
+        return cls(point_bounds(np.asarray(coords, dtype=float)))
+
+    @classmethod
+    def from_polygons(cls, polygons):
+        return cls(ring_bounds(polygons))
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def cell_range(self, bounds):
+        # Columns and rows of the cells spanned by each box, clipped to
+        # the grid, as (col0, row0, col1, row1).
+        xmin, ymin, _, _ = self.extent
+        dx, dy = self.cell_size
+        rows, cols = self.shape
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        cells = np.floor((bounds - (xmin, ymin, xmin, ymin)) / (dx, dy, dx, dy))
+        cells[:, 0::2] = np.clip(cells[:, 0::2], 0, cols - 1)
+        cells[:, 1::2] = np.clip(cells[:, 1::2], 0, rows - 1)
+        return cells.astype(np.intp).T
+
+    def query(self, box):
+        """Find the features whose bounding boxes intersect a box.
+
+        Parameters
+        ----------
+        box : sequence of numerics
+            Box as (xmin, ymin, xmax, ymax).
+
+        Returns
+        -------
+        ndarray of int
+            Sorted indices of the features.
+        """
+
+        xmin, ymin, xmax, ymax = map(float, box)
+        exmin, eymin, exmax, eymax = self.extent
+        outside = (
+            xmax < exmin or xmin > exmax or ymax < eymin or ymin > eymax)
+        if not len(self) or outside:
+            return np.empty(0, dtype=np.intp)
+        covers = all((
+            xmin <= exmin, ymin <= eymin, xmax >= exmax, ymax >= eymax))
+        if covers:
+            return np.arange(len(self))
+
+        (col0,), (row0,), (col1,), (row1,) = self.cell_range(box)
+        rows = np.arange(row0, row1 + 1)
+        cols = np.arange(col0, col1 + 1)
+        cells = (rows[:, None] * self.shape[1] + cols).ravel()
+        starts = self.offsets[cells]
+        _, position = expand(starts, self.offsets[cells + 1] - starts)
+        found = np.unique(self.boxes[position])
+
+        bounds = self.bounds[found]
+        hit = np.all(
+            (bounds[:, :2] <= (xmax, ymax)) & (bounds[:, 2:] >= (xmin, ymin)),
+            axis=1)
+        return found[hit]
+
+class ViewportCulling(object):
+    """Keep only the features of a collection near the view of its
+    axes, along with their values in `data`."""
+
+    def __init__(self, collection, index, data, margin=_margin):
+        self.collection = collection
+        self.index = index
+        self.data = data
+        self.margin = margin
+        # Collections start out with all of the features.
+        self.visible = np.arange(len(index))
+
+    def viewport(self):
+        # Limits of the axes, widened by the margin on each side.
+        ax = self.collection.axes
+        xmin, xmax = sorted(ax.get_xlim())
+        ymin, ymax = sorted(ax.get_ylim())
+        dx = (xmax - xmin) * self.margin
+        dy = (ymax - ymin) * self.margin
+        return (xmin - dx, ymin - dy, xmax + dx, ymax + dy)
+
+    def update(self, *args):
+        visible = self.index.query(self.viewport())
+        if not np.array_equal(visible, self.visible):
+            self.visible = visible
+            self.show(visible)
+        return visible
+
+    def show(self, visible):
+        # Set the features at the indices `visible` on the collection.
+        # Subclasses set the geometry of the features before their values.
+        self.collection.set_array(self.data[visible])
+
+class PointCulling(ViewportCulling):
+    """Keep only the points of a scatter plot near the view."""
+
+    def __init__(self, collection, coords, data, margin=_margin):
+        self.coords = coords
+        index = GridIndex.from_points(coords)
+        super().__init__(collection, index, data, margin)
+
+    def show(self, visible):
+        self.collection.set_offsets(self.coords[visible])
+        super().show(visible)
+
+class PolygonCulling(ViewportCulling):
+    """Keep only the polygons of a collection near the view.
+
+    If a level of detail is given, the polygons in view are drawn at its
+    current tolerance.
+    """
+
+    def __init__(self, collection, polygons, data, detail=None,
+                 margin=_margin):
+        self.polygons = polygons
+        self.detail = detail
+        index = GridIndex.from_polygons(polygons)
+        super().__init__(collection, index, data, margin)
+
+    def show(self, visible):
+        if self.detail is None:
+            self.collection.set_paths(self.polygons.paths(visible))
+        else:
+            self.detail.visible = visible
+            self.detail.refresh()
+        super().show(visible)
@@ -0,0 +1,78 @@
+"""Handle stacks of rasters, e.g. one per date, a frame at a time."""
+
+import numpy as np
+
+from . import mapping
+from .utils import mask, value_range
+
+
+def frames(stack, sentinel=None):
+    # Frames of a stack as masked arrays, loading only one at a time from
+    # memory-mapped stacks.
+    for i in range(len(stack)):
+        yield mask(stack[i], sentinel)
+
+def stack_range(stack, sentinel=None):
+    """Find the smallest and largest good values of a stack of rasters.
+
+    Parameters
+    ----------
+    stack : array, shape (t, n, m)
+        Stack of rasters, which may be memory-mapped. Masked, NaN and
+        infinite values are left out.
+    sentinel : numeric, optional
+        Value marking missing data, which is also left out.
+
+    Returns
+    -------
+    (vmin, vmax) : tuple of float
+        Range of the stack, or (None, None) if it has no good values.
+    """
+
+    vmin = vmax = None
+    for frame in frames(stack, sentinel):
+        lo, hi = value_range(frame)
+        if lo is None:
+            continue
+        lo, hi = float(lo), float(hi)
+        vmin = lo if vmin is None else min(vmin, lo)
+        vmax = hi if vmax is None else max(vmax, hi)
+    return vmin, vmax
+
+def stack_categories(stack):
+    """Find the categories of a stack of discrete rasters.
+
+    Parameters
+    ----------
+    stack : array, shape (t, n, m)
+        Stack of rasters, which may be memory-mapped. Masked values are
+        left out.
+
+    Returns
+    -------
+    ndarray
+        Sorted categories found in any of the frames.
+    """
+
+    values = []
+    for i in range(len(stack)):
+        frame = np.ma.asanyarray(stack[i])
+        good = np.ma.getdata(frame)
+        if frame.mask is not np.ma.nomask:
+            good = good[~frame.mask]
+        values.append(mapping.unique(good))
+    if not values:
+        return np.empty(0)
+    return np.unique(np.concatenate(values))
+
+def encode_frame(frame, categories):
+    # Codes of a frame into the sorted categories of its stack, as taken
+    # by the `labels` argument of the discrete functions. Values which
+    # aren't among the categories are masked.
+    frame = np.ma.asanyarray(frame)
+    codes, found = mapping.encode(
+        np.ma.getdata(frame),
+        np.asarray(categories),
+        return_found=True)
+    missing = np.ma.getmaskarray(frame) | ~found
+    return np.ma.masked_array(codes, missing)
@@ -0,0 +1,377 @@
+"""Cut layers into XYZ tiles for web maps, with memory and disk caches."""
+
+from http.server import BaseHTTPRequestHandler
+
+import io
+import json
+import os
+import shutil
+import threading
+import timeit
+
+import numpy as np
+
+from . import spatial
+from .cache import LRUCache, content_hash, write_atomic
+from .colorize import colorize, data_range
+from .geometry import Polygons, burn
+from .grid import Grid
+from .settings import continuous_palette, discrete_palette
+from .utils import DataContainer, pil_image
+
+
+# Deepest zoom level served, beyond which the tile coordinates would
+# overflow.
+_max_zoom = 30
+
+# Number of tiles held in memory by each tile set.
+_cache_size = 1024
+
+
+def encode_png(pixels):
+    Image = pil_image()
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class TileSet(object):
+    """Render the XYZ tiles of a raster, point or polygon layer.
+
+    Tiles cover the square which holds the layer, anchored at its top
+    left corner: a single tile at zoom 0, and `2 ** z` tiles along each
+    side at zoom `z`, with `y` counted down from the top. Rasters are
+    placed with a unit square per cell and the first row at the top, as
+    drawn by `raster_cont`. Points are drawn as single pixels, and
+    polygons are filled as with `burn=True`. Pixels without any feature
+    are transparent.
+
+    All of the tiles share the colors of the layer, as found over all of
+    its data. Tiles are kept in memory and, if `cache_dir` is given, as
+    PNG files under a directory named after the layer and then one named
+    after its version, so that tiles of older data are never served and
+    several layers can share `cache_dir`.
+
+    Parameters
+    ----------
+    kind : {"raster", "points", "polygons"}
+        Kind of geometry of the layer.
+    data : array
+        Measure variable of the layer. Masked values are treated as
+        missing data, as are NaN and infinite values of continuous data.
+    geometry : array or Polygons, optional
+        Coordinates of the points or vertices of the polygons, as taken
+        by `point_cont` or `poly_cont`. Not needed for rasters.
+    discrete : bool, optional
+        If True, the data is colored as by `raster_discrete`, and as by
+        `raster_cont` otherwise.
+    palette : None or string, optional
+        Name of palette (colormap) to use. If not provided, the package's
+        default palette for the kind of data will be used.
+    lower, upper : numeric, optional
+        Bounds of continuous data, as taken by `raster_cont`.
+    labels : sequence, optional
+        Categories which discrete data is coded against, as taken by
+        `raster_discrete`.
+    tile_size : int, optional
+        Width and height of the tiles in pixels.
+    version : string, optional
+        Version of the data, such as a timestamp. If not provided, a hash
+        of the data, geometry and colors is used.
+    cache_dir : string, optional
+        Directory in which tiles are saved.
+    cache_size : int, optional
+        Number of tiles held in memory.
+    name : string, optional
+        Name of the layer, under which its tiles are saved in
+        `cache_dir`. Required with `cache_dir`.
+    """
+
+    def __init__(self, kind, data, geometry=None, discrete=False, palette=None, lower=None, upper=None, labels=None, tile_size=256, version=None, cache_dir=None, cache_size=_cache_size, name=None):  # noqa
+        if kind not in ("raster", "points", "polygons"):
+            raise ValueError("Unknown kind of layer: {!r}".format(kind))
+        if kind != "raster" and geometry is None:
+            raise ValueError("A geometry must be given for points and polygons")
+        if cache_dir is not None and not name:
+            raise ValueError("A name must be given for layers saved on disk")
+
+        if discrete:
+            palette = discrete_palette if palette is None else palette
+            container = DataContainer.from_discrete(data, palette, labels)
+        else:
+            palette = continuous_palette if palette is None else palette
+            container = DataContainer.from_continuous(
+                data,
+                palette,
+                lower=lower,
+                upper=upper)
+            norm = container.norm
+            lo, hi = data_range(
+                np.ma.getdata(container.data),
+                np.ma.getmask(container.data))
+            norm.vmin = lo if norm.vmin is None else norm.vmin
+            norm.vmax = hi if norm.vmax is None else norm.vmax
+
+        self.kind = kind
+        self.container = container
+        self.values = np.ma.getdata(container.data).ravel()
+        self.mask = np.ma.getmaskarray(container.data).ravel()
+        self.tile_size = tile_size
+
+        if kind == "raster":
+            self.shape = container.data.shape
+            rows, cols = self.shape
+            bounds = (0., 0., float(cols), float(rows))
+            coords = ()
+        elif kind == "points":
+            geometry = np.asarray(geometry, dtype=float)
+            self.index = spatial.GridIndex.from_points(geometry)
+            bounds = self.index.extent
+            coords = (geometry,)
+        else:
+            if not isinstance(geometry, Polygons):
+                geometry = Polygons.from_verts(geometry)
+            self.index = spatial.GridIndex.from_polygons(geometry)
+            bounds = self.index.extent
+            coords = (geometry.coords, geometry.offsets)
+        self.geometry = geometry
+
+        # The tiles cover a square anchored at the top left of the layer.
+        xmin, ymin, xmax, ymax = bounds
+        self.origin = (xmin, ymax)
+        self.side = max(xmax - xmin, ymax - ymin) or 1.
+
+        if version is None:
+            version = content_hash(
+                kind,
+                np.ma.getdata(container.data),
+                self.mask,
+                *coords,
+                container.ticklabels,
+                palette,
+                container.norm.vmin,
+                container.norm.vmax,
+                tile_size)
+        self.version = str(version)
+        self.cache_dir = cache_dir
+        self.name = name
+
+        self.tiles = LRUCache(cache_size)
+        self.disk_hits = 0
+        self.rendered = 0
+        self.render_seconds = 0.
+        self.lock = threading.Lock()
+
+    def tile_bounds(self, z, x, y):
+        """Find the bounds of a tile.
+
+        Returns
+        -------
+        tuple of float
+            Bounds as (xmin, ymin, xmax, ymax).
+        """
+
+        n = 2 ** z if 0 <= z <= _max_zoom else 0
+        if not (0 <= x < n and 0 <= y < n):
+            raise ValueError("No tile {}/{}/{}".format(z, x, y))
+        side = self.side / n
+        left, top = self.origin
+        xmin, ymax = left + x * side, top - y * side
+        return (xmin, ymax - side, xmin + side, ymax)
+
+    def features(self, grid):
+        # Flat index into the data of the feature drawn at each pixel of a
+        # grid, or -1 where there is none.
+        if self.kind == "raster":
+            xmin, ymin = grid.origin
+            dx, dy = grid.resolution
+            rows, cols = grid.shape
+            n_rows, n_cols = self.shape
+            x = xmin + (np.arange(cols) + .5) * dx
+            y = ymin + (np.arange(rows)[::-1] + .5) * dy
+            col = np.floor(x).astype(np.intp)
+            row = np.floor(n_rows - y).astype(np.intp)
+            index = row[:, None] * n_cols + col
+            index[(row < 0) | (row >= n_rows)] = -1
+            index[:, (col < 0) | (col >= n_cols)] = -1
+            return index
+
+        xmin, xmax, ymin, ymax = grid.extent
+        found = self.index.query((xmin, ymin, xmax, ymax))
+        index = np.full(grid.size, -1, dtype=np.intp)
+        if not len(found):
+            return index.reshape(grid.shape)
+
+        if self.kind == "points":
+            cells = grid.cell_index(self.geometry[found])
+            inside = cells >= 0
+            cells, found = cells[inside], found[inside]
+            # The last point in a cell is drawn on top.
+            cells, last = np.unique(cells[::-1], return_index=True)
+            index[cells] = found[::-1][last]
+            return index.reshape(grid.shape)
+
+        subset = Polygons.from_verts(self.geometry.rings(found))
+        burned = burn(subset, grid)
+        return np.where(burned < 0, -1, found[burned])
+
+    def render(self, z, x, y):
+        """Render a tile, without using the caches.
+
+        Returns
+        -------
+        ndarray of uint8, shape (tile_size, tile_size, 4)
+            RGBA pixels of the tile.
+        """
+
+        xmin, ymin, xmax, _ = self.tile_bounds(z, x, y)
+        size = self.tile_size
+        resolution = (xmax - xmin) / size
+        grid = Grid((xmin, ymin), (resolution, resolution), (size, size))
+        index = self.features(grid)
+        empty = index < 0
+        index[empty] = 0
+
+        container = self.container
+        values = np.ma.masked_array(
+            self.values[index],
+            self.mask[index] | empty)
+        pixels = colorize(DataContainer(
+            values,
+            container.colormap,
+            container.norm,
+            container.ticklabels))
+        pixels.view(np.uint32)[..., 0][empty] = 0
+        return pixels
+
+    def tile_path(self, z, x, y):
+        return os.path.join(
+            self.cache_dir,
+            self.name,
+            self.version,
+            str(z),
+            str(x),
+            "{}.png".format(y))
+
+    def tile(self, z, x, y):
+        """Get a tile as PNG bytes, from the caches if possible.
+
+        Parameters
+        ----------
+        z, x, y : int
+            Zoom level and position of the tile.
+
+        Returns
+        -------
+        bytes
+            PNG image of the tile.
+        """
+
+        key = (z, x, y)
+        png = self.tiles.get(key)
+        if png is not None:
+            return png
+
+        path = None if self.cache_dir is None else self.tile_path(z, x, y)
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                png = f.read()
+            with self.lock:
+                self.disk_hits += 1
+            return self.tiles.put(key, png)
+
+        start = timeit.default_timer()
+        png = encode_png(self.render(z, x, y))
+        with self.lock:
+            self.rendered += 1
+            self.render_seconds += timeit.default_timer() - start
+        if path is not None:
+            write_atomic(path, png)
+        return self.tiles.put(key, png)
+
+    def prune(self):
+        # Remove the tiles of other versions of the layer from the disk
+        # cache, leaving those of other layers.
+        if self.cache_dir is None:
+            return
+        layer_dir = os.path.join(self.cache_dir, self.name)
+        if not os.path.isdir(layer_dir):
+            return
+        for version in os.listdir(layer_dir):
+            path = os.path.join(layer_dir, version)
+            if version != self.version and os.path.isdir(path):
+                shutil.rmtree(path)
+
+    def stats(self):
+        """Count the tiles served from each cache and rendered.
+
+        Returns
+        -------
+        dict
+            Hits of the memory and disk caches, tiles rendered, the share
+            of requests served from either cache, and the tiles rendered
+            per second of rendering. The share and the speed are None
+            until there are requests and rendered tiles, so that the
+            statistics stay valid JSON.
+        """
+
+        memory = self.tiles.stats()
+        requests = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "rendered": self.rendered,
+            "hit_rate": hits / requests if requests else None,
+            "tiles_per_second": (
+                self.rendered / self.render_seconds
+                if self.render_seconds else None),
+        }
+
+def make_handler(tilesets):
+    """Build a handler serving tiles with `http.server`, e.g. to try out
+    tile sets with a web map locally.
+
+    Tiles are served at "/<name>/<z>/<x>/<y>.png", and the statistics of
+    all of the tile sets as JSON at "/stats".
+
+    Parameters
+    ----------
+    tilesets : dict
+        Tile sets by name.
+
+    Returns
+    -------
+    subclass of http.server.BaseHTTPRequestHandler
+    """
+
+    class TileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if parts == ["stats"]:
+                stats = {
+                    name: tileset.stats()
+                    for name, tileset in tilesets.items()
+                }
+                body = json.dumps(stats).encode()
+                return self.reply(200, "application/json", body)
+
+            try:
+                name, z, x, y = parts
+                if not y.endswith(".png"):
+                    raise ValueError(y)
+                png = tilesets[name].tile(int(z), int(x), int(y[:-4]))
+            except (KeyError, ValueError):
+                return self.reply(404, "text/plain", b"No such tile")
+            self.reply(200, "image/png", png)
+
+        def reply(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return TileHandler
@@ -1,14 +1,18 @@
 """Internal utility functions."""
 
-from matplotlib.colors import BoundaryNorm, Normalize
-from matplotlib.pyplot import gca
+from matplotlib.colors import BoundaryNorm, ListedColormap, Normalize
 
+import copy
 import numpy as np
-import matplotlib.cm as cm
-import matplotlib.collections as collections
 
 from .settings import color_missing, im_settings, point_settings
+from .grid import Grid
+from . import colormaps
+from . import geometry
 from . import mapping
+from . import memo
+from . import pyramid as pyramids
+from . import spatial
 
 
 def get_extend(norm):
@@ -26,37 +30,148 @@ def get_extend(norm):
         return "max"
     return "neither"
 
-def mask(data):
-    # TODO: pass through if already masked?
-    return np.ma.MaskedArray(data, np.isnan(data) | ~np.isfinite(data))
+def connect_view_change(ax, callback):
+    # Call `callback` whenever the limits of the axes or the size of the
+    # figure change. A closure is held by the callback registries, which
+    # only keep weak references to bound methods.
+    def on_change(*args):
+        callback()
+
+    ax.callbacks.connect("xlim_changed", on_change)
+    ax.callbacks.connect("ylim_changed", on_change)
+    ax.figure.canvas.mpl_connect("resize_event", on_change)
+    return on_change
+
+def pil_image():
+    # Image module of Pillow, which is only needed to write PNG tiles and
+    # GIF animations, and so isn't a required dependency.
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "Pillow is required to write tiles and animations, e.g. "
+            "installed with the \"images\" extra of fieldmaps") from None
+    return Image
+
+def mask(data, sentinel=None):
+    # Mark the missing values of continuous data. NaN is the marker of
+    # missing float data: it's left in place without a mask, and drawn
+    # with the color of missing values of the colormap. A mask is only
+    # built for infinities and for values equal to `sentinel` (e.g. a
+    # no-data value such as -9999). Masked arrays keep their mask, and
+    # their infinities aren't masked, so that they can be drawn. Neither
+    # the data nor an existing mask is copied, and data without masked
+    # values is left without a mask (`nomask`).
+    check_finite = not isinstance(data, np.ma.MaskedArray)
+    data = np.ma.asanyarray(data)
+    values = np.ma.getdata(data)
+    missing = None
+
+    # Non-finite values make the sum non-finite, so clean data is checked
+    # in a single pass without any temporary array, and data with NaN is
+    # only scanned again for infinities, which the reductions of `fmin`
+    # and `fmax` find without a temporary array either. Integers are
+    # always finite.
+    check_finite = check_finite and values.dtype.kind == "f"
+    if check_finite and not np.isfinite(np.sum(values)):
+        lo = np.fmin.reduce(values, axis=None)
+        hi = np.fmax.reduce(values, axis=None)
+        if np.isinf(lo) or np.isinf(hi):
+            missing = np.isinf(values)
+    # A NaN sentinel is already the marker of missing float data.
+    if sentinel is not None and not np.isnan(sentinel):
+        found = values == sentinel
+        missing = found if missing is None else missing | found
+    if missing is None or not missing.any():
+        return data
+
+    current = np.ma.getmask(data)
+    if current is not np.ma.nomask:
+        missing |= current
+    return np.ma.MaskedArray(values, missing, copy=False)
+
+def value_range(data):
+    # Smallest and largest good values of continuous data, leaving out
+    # masked and NaN values, or (None, None) if there are none. Neither a
+    # filled nor a compressed copy of the data is built.
+    data = np.ma.asanyarray(data)
+    values, missing = np.ma.getdata(data), np.ma.getmask(data)
+    if values.dtype.kind != "f":
+        if not np.ma.count(data):
+            return None, None
+        return data.min(), data.max()
+
+    good = True if missing is np.ma.nomask else ~missing
+    lo = np.fmin.reduce(values, axis=None, initial=np.inf, where=good)
+    hi = np.fmax.reduce(values, axis=None, initial=-np.inf, where=good)
+    if lo > hi:
+        return None, None
+    return lo, hi
+
+def culled_setter(collection, culling=None):
+    # Function setting the values of a collection, through its culling
+    # if the collection only holds the features in view.
+    def set_values(values):
+        if culling is None:
+            collection.set_array(values)
+        else:
+            culling.data = np.ma.asanyarray(values)
+            culling.show(culling.visible)
+        return values
+
+    return set_values
 
 class DataContainer(object):
     """Hold the internal representation of the data."""
 
     def __init__(self, data, colormap, norm, ticklabels):
         self.data = data
+        # Colormaps may be shared between maps, so they're never modified.
         self.colormap = colormap
-        self.colormap.set_bad(color_missing)
         self.norm = norm
         self.ticklabels = ticklabels
 
     @classmethod
-    def from_discrete(cls, data, palette):
-        data = np.asanyarray(data)
-        pairs, mock = mapping.create_mapped(data)
+    def from_discrete(cls, data, palette, labels=None, *, chunksize=None,
+                      out=None, n_jobs=None):
+        if labels is None and mapping.is_coded(data):
+            data, labels = data.codes, data.categories
+
+        if labels is not None:
+            # Data is already coded, so the categories don't need to
+            # be discovered.
+            pairs, mock = mapping.create_coded(data, labels)
+            return cls.from_pairs(pairs, mock, palette)
+
+        def build():
+            pairs, mock = mapping.create_mapped(
+                np.asanyarray(data),
+                chunksize=chunksize,
+                out=out,
+                n_jobs=n_jobs)
+            return cls.from_pairs(pairs, mock, palette)
+
+        if out is not None:
+            # The data is written to `out`, which can't be shared.
+            return build()
+        return memo.memoized(build, data, palette)
+
+    @classmethod
+    def from_pairs(cls, pairs, mock, palette):
+        # Container of data encoded by `mapping`, with the pairs of labels
+        # and codes.
         ticklabels, internal_data = zip(*pairs.items())
         norm = mapping.discrete_norm(internal_data)
         colormap = mapping.discrete_cmap(internal_data, palette)
         return cls(mock, colormap, norm, ticklabels)
 
     @classmethod
-    def from_continuous(cls, data, palette, *, lower=None, upper=None):
-        data = np.asanyarray(data)
-        if not isinstance(data, np.ma.MaskedArray):
-            data = mask(data)
+    def from_continuous(cls, data, palette, *, lower=None, upper=None,
+                        sentinel=None):
+        data = mask(data, sentinel)
 
         norm = Normalize(lower, upper)
-        colormap = cm.get_cmap(palette)
+        colormap = colormaps.continuous(palette)
         return cls(data, colormap, norm, None)
 
 class AxesUpdater(object):
@@ -64,12 +179,21 @@ class AxesUpdater(object):
 
     def __init__(self, container, ax, plot_kwds):
         if ax is None:
+            # Only plots on the current axes need pyplot.
+            from matplotlib.pyplot import gca
             ax = gca()
 
         self.container = container
         self.ax = ax
         self.plot_kwds = plot_kwds
 
+        # Set by the `add_*` methods: the artist drawn, whether its missing
+        # values are transparent, and a function setting new values on it
+        # (and returning them as drawn).
+        self.artist = None
+        self.transparent_bad = False
+        self.set_values = None
+
     @classmethod
     def from_discrete(cls, container, ax=None, **kwds):
         plot_kwds = {
@@ -94,7 +218,7 @@ class AxesUpdater(object):
         }
         return cls(container, ax, plot_kwds)
 
-    def add_points(self, xy):
+    def add_points(self, xy, cull=False):
         kwds = {**point_settings, **self.plot_kwds}
         # `scatter will filter out any masked values. To ensure
         # that they're plotted, pass the color mapping information
@@ -104,29 +228,192 @@ class AxesUpdater(object):
         collection.set_array(self.container.data)
         collection.set_cmap(self.container.colormap)
         collection.set_norm(self.container.norm)
+
+        culling = None
+        if cull:
+            culling = spatial.PointCulling(
+                collection,
+                xy,
+                np.ma.asanyarray(self.container.data))
+            culling.update()
+            connect_view_change(self.ax, culling.update)
+
+        self.track(collection, culled_setter(collection, culling))
         return collection
 
-    def add_polygons(self, verts):
+    def add_polygons(self, verts, simplify=False, cull=False):
         # PolyCollection does not allow `vmin`/`vmax`,
         # and `norm` is already passed.
         kwds = {
             k: v for k, v in self.plot_kwds.items()
             if k not in ("vmin", "vmax", "norm")
         }
-        p = collections.PolyCollection(
-            verts,
-            array=self.container.data,
-            norm=self.container.norm,
-            **kwds)
+        if simplify or cull:
+            if not isinstance(verts, geometry.Polygons):
+                verts = geometry.Polygons.from_verts(verts)
+
+        # Imported here, as only maps of polygons need the collections.
+        import matplotlib.collections as collections
+
+        if isinstance(verts, geometry.Polygons):
+            # Paths are built directly on views of the coordinate buffer,
+            # which are already closed.
+            kwds.pop("closed", None)
+            p = collections.PathCollection(
+                verts.paths(),
+                array=self.container.data,
+                norm=self.container.norm,
+                **kwds)
+        else:
+            p = collections.PolyCollection(
+                verts,
+                array=self.container.data,
+                norm=self.container.norm,
+                **kwds)
         self.ax.add_collection(p)
         self.ax.autoscale_view()
+
+        detail = culling = None
+        if simplify:
+            detail = geometry.LevelOfDetail(p, verts)
+            detail.update()
+            connect_view_change(self.ax, detail.update)
+        if cull:
+            # Connected after the level of detail, so that the polygons
+            # in view are drawn at the new tolerance.
+            culling = spatial.PolygonCulling(
+                p,
+                verts,
+                np.ma.asanyarray(self.container.data),
+                detail)
+            culling.update()
+            connect_view_change(self.ax, culling.update)
+
+        self.track(p, culled_setter(p, culling))
         return p
 
-    def add_raster(self):
+    def add_raster(self, pyramid=False):
         kwds = {**im_settings, **self.plot_kwds}
-        return self.ax.imshow(self.container.data, **kwds)
+        image = self.ax.imshow(self.container.data, **kwds)
+        if not pyramid:
+            def set_values(values):
+                image.set_data(values)
+                return values
+
+            self.track(image, set_values)
+            return image
+
+        # Overviews of discrete data must keep to the existing codes.
+        if self.container.ticklabels is None:
+            build = pyramids.Pyramid.from_continuous
+        else:
+            build = pyramids.Pyramid.from_discrete
+
+        overview = pyramids.PyramidImage(image, build(self.container.data))
+        overview.update()
+        connect_view_change(self.ax, overview.update)
+
+        def set_values(values):
+            # The level shown is chosen again from the new overviews.
+            overview.pyramid = build(values)
+            overview.level = None
+            overview.update()
+            return values
+
+        self.track(image, set_values)
+        return image
+
+    def add_grid(self, grid, empty, regrid=None):
+        # Draw data aggregated onto a grid as a raster. Cells which no
+        # features fall in are left transparent, while those with only
+        # missing values are drawn as missing. `regrid` takes new values
+        # of the features onto the grid when the values are updated.
+        kwds = {**im_settings, **self.plot_kwds, "extent": grid.extent}
+        colormap = copy.copy(self.container.colormap)
+        colormap.set_bad((0, 0, 0, 0))
+        image = self.ax.imshow(self.container.data, **{
+            **kwds,
+            "cmap": colormap,
+        })
+        overlay_kwds = {
+            k: v for k, v in kwds.items()
+            if k not in ("cmap", "norm", "vmin", "vmax")
+        }
+        overlays = []
+
+        def show_missing(values):
+            # The overlay is only added once some cells are missing.
+            missing = np.ma.getmaskarray(values) & ~empty
+            marked = np.ma.masked_array(
+                np.zeros(missing.shape, dtype=np.uint8),
+                ~missing)
+            if overlays:
+                overlays[0].set_data(marked)
+            elif missing.any():
+                overlays.append(self.ax.imshow(
+                    marked,
+                    cmap=ListedColormap([color_missing]),
+                    **overlay_kwds))
+
+        def set_values(values):
+            if regrid is not None:
+                values = regrid(values)
+            image.set_data(values)
+            show_missing(values)
+            return values
+
+        show_missing(self.container.data)
+        self.track(image, set_values, transparent_bad=True)
+        return image
+
+    def add_burned(self, verts, resolution=None):
+        # Draw polygons rasterized onto a grid covering them. By default,
+        # the grid has about one cell per pixel of the axes.
+        if not isinstance(verts, geometry.Polygons):
+            verts = geometry.Polygons.from_verts(verts)
+
+        xmin, ymin, xmax, ymax = verts.bounds
+        if resolution is None:
+            width, height = self.ax.bbox.width, self.ax.bbox.height
+            resolution = max(
+                (xmax - xmin) / max(width, 1),
+                (ymax - ymin) / max(height, 1)) or None
+        grid = Grid.from_bounds((xmin, ymin, xmax, ymax), resolution)
+
+        index = geometry.burn(verts, grid)
+        empty = index < 0
+        index = np.where(empty, 0, index)
+
+        def regrid(data):
+            # NaN cells are masked, so that they're drawn as missing
+            # rather than left transparent with the empty cells.
+            data = np.ma.asanyarray(data)
+            values = np.ma.getdata(data)[index]
+            missing = np.ma.getmaskarray(data)[index] | empty
+            if values.dtype.kind == "f":
+                missing |= np.isnan(values)
+            return np.ma.masked_array(values, missing)
+
+        container = self.container
+        self.container = DataContainer(
+            regrid(container.data),
+            container.colormap,
+            container.norm,
+            container.ticklabels)
+        return self.add_grid(grid, empty, regrid)
+
+    def add_colorbar(self, collection, mode=True):
+        # Draw a full colorbar, a light one (if `mode` is "light") or
+        # none at all (if `mode` is False).
+        if not mode:
+            return None
+        if mode == "light":
+            from .colorbar import LightColorbar
+            return LightColorbar(
+                self.ax,
+                collection,
+                self.container.ticklabels)
 
-    def add_colorbar(self, collection):
         ax = self.ax
         extend = get_extend(self.container.norm)
         colorbar = ax.figure.colorbar(collection, ax=ax, extend=extend)
@@ -135,4 +422,21 @@ class AxesUpdater(object):
         if ticklabels is not None:
             mapping.add_discrete_labels(colorbar, labels=ticklabels)
 
-        return
+        return colorbar
+
+    def track(self, artist, set_values, transparent_bad=False):
+        # Record the artist drawn, so that its values can be updated.
+        self.artist = artist
+        self.set_values = set_values
+        self.transparent_bad = transparent_bad
+
+    def recolor(self, container):
+        # Switch the artist to the colormap and norm of a new container,
+        # e.g. when the categories of discrete data change.
+        colormap = container.colormap
+        if self.transparent_bad:
+            colormap = copy.copy(colormap)
+            colormap.set_bad((0, 0, 0, 0))
+        self.artist.set_cmap(colormap)
+        self.artist.set_norm(container.norm)
+        self.container = container
@@ -1,16 +1,28 @@
 from pathlib import Path
 from setuptools import setup
 
+import re
+
 
 long_description = Path("README.rst").read_text()
 
+# The version is read rather than imported, as the dependencies may not
+# be installed yet.
+version = re.search(
+    r'^__version__ = "(.+)"$',
+    Path("fieldmaps", "__init__.py").read_text(),
+    re.MULTILINE).group(1)
+
 setup(
     name="fieldmaps",
+    version=version,
     author="David Law",
     author_email="davidsamuellaw@gmail.com",
     long_description=long_description,
     license="Apache Software License (Apache 2.0)",
     install_requires=["matplotlib>=2.0.2"],
+    # Writing PNG tiles and GIF animations.
+    extras_require={"images": ["Pillow"]},
     packages=["fieldmaps"],
     classifiers=[
         "License :: OSI Approved :: Apache Software License",
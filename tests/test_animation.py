@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+
+from fieldmaps.animation import (
+    export_animation, export_frames, shared_scale)
+
+
+stack = np.stack([np.arange(16.).reshape(4, 4) * i for i in range(1, 4)])
+
+@pytest.mark.parametrize("n_workers", (1, 2))
+@pytest.mark.parametrize("discrete", (False, True))
+def test_export_frames(tmpdir, n_workers, discrete):
+    data = stack > 8 if discrete else stack
+    paths = export_frames(
+        data,
+        str(tmpdir),
+        discrete=discrete,
+        n_workers=n_workers,
+        figsize=(2, 2),
+        dpi=50)
+
+    assert [os.path.basename(path) for path in paths] == [
+        "frame-0000.png", "frame-0001.png", "frame-0002.png"]
+    assert all(os.path.exists(path) for path in paths)
+
+@pytest.mark.parametrize("discrete", (False, True))
+def test_export_frames_no_colorbar(tmpdir, discrete):
+    data = stack > 8 if discrete else stack
+    paths = export_frames(
+        data,
+        str(tmpdir),
+        discrete=discrete,
+        n_workers=1,
+        figsize=(2, 2),
+        dpi=50,
+        colorbar=False)
+    assert all(os.path.exists(path) for path in paths)
+
+def test_shared_scale_sentinel():
+    data = stack.copy()
+    data[:, 0, 0] = -9999
+    assert shared_scale(data, False, {"sentinel": -9999}) == (1, 45)
+    assert shared_scale(data, False, {"lower": 0}) == (0, 45)
+
+def test_export_frames_2d(tmpdir):
+    with pytest.raises(ValueError):
+        export_frames(stack[0], str(tmpdir))
+
+def test_export_animation(tmpdir):
+    from PIL import Image
+
+    path = export_animation(
+        stack,
+        str(tmpdir.join("ndvi.gif")),
+        n_workers=1,
+        figsize=(2, 2),
+        dpi=50)
+
+    with Image.open(path) as image:
+        assert image.n_frames == 3
+
+def test_export_animation_format(tmpdir):
+    with pytest.raises(ValueError):
+        export_animation(stack, str(tmpdir.join("ndvi.mp4")))
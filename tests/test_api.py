@@ -18,7 +18,7 @@ from fieldmaps import (
 def close_plots():
     plt.close("all")
 
-continuous_data = np.array([1, 1, 2, 2, 3, 3], dtype=np.float)
+continuous_data = np.array([1, 1, 2, 2, 3, 3], dtype=float)
 continuous_data.setflags(write=False)
 
 categorical_data = np.array(["a", "a", "b", "b", "a", "a"])
@@ -29,7 +29,7 @@ discrete_data.setflags(write=False)
 
 @pytest.fixture(scope="module")
 def mask():
-    data = np.array([True, True, False, False, False, False], dtype=np.bool)
+    data = np.array([True, True, False, False, False, False], dtype=bool)
     data.setflags(write=False)
     return data
 
@@ -97,6 +97,72 @@ class TestPoint(object):
         ax = fn(masked, coords)
         assert isinstance(ax, plt.Axes)
 
+@point_params
+def test_points_cull(fn, data, coords):
+    ax = fn(data, coords, cull=True)
+    collection = ax.collections[0]
+    assert len(collection.get_offsets()) == len(data)
+
+    ax.set_xlim(-10, -9)
+    assert len(collection.get_offsets()) == 0
+    assert len(collection.get_array()) == 0
+
+@pytest.mark.parametrize("colorbar", ("light", False))
+@point_params
+def test_colorbar_modes(fn, data, coords, colorbar):
+    ax = fn(data, coords, colorbar=colorbar)
+    assert len(ax.figure.axes) == 1
+    assert len(ax.texts) > 0 if colorbar else len(ax.texts) == 0
+
+coded_params = pytest.mark.parametrize(
+    "fn, geometry",
+    (
+        (point_discrete, "coords"),
+        (poly_discrete, "verts"),
+        (raster_discrete, None),
+    ),
+    ids=("point", "polygon", "raster"))
+
+@coded_params
+def test_coded(fn, geometry, request):
+    codes = np.array([0, 0, 1, 1, -1, 2], dtype=np.int8)
+    labels = ("a", "b", "c")
+    if geometry is None:
+        ax = fn(to_raster(codes), labels=labels)
+    else:
+        ax = fn(codes, request.getfixturevalue(geometry), labels=labels)
+    assert isinstance(ax, plt.Axes)
+
+@pytest.mark.parametrize(
+    "kwds",
+    ({"chunksize": 2}, {"n_jobs": 2}),
+    ids=("chunked", "parallel"))
+def test_raster_discrete_blocks(kwds):
+    ax = raster_discrete(to_raster(categorical_data), **kwds)
+    assert isinstance(ax, plt.Axes)
+
+@pytest.mark.parametrize("how", ("mean", "min", "max", "count"))
+def test_point_cont_aggregate(how, coords, mask):
+    masked = np.ma.masked_array(continuous_data, mask)
+    ax = point_cont(masked, coords, aggregate=how, resolution=2, upper=2)
+    assert isinstance(ax, plt.Axes)
+    assert len(ax.get_images()) == 2
+
+@pytest.mark.parametrize("data", (categorical_data, discrete_data))
+def test_point_discrete_aggregate(data, coords, mask):
+    masked = np.ma.masked_array(data, mask)
+    ax = point_discrete(masked, coords, aggregate="mode", resolution=2)
+    assert isinstance(ax, plt.Axes)
+
+    # Categories are labelled as for the points.
+    cbar = ax.get_images()[0].colorbar
+    labels = [label.get_text() for label in cbar.ax.get_yticklabels()]
+    assert labels == [str(value) for value in np.unique(data[~mask])]
+
+def test_point_discrete_aggregate_unknown(coords):
+    with pytest.raises(ValueError):
+        point_discrete(discrete_data, coords, aggregate="mean")
+
 @polygon_params
 class TestPolygons(object):
     @container_params
@@ -110,6 +176,39 @@ class TestPolygons(object):
         ax = fn(masked, verts)
         assert isinstance(ax, plt.Axes)
 
+@polygon_params
+def test_polygons_offsets(fn, data, verts):
+    coords = verts.reshape(-1, 2)
+    offsets = np.arange(0, len(coords) + 1, verts.shape[1])
+    ax = fn(data, coords, offsets=offsets)
+    assert isinstance(ax, plt.Axes)
+    assert len(ax.collections[0].get_paths()) == len(data)
+
+@polygon_params
+def test_polygons_simplify(fn, data, verts):
+    ax = fn(data, verts, simplify=True)
+    assert isinstance(ax, plt.Axes)
+    assert len(ax.collections[0].get_paths()) == len(data)
+
+@polygon_params
+@pytest.mark.parametrize("simplify", (False, True))
+def test_polygons_cull(fn, data, verts, simplify):
+    ax = fn(data, verts, cull=True, simplify=simplify)
+    collection = ax.collections[0]
+    assert len(collection.get_paths()) == len(data)
+
+    ax.set_xlim(-10, -9)
+    assert len(collection.get_paths()) == 0
+    assert len(collection.get_array()) == 0
+
+@polygon_params
+def test_polygons_burn(fn, data, verts, mask):
+    masked = np.ma.masked_array(data, mask)
+    ax = fn(masked, verts, burn=True, resolution=.1)
+    assert isinstance(ax, plt.Axes)
+    assert len(ax.collections) == 0
+    assert ax.get_images()
+
 @raster_params
 class TestRaster(object):
     def test_unmasked(self, fn, data):
@@ -121,3 +220,57 @@ class TestRaster(object):
         masked = np.ma.masked_array(to_raster(data), to_raster(mask))
         ax = fn(masked)
         assert isinstance(ax, plt.Axes)
+
+    def test_stack(self, fn, data):
+        stack = np.stack([to_raster(data)] * 3)
+        ax = fn(stack, frame=1)
+        assert isinstance(ax, plt.Axes)
+        assert ax.get_images()[0].get_array().shape == stack.shape[1:]
+
+    def test_pyramid(self, fn, data):
+        raster = np.tile(to_raster(data), (300, 300))
+        _, ax = plt.subplots(figsize=(2, 2), dpi=100)
+        ax = fn(raster, ax=ax, pyramid=True)
+        assert isinstance(ax, plt.Axes)
+
+        # Zooming changes the level shown.
+        image = ax.get_images()[0]
+        coarse = image.get_array().shape
+        ax.set_xlim(0, 10)
+        assert image.get_array().shape != coarse
+
+def test_sentinel(coords, verts):
+    data = continuous_data.copy()
+    data[0] = -9999
+    mask = data == -9999
+
+    ax = raster_cont(to_raster(data), sentinel=-9999)
+    np.testing.assert_array_equal(
+        np.ma.getmaskarray(ax.get_images()[0].get_array()),
+        to_raster(mask))
+
+    stack = np.stack([to_raster(data)] * 2)
+    ax = raster_cont(stack, sentinel=-9999)
+    assert ax.get_images()[0].norm.vmin == 1
+
+    ax = point_cont(data, coords, sentinel=-9999)
+    np.testing.assert_array_equal(
+        np.ma.getmaskarray(ax.collections[0].get_array()),
+        mask)
+
+    ax = point_cont(data, coords, aggregate="min", resolution=1,
+                    sentinel=-9999)
+    assert np.ma.min(ax.get_images()[0].get_array()) == 1
+
+    ax = poly_cont(data, verts, sentinel=-9999)
+    np.testing.assert_array_equal(
+        np.ma.getmaskarray(ax.collections[0].get_array()),
+        mask)
+
+def test_point_aggregate_sentinel():
+    # Aggregates equal to the sentinel aren't missing.
+    data = np.array([1, 3, 5, 6, 7])
+    xy = np.array([[0, 0], [0, 0], [1, 1], [1, 1], [2, 2]])
+    ax = point_cont(data, xy, aggregate="count", resolution=1, sentinel=2)
+    counts = ax.get_images()[0].get_array()
+    assert sorted(counts.compressed().tolist()) == [2, 3]
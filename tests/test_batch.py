@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from fieldmaps.batch import Job, render_many
+from fieldmaps.outputs import OutputCache
+
+
+raster = np.arange(16, dtype=float).reshape(4, 4)
+
+def fail(data, ax=None):
+    raise RuntimeError("bad field")
+
+@pytest.fixture
+def jobs():
+    return [
+        Job("raster_cont", (raster,), "a.png", figsize=(2, 2), dpi=50),
+        Job("raster_discrete", (raster > 5,), "b/b.png",
+            kwargs={"pyramid": True}, figsize=(2, 2), dpi=50),
+        Job(fail, (raster,), "c.png"),
+    ]
+
+@pytest.mark.parametrize("n_workers", (1, 2))
+def test_render_many(jobs, tmpdir, n_workers):
+    seen = []
+    report = render_many(jobs, str(tmpdir), n_workers, callback=seen.append)
+
+    assert len(seen) == 3
+    assert report.n_done == 2
+    assert report.n_failed == 1
+    assert report.maps_per_second > 0
+
+    (error,) = report.errors
+    assert error.job_id == 2
+    assert "bad field" in error.error
+    assert os.path.exists(str(tmpdir.join("a.png")))
+    assert os.path.exists(str(tmpdir.join("b", "b.png")))
+    assert not os.path.exists(str(tmpdir.join("c.png")))
+
+def test_output_cache(jobs, tmpdir):
+    cache = OutputCache(str(tmpdir.join("cache")))
+    first = render_many(jobs, str(tmpdir.join("first")), 1, cache=cache)
+    second = render_many(jobs, str(tmpdir.join("second")), 2, cache=cache)
+    assert first.n_cached == 0
+    assert second.n_cached == 2
+    assert second.n_failed == 1
+    with open(str(tmpdir.join("first", "b", "b.png")), "rb") as f:
+        with open(str(tmpdir.join("second", "b", "b.png")), "rb") as g:
+            assert f.read() == g.read()
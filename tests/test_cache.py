@@ -0,0 +1,54 @@
+import numpy as np
+
+from fieldmaps.cache import LRUCache, content_hash
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    # "b" is the least recently used.
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 2, "maxsize": 2}
+
+def test_get_or_create():
+    cache = LRUCache(2)
+    calls = []
+
+    def create():
+        calls.append(None)
+        return 0
+
+    assert cache.get_or_create("a", create) == 0
+    assert cache.get_or_create("a", create) == 0
+    assert len(calls) == 1
+
+    cache.clear()
+    assert cache.stats()["hits"] == 0
+
+def test_weighted():
+    cache = LRUCache(10, weigh=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    cache.put("c", "cccc")
+    assert "a" not in cache
+    assert cache.stats()["weight"] == 8
+
+    # Items heavier than the cache aren't held.
+    cache.put("d", "d" * 11)
+    assert len(cache) == 0
+    assert cache.stats()["weight"] == 0
+
+def test_content_hash():
+    data = np.arange(4)
+    assert content_hash(data, "a") == content_hash(data.copy(), "a")
+    assert content_hash(data, "a") != content_hash(data, "b")
+    assert content_hash(data) != content_hash(data.astype(float))
+    labels = np.array(["x", "y"], dtype=object)
+    assert content_hash(labels) == content_hash(labels.copy())
+    assert content_hash(labels) != content_hash(labels[::-1])
@@ -0,0 +1,61 @@
+from matplotlib.colors import (
+    BoundaryNorm, LinearSegmentedColormap, ListedColormap, Normalize)
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps import colorbar
+from fieldmaps.colorbar import Layout, LightColorbar
+
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+    colorbar.layouts.clear()
+
+def test_layout_continuous():
+    layout = Layout.from_norm(plt.get_cmap("viridis"), Normalize(0, 10))
+    assert layout.image.shape == (colorbar._gradient_size, 1, 4)
+    assert layout.extent == (0, 1, 0, 10)
+    assert layout.ticklabels[0] == "0"
+    assert layout.ticklabels[-1] == "10"
+
+def test_layout_discrete():
+    colormap = ListedColormap(["red", "green", "blue"])
+    norm = BoundaryNorm([0, 1, 2, 3], 3)
+    layout = Layout.from_norm(colormap, norm, ("a", "b", "c"))
+
+    np.testing.assert_array_equal(layout.ticks, [.5, 1.5, 2.5])
+    assert layout.ticklabels == ["a", "b", "c"]
+    np.testing.assert_array_equal(layout.image[:, 0, 2], [0, 0, 1])
+
+    # Stale labels are replaced by the codes.
+    layout = Layout.from_norm(colormap, norm, ("a", "b"))
+    assert layout.ticklabels == ["0", "1", "2"]
+
+def test_light_colorbar_cached():
+    for _ in range(3):
+        fig, ax = plt.subplots()
+        image = ax.imshow(np.arange(4.).reshape(2, 2))
+        cbar = LightColorbar(ax, image)
+
+    assert colorbar.layouts.stats()["misses"] == 1
+    assert colorbar.layouts.stats()["hits"] == 2
+    assert cbar.texts[0].get_text() == "0"
+    assert len(ax.figure.axes) == 1
+
+    image.set_clim(0, 5)
+    cbar.update_normal(image)
+    assert cbar.texts[-1].get_text() == "5"
+    assert len(cbar.texts) == len(cbar.ticks)
+
+def test_layout_same_name():
+    # Colormaps sharing a name don't share a layout.
+    norm = Normalize(0, 1)
+    red = LinearSegmentedColormap.from_list("custom", ["white", "red"])
+    blue = LinearSegmentedColormap.from_list("custom", ["white", "blue"])
+    first = colorbar.layout(red, norm)
+    second = colorbar.layout(blue, norm)
+    assert first is not second
+    assert second.image[-1, 0, 2] == 1
+    assert colorbar.layout(red, norm) is first
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from fieldmaps.colorize import colorize_cont, colorize_discrete
+from fieldmaps.utils import DataContainer
+
+
+rs = np.random.RandomState(seed=13)
+data = rs.normal(size=(30, 40))
+data[0, 0] = np.nan
+data[1, 1] = np.inf
+codes = rs.randint(5, size=(30, 40))
+
+def expected(container):
+    # Pixels as colored by matplotlib, which masks NaN values itself.
+    values = np.ma.masked_invalid(container.data)
+    return container.colormap(container.norm(values), bytes=True)
+
+@pytest.mark.parametrize("lower,upper", [(None, None), (-1, 1), (0, None)])
+def test_cont(lower, upper):
+    container = DataContainer.from_continuous(
+        data,
+        "YlGn",
+        lower=lower,
+        upper=upper)
+    pixels = colorize_cont(data, "YlGn", lower, upper)
+    np.testing.assert_array_equal(pixels, expected(container))
+
+def test_cont_missing():
+    pixels = colorize_cont(np.full((2, 2), np.nan))
+    np.testing.assert_array_equal(pixels[0, 0], [102, 102, 102, 51])
+
+def test_discrete():
+    container = DataContainer.from_discrete(codes, "tab20_woven")
+    pixels = colorize_discrete(codes, "tab20_woven")
+    np.testing.assert_array_equal(pixels, expected(container))
+
+def test_discrete_coded():
+    coded = np.array([[0, 1], [-1, 2]])
+    pixels = colorize_discrete(coded, labels=("a", "b", "c"))
+    np.testing.assert_array_equal(pixels[1, 0], [102, 102, 102, 51])
+    assert len({tuple(pixel) for pixel in pixels.reshape(-1, 4)}) == 4
+
+def test_out():
+    out = np.zeros(data.shape + (4,), dtype=np.uint8)
+    assert colorize_cont(data, out=out) is out
+    assert out[..., 3].all()
+    with pytest.raises(ValueError):
+        colorize_cont(data, out=out[1:])
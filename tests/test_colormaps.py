@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from fieldmaps import colormaps
+from fieldmaps.settings import color_missing
+from fieldmaps.utils import DataContainer
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    colormaps.shared.clear()
+    colormaps.tables.clear()
+
+def test_continuous_shared():
+    first = colormaps.continuous("YlGn")
+    assert colormaps.continuous("YlGn") is first
+    assert colormaps.continuous("YlGn", bad="red") is not first
+    np.testing.assert_allclose(first.get_bad(), color_missing)
+    assert colormaps.stats()["colormaps"]["hits"] == 1
+    assert colormaps.stats()["colormaps"]["misses"] == 2
+
+def test_discrete_shared():
+    first = colormaps.discrete("tab10", 3)
+    assert first.N == 3
+    assert colormaps.discrete("tab10", 3) is first
+    assert colormaps.discrete("tab10", 4) is not first
+
+def test_frozen():
+    colormap = colormaps.continuous("YlGn")
+    with pytest.raises(ValueError):
+        colormap.set_bad("red")
+
+    # Colormaps given as palettes are copied, even when frozen.
+    copy = colormaps.continuous(colormap, bad="red")
+    np.testing.assert_allclose(copy.get_bad(), (1, 0, 0, 1))
+    np.testing.assert_allclose(colormap.get_bad(), color_missing)
+    np.testing.assert_allclose(copy(.5), colormap(.5))
+
+def test_containers_share_colormaps():
+    data = np.array([0, 1, 1, 2])
+    first = DataContainer.from_discrete(data, "tab10")
+    second = DataContainer.from_discrete(data + 5, "tab10")
+    assert first.colormap is second.colormap
+    third = DataContainer.from_continuous(data, "YlGn")
+    assert third.colormap is colormaps.continuous("YlGn")
+
+def test_table():
+    colormap = colormaps.discrete("tab10", 3)
+    table = colormaps.table(colormap, np.arange(3))
+    assert table.shape == (4, 4)
+    assert table.dtype == np.uint8
+    assert colormaps.table(colormap, np.arange(3)) is table
+    np.testing.assert_array_equal(table[:3], colormap(np.arange(3), bytes=True))
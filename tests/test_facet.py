@@ -0,0 +1,73 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps import facet_cont, facet_discrete
+
+
+square = [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]
+verts = np.array([np.add(square, i) for i in range(4)], dtype=float)
+coords = verts[:, 0]
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+
+def colorbars(axes):
+    fig = axes.flat[0].figure
+    return [ax for ax in fig.axes if ax not in list(axes.flat)]
+
+@pytest.mark.parametrize("kind, geometries", (
+    ("raster", None),
+    ("points", [coords] * 3),
+    ("polygons", [verts] * 3),
+))
+def test_facet_cont(kind, geometries):
+    if kind == "raster":
+        layers = [np.arange(4.).reshape(2, 2) * i for i in range(1, 4)]
+    else:
+        layers = [np.arange(4.) * i for i in range(1, 4)]
+    layers[0] = np.ma.masked_array(layers[0], [1, 0, 0, 0])
+
+    axes = facet_cont(layers, kind, geometries, ncols=2, titles="abc")
+
+    assert axes.shape == (2, 2)
+    assert not axes[1, 1].get_visible()
+    assert axes[0, 1].get_title() == "b"
+    assert len(colorbars(axes)) == 1
+
+    # All of the panels share a color scale.
+    artists = [ax.get_children()[0] for ax in axes.flat[:3]]
+    assert {artist.get_clim() for artist in artists} == {(0, 9)}
+
+def test_facet_cont_missing():
+    layers = [np.array([[1., np.nan], [-9999., 4.]]), np.array([[2., 6.]])]
+    axes = facet_cont(layers, sentinel=-9999)
+    artists = [ax.get_children()[0] for ax in axes.flat[:2]]
+    assert {artist.get_clim() for artist in artists} == {(1, 6)}
+
+def test_facet_discrete():
+    layers = [np.array([["a", "b"], ["a", "a"]]), np.array([["c", "a"]])]
+    axes = facet_discrete(layers)
+
+    (colorbar,) = colorbars(axes)
+    labels = [label.get_text() for label in colorbar.get_yticklabels()]
+    assert labels == ["a", "b", "c"]
+
+    image = axes.flat[1].get_images()[0]
+    np.testing.assert_array_equal(image.get_array(), [[2, 0]])
+
+def test_facet_discrete_coded():
+    layers = [np.array([0, 1, 1, -1]), np.array([2, 2, 0, 0])]
+    axes = facet_discrete(
+        layers,
+        "polygons",
+        [verts, verts],
+        labels=("a", "b", "c"))
+    assert len(colorbars(axes)) == 1
+
+def test_facet_geometries():
+    with pytest.raises(ValueError):
+        facet_cont([np.arange(4.)], "points")
+    with pytest.raises(ValueError):
+        facet_cont([np.arange(4.)], "lines", [coords])
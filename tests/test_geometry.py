@@ -0,0 +1,185 @@
+from matplotlib.collections import PathCollection
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps import geometry
+from fieldmaps.geometry import LevelOfDetail, Polygons
+from fieldmaps.grid import Grid
+
+
+square = [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]
+triangle = [[2, 2], [3, 2], [2, 3]]
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+
+@pytest.fixture(scope="module")
+def polygons():
+    coords = np.array(square + triangle, dtype=float)
+    coords.setflags(write=False)
+    return Polygons(coords, [0, 5, 8])
+
+def test_init(polygons):
+    assert len(polygons) == 2
+    assert np.all(polygons.starts == [0, 5])
+    assert np.all(polygons.stops == [5, 8])
+
+@pytest.mark.parametrize("coords,offsets", [
+    (np.zeros((4, 3)), [0, 4]),
+    (np.zeros((4, 2)), [[0, 4]]),
+    (np.zeros((4, 2)), [1, 4]),
+    (np.zeros((4, 2)), [0, 3]),
+    (np.zeros((4, 2)), [0, 2, 2, 4]),
+])
+def test_init_invalid(coords, offsets):
+    with pytest.raises(ValueError):
+        Polygons(coords, offsets)
+
+@pytest.mark.parametrize("verts", [
+    [np.array(square), np.array(triangle)],
+    [square, triangle],
+], ids=["arrays", "lists"])
+def test_from_verts(verts):
+    polygons = Polygons.from_verts(verts)
+
+    assert len(polygons) == 2
+    assert np.all(polygons.offsets == [0, 5, 8])
+    assert np.all(polygons.coords == square + triangle)
+
+def test_from_verts_3d():
+    verts = np.array([square, square, square], dtype=float)
+    polygons = Polygons.from_verts(verts)
+
+    assert np.all(polygons.offsets == [0, 5, 10, 15])
+    assert np.shares_memory(polygons.coords, verts)
+
+def test_closed(polygons):
+    assert np.all(polygons.is_closed() == [True, False])
+
+    closed = polygons.closed()
+
+    assert np.all(closed.is_closed())
+    assert np.all(closed.offsets == [0, 5, 9])
+    assert np.all(closed.coords[5:] == triangle + triangle[:1])
+    assert closed.closed() is closed
+
+    # Open rings are closed once, when the polygons are built.
+    assert polygons.closed() is closed
+
+def test_rings(polygons):
+    rings = polygons.rings()
+
+    assert len(rings) == 2
+    assert all(np.shares_memory(ring, polygons.coords) for ring in rings)
+    assert np.all(rings[1] == triangle)
+    assert Polygons(np.empty((0, 2)), [0]).rings() == []
+
+def test_paths(polygons):
+    closed = Polygons(polygons.coords[:5], [0, 5])
+    paths = closed.paths()
+
+    assert len(paths) == 1
+    assert np.shares_memory(paths[0].vertices, closed.coords)
+    assert len(polygons.paths()[1].vertices) == 4
+    assert np.shares_memory(
+        polygons.paths()[1].vertices,
+        polygons.closed().coords)
+
+    # Paths are built once, and shared by the subsets in view.
+    assert polygons.paths([1])[0] is polygons.paths()[1]
+
+def test_segment_distance():
+    p = np.array([[0, 1], [2, 1], [-3, 4], [1, 1]], dtype=float)
+    a = np.array([[0, 0], [0, 0], [0, 0], [1, 1]], dtype=float)
+    b = np.array([[1, 0], [1, 0], [1, 0], [1, 1]], dtype=float)
+
+    out = geometry.segment_distance(p, a, b)
+
+    assert np.allclose(out, [1, np.sqrt(2), 5, 0])
+
+def test_snap_mask():
+    coords = np.array([
+        [0, 0], [.1, .1], [.2, 0], [1.5, 0], [1.6, 0], [0, 0], [5, 5], [0, 0],
+    ])
+    starts, stops = np.array([0, 5]), np.array([5, 8])
+
+    keep = geometry.snap_mask(coords, starts, stops, 1)
+
+    assert np.all(keep == [1, 0, 0, 1, 1, 1, 1, 1])
+    assert np.all(geometry.snap_mask(coords, starts, stops, 0))
+
+def test_simplify_mask():
+    # Square with extra vertices along its sides, and a small notch.
+    coords = np.array([
+        [0, 0], [1, 0], [2, 0], [2, 1], [2, 2], [1, 2.01], [0, 2], [0, 1],
+        [0, 0],
+    ], dtype=float)
+
+    keep = geometry.simplify_mask(coords, np.array([0]), np.array([9]), .1)
+
+    assert np.all(keep == [1, 0, 1, 0, 1, 0, 1, 0, 1])
+
+    keep = geometry.simplify_mask(coords, np.array([0]), np.array([9]), 0)
+    assert keep[5]
+
+def test_simplify():
+    angles = np.linspace(0, 2 * np.pi, 1001)
+    circle = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    polygons = Polygons(np.concatenate((circle, square)), [0, 1001, 1006])
+
+    simplified = polygons.simplify(.01)
+
+    assert len(simplified) == 2
+    assert 10 < np.diff(simplified.offsets)[0] < 100
+    assert np.all(simplified.is_closed())
+    assert polygons.simplify(.01) is simplified
+
+    # Rings are never reduced to fewer than 4 vertices.
+    collapsed = polygons.simplify(10)
+    assert np.all(np.diff(collapsed.offsets) >= 4)
+
+def test_burn(polygons):
+    grid = Grid.from_bounds((0, 0, 3, 3), .5)
+    index = geometry.burn(polygons, grid)
+
+    expected = np.full((6, 6), -1)
+    expected[4:, :2] = 0
+    expected[1, 4] = 1
+    np.testing.assert_array_equal(index, expected)
+
+def test_burn_overlap():
+    coords = np.array(square + [[.5, 0], [1, 0], [1, 1], [.5, 1]], float)
+    polygons = Polygons(coords, [0, 5, 9])
+    index = geometry.burn(polygons, Grid.from_bounds((0, 0, 1, 1), .25))
+
+    # The later polygon is on top.
+    np.testing.assert_array_equal(index[:, :2], 0)
+    np.testing.assert_array_equal(index[:, 2:], 1)
+
+def test_data_per_pixel():
+    fig, ax = plt.subplots(figsize=(2, 2), dpi=100)
+    ax.set_xlim(0, ax.bbox.width * 2)
+    ax.set_ylim(0, ax.bbox.height * 3)
+
+    assert np.isclose(geometry.data_per_pixel(ax), 2)
+
+def test_level_of_detail():
+    fig, ax = plt.subplots(figsize=(2, 2), dpi=100)
+    angles = np.linspace(0, 2 * np.pi, 10001)
+    circle = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    polygons = Polygons(circle, [0, len(circle)])
+    collection = ax.add_collection(PathCollection(polygons.paths()))
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(-1, 1)
+
+    detail = LevelOfDetail(collection, polygons)
+    coarse = detail.update()
+    n_coarse = len(collection.get_paths()[0].vertices)
+    assert n_coarse < len(circle) / 10
+
+    ax.set_xlim(0, .01)
+    ax.set_ylim(0, .01)
+    assert detail.update() < coarse
+    assert len(collection.get_paths()[0].vertices) > n_coarse
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from fieldmaps.grid import Grid, group_mode, group_reduce
+
+
+@pytest.fixture(scope="module")
+def coords():
+    xy = np.array([[0, 0], [.5, .5], [1.5, 0], [0, 1.5], [2, 2], [1.9, 1.9]])
+    xy.setflags(write=False)
+    return xy
+
+def test_group_reduce():
+    values = np.array([3, 1, 4, 1, 5, 9])
+    index = np.array([2, 0, 2, 0, 3, 2])
+
+    out = group_reduce(np.maximum, values, index, 5)
+
+    assert out.dtype == values.dtype
+    assert np.all(out == [1, 0, 9, 5, 0])
+
+@pytest.mark.parametrize("resolution,expected_shape", [
+    (1, (2, 2)),
+    ((.5, 1), (2, 4)),
+    (None, (500, 500)),
+])
+def test_from_coords(coords, resolution, expected_shape):
+    grid = Grid.from_coords(coords, resolution)
+
+    assert grid.shape == expected_shape
+    assert grid.origin == (0, 0)
+    assert grid.extent == (0, 2, 0, 2)
+
+def test_from_bounds_resolution():
+    with pytest.raises(ValueError):
+        Grid.from_bounds((0, 0, 1, 1), resolution=0)
+
+def test_cell_index(coords):
+    grid = Grid.from_bounds((0, 0, 2, 2), resolution=1)
+    outside = np.array([[-1, 0], [0, 2.5]])
+
+    # The first row is at the top.
+    assert np.all(grid.cell_index(coords) == [2, 2, 3, 0, 1, 1])
+    assert np.all(grid.cell_index(outside) == -1)
+
+@pytest.mark.parametrize("how,expected", [
+    ("mean", [[4, 5.5], [1.5, np.nan]]),
+    ("min", [[4, 5], [1, np.nan]]),
+    ("max", [[4, 6], [2, np.nan]]),
+    ("count", [[1, 2], [2, np.nan]]),
+])
+def test_aggregate(coords, how, expected):
+    data = np.ma.masked_array([1, 2, 3, 4, 5, 6], [0, 0, 1, 0, 0, 0])
+    grid = Grid.from_bounds((0, 0, 2, 2), resolution=1)
+    expected = np.ma.masked_invalid(expected)
+
+    values, empty = grid.aggregate(data, coords, how)
+
+    assert values.shape == grid.shape
+    assert np.all(values.mask == expected.mask)
+    assert np.allclose(values.compressed(), expected.compressed())
+    assert np.all(empty == [[False, False], [False, False]])
+
+def test_aggregate_nan(coords):
+    data = np.array([1, 2, np.nan, 4, np.nan, np.nan])
+    grid = Grid.from_bounds((0, 0, 2, 2), resolution=1)
+
+    values, empty = grid.aggregate(data, coords, "mean")
+
+    assert values.mask.tolist() == [[False, True], [False, True]]
+    assert values[1, 0] == 1.5
+    assert not empty.any()
+
+def test_aggregate_mode(coords):
+    data = np.ma.masked_array(
+        np.array([2, 0, 1, 1, 3, 1], dtype=np.uint16),
+        [0, 0, 0, 0, 0, 1])
+    grid = Grid.from_bounds((0, 0, 2, 2), resolution=1)
+
+    values, _ = grid.aggregate(data, coords, "mode")
+
+    # Ties go to the smallest value.
+    assert values.dtype == np.uint16
+    assert np.all(values == [[1, 3], [0, 1]])
+    assert not np.any(values.mask)
+
+def test_group_mode():
+    values = np.array([4, 1, 4, 1, 1, 0])
+    index = np.array([2, 2, 2, 0, 0, 0])
+
+    out = group_mode(values, index, 4)
+
+    assert np.all(out == [1, 0, 4, 0])
+    assert np.all(group_mode(values[:0], index[:0], 2) == 0)
+
+def test_group_mode_ties():
+    # Ties go to the smallest value, whatever the order of the values.
+    values = np.array([7, 3, 3, 7, 5, 9, 9, 5])
+    index = np.array([1, 1, 1, 1, 0, 0, 0, 0])
+    assert np.all(group_mode(values, index, 2) == [5, 3])
+
+def test_group_mode_matches_counts():
+    rs = np.random.RandomState(seed=3)
+    values = rs.randint(400, size=2000)
+    index = rs.randint(50, size=2000)
+
+    counts = np.zeros((50, 400), dtype=int)
+    np.add.at(counts, (index, values), 1)
+    expected = counts.argmax(axis=1)
+    expected[counts.sum(axis=1) == 0] = 0
+
+    assert np.all(group_mode(values, index, 50) == expected)
+
+def test_aggregate_empty(coords):
+    grid = Grid.from_bounds((0, 0, 2, 2), resolution=(.5, 2))
+    values, empty = grid.aggregate(np.arange(6), coords, "count")
+
+    assert np.all(empty == [[False, False, True, False]])
+    assert np.all(values.mask == empty)
+
+def test_aggregate_dtype(coords):
+    grid = Grid.from_coords(coords, 1)
+    data = np.arange(6, dtype=np.float32)
+
+    values, _ = grid.aggregate(data, coords, "mean")
+
+    assert values.dtype == np.float32
+
+def test_aggregate_unknown(coords):
+    grid = Grid.from_coords(coords, 1)
+    with pytest.raises(ValueError):
+        grid.aggregate(np.arange(6), coords, "median")
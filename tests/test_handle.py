@@ -0,0 +1,130 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps import (
+    MapHandle, point_cont, point_discrete, poly_cont, poly_discrete,
+    raster_cont, raster_discrete)
+
+
+square = [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]
+verts = np.array([np.add(square, i) for i in range(4)], dtype=float)
+coords = np.array([[0, 0], [1, 1], [2, 2], [3, 3]], dtype=float)
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+
+def ticklabels(handle):
+    return [label.get_text() for label in handle.colorbar.ax.get_yticklabels()]
+
+def test_raster_cont():
+    raster = np.arange(16, dtype=float).reshape(4, 4)
+    handle = raster_cont(raster, handle=True)
+    assert isinstance(handle, MapHandle)
+    assert isinstance(handle.ax, plt.Axes)
+    vmax = handle.artist.norm.vmax
+
+    handle.update(raster * 2)
+    np.testing.assert_array_equal(handle.artist.get_array(), raster * 2)
+    assert handle.artist.norm.vmax == vmax
+
+    handle.update(raster * 2, rescale=True)
+    assert handle.artist.norm.vmax == 30
+
+def test_raster_cont_sentinel():
+    raster = np.arange(16, dtype=float).reshape(4, 4)
+    handle = raster_cont(raster, handle=True, sentinel=-9999)
+
+    raster[0, 0] = -9999
+    handle.update(raster, rescale=True)
+    assert handle.artist.get_array()[0, 0] is np.ma.masked
+    assert handle.artist.norm.vmin == 1
+
+def test_raster_cont_pyramid():
+    raster = np.ones((600, 600))
+    handle = raster_cont(raster, pyramid=True, handle=True)
+    handle.update(raster * 2)
+    assert np.all(handle.artist.get_array() == 2)
+
+@pytest.mark.parametrize("kwds", (
+    {},
+    {"cull": True},
+    {"burn": True, "resolution": .5},
+), ids=("vector", "cull", "burn"))
+def test_poly_cont(kwds):
+    handle = poly_cont([1., 2., 3., 4.], verts, handle=True, **kwds)
+    handle.update(np.ma.masked_array([4., 3., 2., 1.], [0, 0, 0, 1]))
+
+    values = handle.artist.get_array()
+    assert np.ma.count_masked(values) > 0
+    assert values.max() == 4
+
+def test_poly_discrete_new_categories():
+    handle = poly_discrete(["a", "b", "a", "b"], verts, handle=True)
+    assert ticklabels(handle) == ["a", "b"]
+    norm = handle.artist.norm
+
+    handle.update(["b", "b", "a", "a"])
+    assert handle.artist.norm is norm
+    np.testing.assert_array_equal(handle.artist.get_array(), [1, 1, 0, 0])
+
+    handle.update(["a", "c", "a", "b"])
+    assert handle.artist.norm is not norm
+    assert ticklabels(handle) == ["a", "b", "c"]
+    np.testing.assert_array_equal(handle.artist.get_array(), [0, 2, 0, 1])
+
+@pytest.mark.parametrize("kind", (int, str))
+def test_many_categories_unchanged(kind):
+    # Code 1000 is a valid code with more than 1000 categories.
+    raster = np.arange(1600).astype(kind).reshape(40, 40)
+    handle = raster_discrete(raster, colorbar=False, handle=True)
+    norm = handle.artist.norm
+    codes = handle.artist.get_array().copy()
+    assert np.any(codes == 1000)
+
+    handle.update(raster[::-1])
+    assert handle.artist.norm is norm
+    values = handle.artist.get_array()
+    assert np.ma.count_masked(values) == 0
+    np.testing.assert_array_equal(values, codes[::-1])
+
+def test_light_colorbar():
+    handle = poly_discrete(
+        ["a", "b", "a", "b"],
+        verts,
+        colorbar="light",
+        handle=True)
+    handle.update(["a", "c", "a", "b"])
+    labels = [text.get_text() for text in handle.colorbar.texts]
+    assert labels == ["a", "b", "c"]
+
+def test_raster_discrete_coded():
+    codes = np.array([[0, 1], [1, -1]], dtype=np.int8)
+    handle = raster_discrete(codes, labels=("a", "b"), handle=True)
+
+    handle.update(codes[::-1])
+    np.testing.assert_array_equal(handle.artist.get_array(), codes[::-1])
+
+    handle.update(codes, labels=("a", "b", "c"))
+    assert ticklabels(handle) == ["a", "b", "c"]
+
+def test_point_aggregate():
+    handle = point_cont(
+        [1., 2., 3., 4.],
+        coords,
+        aggregate="mean",
+        resolution=2,
+        handle=True)
+    handle.update([1., 1., 5., 5.])
+    np.testing.assert_array_equal(handle.artist.get_array(), [[1, 5], [1, 1]])
+
+def test_point_discrete_aggregate():
+    handle = point_discrete(
+        [1, 1, 2, 2],
+        coords,
+        aggregate="mode",
+        resolution=2,
+        handle=True)
+    handle.update([2, 2, 1, 1])
+    np.testing.assert_array_equal(handle.artist.get_array(), [[1, 0], [1, 1]])
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+import os
 import pytest
 import numpy as np
 
@@ -17,36 +18,82 @@ def mask():
     data.setflags(write=False)
     return data
 
-@pytest.mark.parametrize("test_input,expected_keys,expected_values", [
-    (categorical_data, ("a", "b", "c"), (0, 1, 2)),
-    (discrete_data, (-1, 3, 99), (0, 1, 2)),
-])
-def test_mk_internal_map(test_input, expected_keys, expected_values):
-    # One-dim array.
-    out = mapping.mk_internal_map(test_input)
+@pytest.mark.parametrize("test_input", [
+    np.array([[5, -3], [5, 70000]], dtype=np.int32),
+    np.array([[5, 3], [5, 7]], dtype=np.uint8),
+    np.array([-100, 100, 5], dtype=np.int8),
+    np.array([[-30000, 30000], [5, 5]], dtype=np.int16),
+    np.array([], dtype=np.int64),
+    categorical_data,
+], ids=["wide", "narrow", "int8", "int16", "empty", "categorical"])
+def test_unique(test_input):
+    out = mapping.unique(test_input)
 
-    assert isinstance(out, OrderedDict)
-    assert tuple(out.keys()) == expected_keys
-    assert tuple(out.values()) == expected_values
+    assert out.dtype == test_input.dtype
+    assert np.all(out == np.unique(test_input))
 
-    # Two-dim array.
-    new_shape = (int(len(test_input) / 2), 2)
-    raster = np.reshape(test_input, new_shape)
-    out = mapping.mk_internal_map(raster)
+def test_encode():
+    values = np.array([-1, 3, 99])
+    data = np.array([[99, -1], [4, 3], [100, -2]])
+    expected = np.array([[2, 0], [mapping._fill, 1], [mapping._fill] * 2])
 
-    assert tuple(out.keys()) == expected_keys
-    assert tuple(out.values()) == expected_values
+    out = mapping.encode(data, values)
 
-def test_internal_array():
-    pairs = {"a": 1, "b": 2, "c": 3}
-    data = np.array(["a", "b", "b", "c", "d"])
-    expected = np.array([1, 2, 2, 3, mapping._fill])
+    assert out.dtype == mapping._dtype
+    assert out.shape == data.shape
+    assert np.all(out == expected)
 
-    out = mapping.internal_array(data, pairs)
+def test_encode_wide_span():
+    values = np.array([-1, 3, 2 * mapping._max_span])
+    data = np.array([2 * mapping._max_span, 3, 4, -1])
+    expected = np.array([2, 1, mapping._fill, 0])
+
+    out = mapping.encode(data, values)
+
+    assert np.all(out == expected)
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int16])
+def test_encode_narrow_dtype(dtype):
+    info = np.iinfo(dtype)
+    values = np.array([info.min + 1, 5, info.max - 1], dtype=dtype)
+    data = np.array([info.max - 1, info.min, 5, info.min + 1], dtype=dtype)
+    expected = np.array([2, mapping._fill, 1, 0])
+
+    out = mapping.encode(data, values)
 
-    assert out.dtype == mapping._dtype
     assert np.all(out == expected)
 
+@pytest.mark.parametrize("values", [
+    np.arange(1500),
+    np.arange(1500) * 100,
+], ids=["table", "lookup"])
+def test_encode_found(values):
+    # Position 1000 (`_fill`) is found among more than 1000 values.
+    data = np.append(values[[999, 1000, 1001]], [-5])
+    codes, found = mapping.encode(data, values, return_found=True)
+    assert codes.tolist()[:3] == [999, 1000, 1001]
+    assert found.tolist() == [True, True, True, False]
+
+def test_encode_no_values():
+    out = mapping.encode(np.array([1, 2]), np.array([], dtype=np.int64))
+    assert np.all(out == mapping._fill)
+
+@pytest.mark.parametrize("masked", [True, False], ids=["masked", "unmasked"])
+def test_create_mapped_matches_lookup(masked):
+    rs = np.random.RandomState(seed=7)
+    data = rs.choice(["x", "yy", "zzz", "w"], size=(30, 20))
+    mask = rs.rand(*data.shape) < .3 if masked else np.zeros(data.shape, bool)
+    x = np.ma.masked_array(data, mask)
+
+    pairs, mock = mapping.create_mapped(x)
+
+    expected_pairs = OrderedDict(
+        (value, i) for i, value in enumerate(np.unique(data[~mask])))
+    expected = [expected_pairs.get(value, mapping._fill) for value in data.flat]
+    assert pairs == expected_pairs
+    assert np.all(mock.data.ravel() == expected)
+    assert np.all(mock.mask == mask)
+
 @pytest.mark.parametrize("test_input", [
     categorical_data,
     discrete_data,
@@ -75,6 +122,135 @@ def test_create_mapped(test_input, mask):
     assert np.all(mock.mask == mask)
     assert len(pairs) == 2
 
+@pytest.mark.parametrize("dtype", [np.int8, np.uint8, np.int64])
+def test_create_coded(dtype):
+    codes = np.array([0, 2, 1, 2, 5], dtype=dtype)
+    codes.setflags(write=False)
+    labels = ("low", "mid", "high")
+
+    pairs, mock = mapping.create_coded(codes, labels)
+
+    assert tuple(pairs.keys()) == labels
+    assert tuple(pairs.values()) == (0, 1, 2)
+    assert isinstance(mock, np.ma.MaskedArray)
+    assert mock.dtype == dtype
+    assert np.shares_memory(mock.data, codes)
+    assert np.all(mock.mask == [False, False, False, False, True])
+
+def test_create_coded_missing():
+    codes = np.ma.masked_array([-1, 0, 1, 1], [False, False, True, False])
+    pairs, mock = mapping.create_coded(codes.astype(np.int8), ("a", "b"))
+
+    assert len(pairs) == 2
+    assert np.all(mock.mask == [True, False, True, False])
+
+def test_create_coded_valid_no_mask():
+    codes = np.array([[0, 2], [1, 1]], dtype=np.int16)
+    _, mock = mapping.create_coded(codes, ("a", "b", "c"))
+    assert mock.mask is np.ma.nomask
+    assert np.shares_memory(mock.data, codes)
+
+    # An existing mask is kept as it is if all of the codes are valid.
+    masked = np.ma.masked_array(codes, [[True, False], [False, False]])
+    _, mock = mapping.create_coded(masked, ("a", "b", "c"))
+    assert np.shares_memory(mock.mask, masked.mask)
+    assert mock.mask.tolist() == [[True, False], [False, False]]
+
+def test_create_coded_float():
+    codes = np.array([[0, np.nan], [1, 300]])
+    labels = range(256)
+
+    pairs, mock = mapping.create_coded(codes, labels)
+
+    assert len(pairs) == 256
+    assert mock.dtype == np.uint8
+    assert np.all(mock.mask == [[False, True], [False, True]])
+    assert np.all(mock.data[~mock.mask] == [0, 1])
+
+    with pytest.raises(ValueError):
+        mapping.create_coded(np.array([.5]), labels)
+
+@pytest.mark.parametrize("n,expected", [
+    (1, np.uint8),
+    (256, np.uint8),
+    (257, np.uint16),
+])
+def test_code_dtype(n, expected):
+    assert mapping.code_dtype(n) == expected
+
+@pytest.mark.parametrize("shape,chunksize,expected", [
+    ((10, 4), 8, [slice(0, 2), slice(2, 4), slice(4, 6), slice(6, 8),
+                  slice(8, 10)]),
+    ((10, 4), 3, [slice(i, i + 1) for i in range(10)]),
+    ((5,), 2, [slice(0, 2), slice(2, 4), slice(4, 6)]),
+    ((2, 2), 100, [slice(0, 50)]),
+])
+def test_row_blocks(shape, chunksize, expected):
+    assert mapping.row_blocks(shape, chunksize) == expected
+
+@pytest.mark.parametrize("masked", [True, False], ids=["masked", "unmasked"])
+def test_create_mapped_chunked(masked, tmp_path):
+    rs = np.random.RandomState(seed=3)
+    data = np.memmap(
+        str(tmp_path / "raster.dat"),
+        dtype=np.int32,
+        mode="w+",
+        shape=(25, 8))
+    data[:] = rs.choice([-4, 0, 7, 12], size=data.shape)
+    x = np.ma.masked_array(data, data == 7) if masked else data
+
+    pairs, mock = mapping.create_mapped(x)
+    chunked_pairs, chunked_mock = mapping.create_mapped(x, chunksize=30)
+
+    assert chunked_pairs == pairs
+    assert chunked_mock.dtype == mapping._dtype
+    assert np.all(np.ma.getmaskarray(chunked_mock) == mock.mask)
+    assert np.all(chunked_mock.data[~mock.mask] == mock.data[~mock.mask])
+    if not masked:
+        assert chunked_mock.mask is np.ma.nomask
+
+@pytest.mark.parametrize("n_jobs,expected", [(1, 1), (3, 3), (-1, None)])
+def test_n_workers(n_jobs, expected):
+    expected = expected or os.cpu_count() or 1
+    assert mapping.n_workers(n_jobs) == expected
+
+@pytest.mark.parametrize("chunksize", [None, 7])
+@pytest.mark.parametrize("test_input", [
+    np.arange(200).reshape(40, 5) % 9,
+    np.array(list("fieldmaps" * 20)).reshape(45, 4),
+], ids=["discrete", "categorical"])
+def test_create_mapped_parallel(test_input, chunksize):
+    mask = np.zeros(test_input.shape, dtype=bool)
+    mask[:5] = True
+    x = np.ma.masked_array(test_input, mask)
+
+    pairs, mock = mapping.create_mapped(x)
+    parallel_pairs, parallel_mock = mapping.create_mapped(
+        x,
+        chunksize=chunksize,
+        n_jobs=4)
+
+    assert parallel_pairs == pairs
+    assert np.all(parallel_mock.mask == mock.mask)
+    assert np.all(parallel_mock.data == mock.data)
+
+def test_create_mapped_out(tmp_path):
+    data = np.array([["b", "a"], ["c", "a"]])
+    out = np.memmap(
+        str(tmp_path / "codes.dat"),
+        dtype=mapping._dtype,
+        mode="w+",
+        shape=data.shape)
+
+    pairs, mock = mapping.create_mapped(data, out=out)
+
+    assert tuple(pairs) == ("a", "b", "c")
+    assert np.shares_memory(mock.data, out)
+    assert np.all(out == [[1, 0], [2, 0]])
+
+    with pytest.raises(ValueError):
+        mapping.create_mapped(data, out=np.empty((2, 2), dtype=np.int64))
+
 def test_discrete_norm():
     data = (0, 1, 2)
     norm = mapping.discrete_norm(data)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from fieldmaps import mapping, memo
+from fieldmaps.utils import DataContainer
+
+
+@pytest.fixture(autouse=True)
+def memoize():
+    memo.enable()
+    yield
+    memo.disable()
+
+def test_discrete_reused():
+    data = np.array([[0, 1], [1, 2]])
+    first = DataContainer.from_discrete(data, "tab10")
+    second = DataContainer.from_discrete(data.copy(), "tab10")
+    assert second.data is first.data
+    assert second.norm is not first.norm
+    assert second.ticklabels == first.ticklabels
+    assert memo.stats()["hits"] == 1
+
+    DataContainer.from_discrete(data, "Set1")
+    assert memo.stats()["misses"] == 2
+
+def test_weight():
+    data = np.ma.masked_array([[0, 1], [1, 2]], [[False, True], [False, False]])
+    first = DataContainer.from_discrete(data, "tab10")
+    assert first.data.mask.tolist() == [[False, True], [False, False]]
+    assert memo.stats()["weight"] == first.data.nbytes + data.size
+
+def test_mask_in_key():
+    data = np.array([0, 1, 2])
+    first = DataContainer.from_discrete(data, "tab10")
+    masked = np.ma.masked_array(data, [True, False, False])
+    second = DataContainer.from_discrete(masked, "tab10")
+    assert second.data.mask[0] and not np.ma.getmaskarray(first.data)[0]
+    assert memo.stats()["misses"] == 2
+
+def test_changed_in_place():
+    data = np.array([0, 1, 2])
+    DataContainer.from_discrete(data, "tab10")
+    data[0] = 5
+    changed = DataContainer.from_discrete(data, "tab10")
+    assert 5 in changed.ticklabels
+
+def test_norm_not_shared():
+    data = np.array([0, 1, 2])
+    first = DataContainer.from_discrete(data, "tab10")
+    first.norm.vmin = -5
+    second = DataContainer.from_discrete(data, "tab10")
+    assert second.norm.vmin == first.norm.boundaries[0]
+
+def test_not_memoized():
+    DataContainer.from_continuous(np.arange(3.), "YlGn")
+    DataContainer.from_discrete(np.arange(3), "tab10", labels="abc")
+    DataContainer.from_discrete(["a", "b"], "tab10")
+    out = np.empty(2, dtype=mapping._dtype)
+    DataContainer.from_discrete(np.arange(2), "tab10", out=out)
+    assert memo.stats()["misses"] == 0
+
+def test_budget():
+    memo.enable(budget=100)
+    data = np.arange(200) % 3
+    DataContainer.from_discrete(data, "tab10")
+    DataContainer.from_discrete(data, "tab10")
+    assert memo.stats()["size"] == 0
+
+def test_disabled():
+    memo.disable()
+    data = np.array([0, 1])
+    first = DataContainer.from_discrete(data, "tab10")
+    assert DataContainer.from_discrete(data, "tab10").data is not first.data
+    assert memo.stats() is None
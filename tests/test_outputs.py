@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+
+from fieldmaps import Polygons, render_png
+from fieldmaps.outputs import OutputCache
+
+
+raster = np.arange(16, dtype=float).reshape(4, 4)
+verts = np.array([
+    [(0, 0), (0, 1), (1, 1), (1, 0)],
+    [(1, 0), (1, 1), (2, 1), (2, 0)],
+])
+
+def test_key():
+    cache = OutputCache("unused")
+    kwargs = {"palette": "YlGn"}
+    key = cache.key("raster_cont", (raster,), kwargs)
+    assert key == cache.key("raster_cont", (raster.copy(),), kwargs)
+    assert key != cache.key("raster_cont", (raster + 1,), kwargs)
+    assert key != cache.key("raster_cont", (raster,), {"palette": "Blues"})
+    assert key != cache.key("raster_cont", (raster,), kwargs, dpi=50)
+    assert key != cache.key("raster_discrete", (raster,), kwargs)
+    other = OutputCache("unused", version="2")
+    assert key != other.key("raster_cont", (raster,), kwargs)
+
+    masked = np.ma.masked_array(raster, raster > 10)
+    assert cache.key("raster_cont", (masked,)) != cache.key(
+        "raster_cont",
+        (raster,))
+
+    polygons = Polygons.from_verts(verts)
+    moved = Polygons.from_verts(verts + 1)
+    assert cache.key("poly_cont", ([1, 2], polygons)) != cache.key(
+        "poly_cont",
+        ([1, 2], moved))
+
+def test_versions(monkeypatch):
+    import fieldmaps
+    from fieldmaps import outputs
+
+    version, sources, _, _ = outputs.versions()
+    assert version == fieldmaps.__version__
+    assert sources == outputs.source_hash()
+
+    # Upgrades of fieldmaps give new keys.
+    cache = OutputCache("unused")
+    key = cache.key("raster_cont", (raster,))
+    monkeypatch.setattr(outputs, "_versions", ("0.0.0", sources, "3.0", "1.0"))
+    assert cache.key("raster_cont", (raster,)) != key
+
+def test_render_png(tmpdir):
+    cache = OutputCache(str(tmpdir))
+    png = render_png("raster_cont", raster, size=(2, 2), dpi=50, cache=cache)
+    again = render_png("raster_cont", raster, size=(2, 2), dpi=50, cache=cache)
+    assert again == png
+    assert cache.stats() == {"hits": 1, "misses": 1, "bytes": len(png)}
+
+def test_hit_skips_matplotlib(tmpdir):
+    # A map read from the cache doesn't load the drawing machinery, which
+    # is checked in a fresh interpreter.
+    cache = OutputCache(str(tmpdir))
+    render_png("raster_cont", raster, size=(2, 2), dpi=50, cache=cache)
+    code = textwrap.dedent("""
+        import sys
+        import numpy as np
+        from fieldmaps import render_png
+        from fieldmaps.outputs import OutputCache
+
+        raster = np.arange(16, dtype=float).reshape(4, 4)
+        cache = OutputCache({!r})
+        render_png("raster_cont", raster, size=(2, 2), dpi=50, cache=cache)
+        assert cache.stats()["hits"] == 1
+        assert "matplotlib.figure" not in sys.modules
+    """.format(str(tmpdir)))
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+def test_eviction(tmpdir):
+    cache = OutputCache(str(tmpdir), max_bytes=250)
+    for i in range(5):
+        cache.put("{:02d}".format(i) * 20, b"x" * 100)
+        # Later maps are used more recently.
+        os.utime(cache.path("{:02d}".format(i) * 20), (i, i))
+    assert cache.stats()["bytes"] <= 250
+    assert cache.get("04" * 20) == b"x" * 100
+    assert cache.get("00" * 20) is None
+    assert not any(
+        name.endswith(".tmp")
+        for _, _, names in os.walk(str(tmpdir))
+        for name in names)
@@ -0,0 +1,103 @@
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps import pyramid
+
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+
+def test_decimate_mean():
+    data = np.ma.masked_array(
+        [[1, 3, 5], [5, 7, 9], [2, 2, 0]],
+        [[False, False, True], [False, False, True], [False, False, False]],
+        dtype=np.float32)
+    expected = np.ma.masked_array(
+        [[4, 0], [2, 0]],
+        [[False, True], [False, False]])
+
+    out = pyramid.decimate_mean(data)
+
+    assert out.dtype == np.float32
+    assert out.shape == (2, 2)
+    assert np.all(out.mask == expected.mask)
+    assert np.all(out == expected)
+
+def test_decimate_mean_nan():
+    data = np.array([[1, np.nan], [3, 5]])
+    out = pyramid.decimate_mean(data)
+    assert out.tolist() == [[3]]
+
+    out = pyramid.decimate_mean(np.full((2, 2), np.nan))
+    assert out.mask.tolist() == [[True]]
+
+def test_decimate_mode():
+    data = np.ma.masked_array(
+        [[1, 2, 5, 5], [2, 1, 5, 6], [3, 4, 7, 7], [4, 4, 8, 8]],
+        [[False] * 4, [False] * 4, [False] * 4, [True, False, True, True]],
+        dtype=np.uint16)
+    expected = np.array([[1, 5], [4, 7]])
+
+    out = pyramid.decimate_mode(data)
+
+    assert out.dtype == np.uint16
+    assert not np.any(out.mask)
+    assert np.all(out == expected)
+
+def test_decimate_mode_masked():
+    data = np.ma.masked_array([[1, 2, 3]], [[True, True, False]])
+
+    out = pyramid.decimate_mode(data)
+
+    assert out.shape == (1, 2)
+    assert np.all(out.mask == [True, False])
+    assert out[0, 1] == 3
+
+def test_build():
+    data = np.arange(100 * 37).reshape(100, 37)
+
+    levels = pyramid.Pyramid.from_continuous(data, min_size=10).levels
+
+    assert [level.shape for level in levels] == [
+        (100, 37), (50, 19), (25, 10), (13, 5), (7, 3)]
+    assert levels[1][0, 0] == np.mean([0, 1, 37, 38])
+
+@pytest.mark.parametrize("cells_per_pixel,expected", [
+    (.5, 0), (1, 0), (1.9, 0), (2, 1), (7.9, 2), (1000, 3)
+])
+def test_select(cells_per_pixel, expected):
+    levels = pyramid.Pyramid.from_discrete(np.zeros((64, 64)), min_size=8)
+    assert levels.select(cells_per_pixel) == expected
+
+def test_pyramid_image():
+    fig, ax = plt.subplots(figsize=(1, 1), dpi=100)
+    data = np.arange(1600 ** 2, dtype=np.float32).reshape(1600, 1600)
+    levels = pyramid.Pyramid.from_continuous(data, min_size=100)
+    image = ax.imshow(data)
+    overview = pyramid.PyramidImage(image, levels)
+
+    # The axes are less than 100 pixels tall, showing 1600 rows.
+    level = overview.update()
+    assert level == 4
+    assert image.get_array().shape == levels.levels[4].shape
+
+    # Zoomed in to 40 rows.
+    ax.set_xlim(0, 40)
+    ax.set_ylim(40, 0)
+    assert overview.update() == 0
+    assert image.get_array().shape == data.shape
+
+def test_pyramid_image_savefig():
+    fig, ax = plt.subplots(figsize=(1, 1), dpi=100)
+    data = np.arange(1600 ** 2, dtype=np.float32).reshape(1600, 1600)
+    levels = pyramid.Pyramid.from_continuous(data, min_size=100)
+    overview = pyramid.PyramidImage(ax.imshow(data), levels)
+    assert overview.update() == 4
+
+    # Saved at a higher resolution, a finer level is drawn.
+    fig.savefig(io.BytesIO(), dpi=400)
+    assert overview.level == 2
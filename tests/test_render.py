@@ -0,0 +1,34 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+from fieldmaps import render_png
+
+
+raster = np.arange(16, dtype=float).reshape(4, 4)
+verts = np.array([
+    [(0, 0), (0, 1), (1, 1), (1, 0)],
+    [(1, 0), (1, 1), (2, 1), (2, 0)],
+])
+
+def test_png():
+    figures = plt.get_fignums()
+    png = render_png("raster_cont", raster, size=(2, 2), dpi=50)
+    assert png.startswith(b"\x89PNG")
+    assert plt.get_fignums() == figures
+
+def test_rgba():
+    pixels = render_png(
+        "poly_discrete",
+        ["a", "b"],
+        verts,
+        size=(3, 2),
+        dpi=50,
+        format="rgba")
+    assert pixels.shape == (100, 150, 4)
+    assert pixels.dtype == np.uint8
+
+def test_callable():
+    def plot(data, ax=None):
+        ax.plot(data)
+    jpg = render_png(plot, [0, 1], size=(1, 1), format="jpg")
+    assert jpg.startswith(b"\xff\xd8")
@@ -1,5 +1,8 @@
 import matplotlib.pyplot as plt
 import pytest
+import subprocess
+import sys
+import textwrap
 
 from fieldmaps import settings
 
@@ -9,8 +12,27 @@ def close_plots():
     plt.close("all")
 
 def test_discrete_cmap_registered():
+    settings.register_palettes()
+    settings.register_palettes()
     assert settings.discrete_palette in plt.colormaps()
 
+def test_import_is_lazy():
+    # Importing the package neither loads pyplot nor registers palettes,
+    # which is checked in a fresh interpreter.
+    code = textwrap.dedent("""
+        import sys
+        from matplotlib import colormaps
+        from fieldmaps import settings
+
+        name = settings.discrete_palette
+        assert "matplotlib.pyplot" not in sys.modules
+        assert name not in colormaps
+        settings.get_colormap(name)
+        assert name in colormaps
+        assert "matplotlib.pyplot" not in sys.modules
+    """)
+    subprocess.run([sys.executable, "-c", code], check=True)
+
 class TestApplyTheme(object):
     @pytest.mark.parametrize(
         "grid, expected_color",
@@ -0,0 +1,84 @@
+from matplotlib.collections import PathCollection
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from fieldmaps.geometry import Polygons
+from fieldmaps.spatial import (
+    GridIndex, PointCulling, PolygonCulling, ring_bounds)
+
+
+@pytest.fixture(autouse=True)
+def close_plots():
+    plt.close("all")
+
+@pytest.fixture(scope="module")
+def coords():
+    rs = np.random.RandomState(seed=13)
+    xy = rs.uniform(0, 100, size=(1000, 2))
+    xy.setflags(write=False)
+    return xy
+
+def squares(n):
+    # Unit squares along the diagonal.
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]], float)
+    coords = (square + np.arange(n)[:, None, None]).reshape(-1, 2)
+    return Polygons(coords, np.arange(0, len(coords) + 1, 5))
+
+def test_ring_bounds():
+    bounds = ring_bounds(squares(3))
+    np.testing.assert_array_equal(bounds[2], [2, 2, 3, 3])
+
+@pytest.mark.parametrize("box", [
+    (10, 20, 30, 25),
+    (-5, -5, 0, 200),
+    (50, 50, 50, 50),
+    (-10, -10, 200, 200),
+    (200, 200, 300, 300),
+])
+def test_query_points(coords, box):
+    index = GridIndex.from_points(coords)
+    x, y = coords.T
+    xmin, ymin, xmax, ymax = box
+    expected = np.flatnonzero(
+        (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+
+    np.testing.assert_array_equal(index.query(box), expected)
+
+def test_query_boxes():
+    index = GridIndex.from_polygons(squares(100))
+
+    # Boxes spanning several cells are found once.
+    np.testing.assert_array_equal(index.query((.5, .5, 2.5, 2.5)), [0, 1, 2])
+    np.testing.assert_array_equal(index.query((50.5, 0, 51, 1)), [])
+
+def test_query_empty():
+    index = GridIndex(np.empty((0, 4)))
+    assert len(index.query((0, 0, 1, 1))) == 0
+
+def test_point_culling(coords):
+    fig, ax = plt.subplots()
+    data = np.arange(len(coords))
+    collection = ax.scatter(*coords.T)
+    culling = PointCulling(collection, coords, data, margin=0)
+
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    visible = culling.update()
+
+    assert 0 < len(visible) < len(coords)
+    np.testing.assert_array_equal(collection.get_offsets(), coords[visible])
+    np.testing.assert_array_equal(collection.get_array(), data[visible])
+
+def test_polygon_culling():
+    fig, ax = plt.subplots()
+    polygons = squares(100)
+    collection = ax.add_collection(PathCollection(polygons.paths()))
+    culling = PolygonCulling(collection, polygons, np.arange(100), margin=0)
+
+    ax.set_xlim(10.5, 12.5)
+    ax.set_ylim(10.5, 12.5)
+    culling.update()
+
+    assert len(collection.get_paths()) == 3
+    np.testing.assert_array_equal(collection.get_array(), [10, 11, 12])
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from fieldmaps.stack import encode_frame, stack_categories, stack_range
+
+
+@pytest.fixture
+def stack(tmpdir):
+    # Memory-mapped, as large stacks are.
+    data = np.arange(24, dtype=float).reshape(2, 3, 4)
+    data[0, 0, 0] = np.nan
+    mapped = np.memmap(
+        str(tmpdir.join("stack.dat")),
+        dtype=float,
+        mode="w+",
+        shape=data.shape)
+    mapped[:] = data
+    return mapped
+
+def test_stack_range(stack):
+    assert stack_range(stack) == (1, 23)
+
+def test_stack_range_empty():
+    assert stack_range(np.full((2, 2, 2), np.nan)) == (None, None)
+
+def test_stack_categories():
+    stack = np.ma.masked_array(
+        [[[1, 2], [2, 2]], [[5, 1], [9, 9]]],
+        [[[0, 0], [0, 0]], [[0, 0], [1, 1]]])
+    np.testing.assert_array_equal(stack_categories(stack), [1, 2, 5])
+
+def test_encode_frame():
+    codes = encode_frame(np.array([[5, 1], [7, 2]]), np.array([1, 2, 5]))
+    np.testing.assert_array_equal(codes.filled(99), [[2, 0], [99, 1]])
+
+def test_encode_frame_many_categories():
+    # Code 1000 is a valid code with more than 1000 categories.
+    stack = np.arange(3000).reshape(2, 30, 50)
+    categories = stack_categories(stack)
+    codes = encode_frame(stack[0], categories)
+    assert np.ma.count_masked(codes) == 0
+    assert codes[20, 0] == 1000
@@ -0,0 +1,124 @@
+from http.server import HTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from fieldmaps.colorize import colorize_cont
+from fieldmaps.tiles import TileSet, make_handler
+
+
+raster = np.arange(16.).reshape(4, 4)
+raster[0, 1] = np.nan
+points = np.array([[0., 0.], [1., 1.], [4., 4.]])
+verts = np.array([
+    [(0, 0), (0, 1), (1, 1), (1, 0)],
+    [(1, 0), (1, 1), (2, 1), (2, 0)],
+], dtype=float)
+
+def test_raster():
+    tiles = TileSet("raster", raster, tile_size=4)
+    np.testing.assert_array_equal(tiles.render(0, 0, 0), colorize_cont(raster))
+    # Each cell of the lower right quarter covers 2x2 pixels.
+    quarter = tiles.render(1, 1, 1)
+    expected = colorize_cont(raster)[2:, 2:].repeat(2, 0).repeat(2, 1)
+    np.testing.assert_array_equal(quarter, expected)
+
+def test_points():
+    tiles = TileSet("points", [1., 2., 3.], points, tile_size=4)
+    alpha = tiles.render(0, 0, 0)[..., 3]
+    assert alpha[3, 0] and alpha[2, 1] and alpha[0, 3]
+    assert (alpha > 0).sum() == 3
+
+def test_polygons():
+    tiles = TileSet("polygons", ["a", "b"], verts, discrete=True, tile_size=4)
+    pixels = tiles.render(0, 0, 0)
+    # The polygons fill the top half of the square holding them.
+    assert pixels[:2, ..., 3].all()
+    assert not pixels[2:, ..., 3].any()
+    assert (pixels[0, 0] != pixels[0, 3]).any()
+
+def test_bounds():
+    tiles = TileSet("raster", raster)
+    assert tiles.tile_bounds(1, 0, 1) == (0., 0., 2., 2.)
+    for z, x, y in [(1, 2, 0), (0, 0, -1), (-1, 0, 0)]:
+        with pytest.raises(ValueError):
+            tiles.tile_bounds(z, x, y)
+
+def test_caches(tmpdir):
+    cache_dir = str(tmpdir)
+    kwargs = {"tile_size": 8, "cache_dir": cache_dir, "name": "ndvi"}
+    tiles = TileSet("raster", raster, **kwargs)
+    png = tiles.tile(1, 0, 0)
+    assert png.startswith(b"\x89PNG")
+    assert tiles.tile(1, 0, 0) is png
+    assert tiles.stats()["memory_hits"] == 1
+    assert tiles.stats()["rendered"] == 1
+
+    # Tiles of the same data are read back from disk.
+    again = TileSet("raster", raster, **kwargs)
+    assert again.version == tiles.version
+    assert again.tile(1, 0, 0) == png
+    assert again.stats()["disk_hits"] == 1
+
+    # New data has a new version, and older versions can be pruned.
+    changed = TileSet("raster", raster + 1, **kwargs)
+    assert changed.version != tiles.version
+    changed.tile(1, 0, 0)
+    assert changed.stats()["rendered"] == 1
+    changed.prune()
+    assert os.listdir(os.path.join(cache_dir, "ndvi")) == [changed.version]
+
+def test_shared_cache_dir(tmpdir):
+    cache_dir = str(tmpdir)
+    first = TileSet("raster", raster, cache_dir=cache_dir, name="first")
+    second = TileSet("raster", raster * 2, cache_dir=cache_dir, name="second")
+    first.tile(0, 0, 0)
+    second.tile(0, 0, 0)
+
+    # Pruning a layer leaves the tiles of the others.
+    first.prune()
+    second.prune()
+    assert sorted(os.listdir(cache_dir)) == ["first", "second"]
+    assert os.path.exists(first.tile_path(0, 0, 0))
+    assert os.path.exists(second.tile_path(0, 0, 0))
+
+    with pytest.raises(ValueError):
+        TileSet("raster", raster, cache_dir=cache_dir)
+
+def test_no_pillow(monkeypatch):
+    monkeypatch.setitem(sys.modules, "PIL", None)
+    tiles = TileSet("raster", raster)
+    with pytest.raises(ImportError, match="Pillow"):
+        tiles.tile(0, 0, 0)
+
+def test_handler():
+    tilesets = {"ndvi": TileSet("raster", raster, tile_size=8)}
+    server = HTTPServer(("127.0.0.1", 0), make_handler(tilesets))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = "http://127.0.0.1:{}".format(server.server_address[1])
+    try:
+        # Statistics before any request are still valid JSON.
+        with urlopen(url + "/stats") as response:
+            stats = json.loads(
+                response.read().decode(),
+                parse_constant=pytest.fail)
+            assert stats["ndvi"]["hit_rate"] is None
+        with urlopen(url + "/ndvi/0/0/0.png") as response:
+            assert response.headers["Content-Type"] == "image/png"
+            assert response.read().startswith(b"\x89PNG")
+        with urlopen(url + "/stats") as response:
+            assert json.load(response)["ndvi"]["rendered"] == 1
+        for path in ("/ndvi/1/2/0.png", "/other/0/0/0.png", "/ndvi/0/0"):
+            with pytest.raises(HTTPError):
+                urlopen(url + path)
+    finally:
+        server.shutdown()
+        server.server_close()
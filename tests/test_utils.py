@@ -1,5 +1,8 @@
+from fieldmaps.geometry import Polygons
+from fieldmaps.grid import Grid
 from fieldmaps.settings import color_missing
-from fieldmaps.utils import AxesUpdater, DataContainer, get_extend, mask
+from fieldmaps.utils import (
+    AxesUpdater, DataContainer, get_extend, mask, value_range)
 from matplotlib.colors import Normalize
 
 import matplotlib.pyplot as plt
@@ -28,7 +31,7 @@ def test_extend(vmin, vmax, expected):
 
 def test_mask():
     data = np.array([np.nan, 2, 3, np.inf, 5, -np.inf])
-    expected_mask = np.array([True, False, False, True, False, True])
+    expected_mask = np.array([False, False, False, True, False, True])
 
     masked = mask(data)
     assert np.all(masked.mask == expected_mask)
@@ -37,12 +40,67 @@ def test_mask():
     remasked = mask(masked_data)
     assert np.all(remasked == masked_data)
 
+def test_mask_clean():
+    data = np.arange(6, dtype=np.float32)
+    masked = mask(data)
+    assert masked.mask is np.ma.nomask
+    assert np.shares_memory(masked.data, data)
+    assert mask(np.arange(6)).mask is np.ma.nomask
+
+    # Sums overflowing to infinity are checked value by value.
+    assert mask(np.full(3, 1e308)).mask is np.ma.nomask
+
+def test_mask_no_copy():
+    data = np.array([1., np.nan, 3., 4.])
+    assert np.shares_memory(mask(data).data, data)
+
+    # NaN marks missing float data by itself.
+    assert mask(data).mask is np.ma.nomask
+
+    # Masked arrays are passed through, and only masked further by a
+    # sentinel, without changing their mask.
+    masked_data = np.ma.masked_array(data, [False, False, False, True])
+    assert mask(masked_data) is masked_data
+    remasked = mask(masked_data, sentinel=1.)
+    assert remasked.mask.tolist() == [True, False, False, True]
+    assert masked_data.mask.tolist() == [False, False, False, True]
+
+def test_mask_sentinel():
+    data = np.array([-9999, 2, 3, -9999])
+    masked = mask(data, sentinel=-9999)
+    assert masked.mask.tolist() == [True, False, False, True]
+
+    floats = np.array([np.nan, 2., -9999.])
+    masked = mask(floats, sentinel=-9999)
+    assert masked.mask.tolist() == [False, False, True]
+    assert mask(floats, sentinel=np.nan).mask is np.ma.nomask
+
+def test_value_range():
+    data = np.array([np.nan, 2., -1., 7.])
+    assert value_range(data) == (-1, 7)
+    assert value_range(np.ma.masked_array(data, [0, 0, 1, 1])) == (2, 2)
+    assert value_range(np.ma.masked_array([3, 1, 5], [0, 0, 1])) == (1, 3)
+    assert value_range(np.full(3, np.nan)) == (None, None)
+    assert value_range(np.ma.masked_all(3)) == (None, None)
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int16])
+def test_compact_dtype_kept(dtype):
+    data = np.arange(16, dtype=dtype).reshape(4, 4)
+    container = DataContainer.from_continuous(data, "YlGn")
+    assert container.data.dtype == dtype
+    assert np.shares_memory(container.data, data)
+
+    ax = get_ax()
+    updater = AxesUpdater.from_continuous(container, ax)
+    image = updater.add_raster(pyramid=True)
+    assert image.get_array().dtype == dtype
+
 class TestDataContainerContinuous(object):
     palette = "PiYG"
 
     def test_raster(self):
         data = np.array([[np.inf, np.nan], [3, 4]])
-        expected_mask = np.array([[True, True], [False, False]])
+        expected_mask = np.array([[True, False], [False, False]])
 
         container = DataContainer.from_continuous(
             data,
@@ -59,7 +117,7 @@ class TestDataContainerContinuous(object):
 
     def test_1d(self):
         data = np.array([np.inf, np.nan, 3, 4])
-        expected_mask = np.array([True, True, False, False])
+        expected_mask = np.array([True, False, False, False])
 
         container = DataContainer.from_continuous(
             data,
@@ -101,6 +159,30 @@ class TestDataContainerDiscrete(object):
         assert container.colormap.N == 2
         assert len(container.ticklabels) == 2
 
+    def test_coded(self):
+        codes = np.array([[0, 1], [2, -1]], dtype=np.int8)
+        labels = ("a", "b", "c")
+        expected_mask = np.array([[False, False], [False, True]])
+
+        container = DataContainer.from_discrete(codes, self.palette, labels)
+
+        assert container.data.dtype == np.int8
+        assert np.shares_memory(container.data, codes)
+        assert np.all(container.data.mask == expected_mask)
+        assert container.colormap.N == 3
+        assert container.ticklabels == labels
+
+    def test_categorical(self):
+        pd = pytest.importorskip("pandas")
+        data = pd.Categorical(["b", None, "a", "b"], categories=["b", "a"])
+
+        container = DataContainer.from_discrete(data, self.palette)
+
+        assert np.shares_memory(container.data, data.codes)
+        assert np.all(container.data.mask == [False, True, False, False])
+        assert container.colormap.N == 2
+        assert container.ticklabels == ("b", "a")
+
 class TestAxesUpdater(object):
     continuous_palette = "PiYG"
     discrete_palette = "tab10"
@@ -159,7 +241,7 @@ class TestAxesUpdater(object):
         if alpha is not None:
             masked_color[-1] = alpha
 
-        for rgba, masked in zip(colors, masked_data.mask):
+        for rgba, masked in zip(colors, np.ma.getmaskarray(masked_data)):
             if masked:
                 assert np.all(rgba == masked_color)
 
@@ -230,6 +312,24 @@ class TestAxesUpdater(object):
         # Internal data always has a mask.
         self.assert_masked_colors(container.data, collection)
 
+    def test_add_polygons_flat(self):
+        data = np.ma.masked_array(np.arange(3), [True, False, False])
+        vert = [[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]]
+        polygons = Polygons(np.array(vert * 3), [0, 5, 10, 15])
+        container = DataContainer.from_continuous(
+            data,
+            self.continuous_palette)
+        updater = AxesUpdater.from_continuous(container, closed=True)
+
+        collection = updater.add_polygons(polygons)
+
+        assert collection.axes is updater.ax
+        assert collection.norm == container.norm
+        assert np.all(collection.get_array() == container.data)
+        assert len(collection.get_paths()) == len(polygons)
+        assert tuple(updater.ax.dataLim.bounds) == (0, 0, 1, 1)
+        self.assert_masked_colors(container.data, collection)
+
     @pytest.mark.parametrize("continuous", [True, False], ids=["continuous", "discrete"])  # noqa
     def test_add_raster(self, continuous):
         data = np.array([[0, 1], [2, 3]])
@@ -257,6 +357,26 @@ class TestAxesUpdater(object):
         assert collection.get_alpha() == alpha
         assert np.all(collection.get_array() == container.data)
 
+    def test_add_grid(self):
+        grid = Grid.from_bounds((0, 0, 2, 2), resolution=1)
+        data = np.ma.masked_array([[0, 1], [2, 3]], [[True, True], [0, 0]])
+        empty = np.array([[True, False], [False, False]])
+        container = DataContainer.from_continuous(
+            data,
+            self.continuous_palette)
+        updater = AxesUpdater.from_continuous(container)
+
+        image = updater.add_grid(grid, empty)
+
+        assert image.get_extent() == [0, 2, 0, 2]
+        assert np.all(image.get_array() == container.data)
+        assert image.get_cmap().get_bad()[-1] == 0
+        assert container.colormap.get_bad()[-1] != 0
+
+        # Only the cell with missing values is drawn as missing.
+        overlay = updater.ax.get_images()[1]
+        assert np.all(overlay.get_array().mask == [[True, False], [1, 1]])
+
     def test_add_colorbar_continuous(self):
         fig, ax = plt.subplots()
         data = np.arange(3)